@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Hashable, Sequence
+
+from backtesting_bot.constants import DEFAULT_BAR_CACHE_MB
+from backtesting_bot.sessions import SessionBars
+
+BAR_CACHE_ENV = "BACKTESTING_BAR_CACHE_MB"
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    path: Path
+    start: dt.date
+    end: dt.date
+    columns: tuple[str, ...] | None
+    signature: Hashable
+    bars: SessionBars
+    nbytes: int
+
+
+def _frame_nbytes(bars: SessionBars) -> int:
+    return int(bars.frame.memory_usage(index=True).sum())
+
+
+class BarCache:
+    """LRU cache of loaded bars bounded by an approximate memory budget.
+
+    Entries are keyed by source path, date range and column projection, and are
+    only reused while the source ``signature`` (file mtimes or manifest version)
+    is unchanged. A request for a sub-range or column subset of a cached entry is
+    served by slicing that entry.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self._total_bytes = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        path: Path,
+        start: dt.date,
+        end: dt.date,
+        columns: Sequence[str] | None,
+        signature: Hashable,
+    ) -> SessionBars | None:
+        with self._lock:
+            for entry_id, entry in reversed(self._entries.items()):
+                if entry.path != path or entry.start > start or entry.end < end:
+                    continue
+                if entry.signature != signature:
+                    continue
+                if columns is not None and entry.columns is not None:
+                    if not set(columns).issubset(entry.columns):
+                        continue
+                elif entry.columns is not None:
+                    continue
+                self._entries.move_to_end(entry_id)
+                bars = entry.bars
+                break
+            else:
+                return None
+
+        if start > entry.start or end < entry.end:
+            bars = bars.between(start, end)
+        if columns is not None and tuple(columns) != entry.columns:
+            bars = bars.with_frame(bars.frame[list(columns)])
+        return bars
+
+    def put(
+        self,
+        path: Path,
+        start: dt.date,
+        end: dt.date,
+        columns: Sequence[str] | None,
+        signature: Hashable,
+        bars: SessionBars,
+    ) -> None:
+        nbytes = _frame_nbytes(bars)
+        if nbytes > self.max_bytes:
+            return
+        entry = _CacheEntry(
+            path=path,
+            start=start,
+            end=end,
+            columns=tuple(columns) if columns is not None else None,
+            signature=signature,
+            bars=bars,
+            nbytes=nbytes,
+        )
+        with self._lock:
+            # Drop entries this one supersedes, including stale signatures.
+            for entry_id, existing in list(self._entries.items()):
+                if existing.path != path:
+                    continue
+                stale = existing.signature != signature
+                covered = (
+                    existing.start >= start
+                    and existing.end <= end
+                    and (
+                        entry.columns is None
+                        or (
+                            existing.columns is not None
+                            and set(existing.columns).issubset(entry.columns)
+                        )
+                    )
+                )
+                if stale or covered:
+                    self._remove(entry_id)
+
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            self._total_bytes += nbytes
+            self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._total_bytes -= entry.nbytes
+
+
+def _budget_from_env() -> int:
+    value = os.getenv(BAR_CACHE_ENV)
+    megabytes = float(value) if value else DEFAULT_BAR_CACHE_MB
+    return int(megabytes * 1024 * 1024)
+
+
+_BAR_CACHE = BarCache(_budget_from_env())
+
+
+def get_bar_cache() -> BarCache:
+    return _BAR_CACHE
+
+
+def configure_bar_cache(max_mb: float) -> BarCache:
+    """Resize the process-wide bar cache, evicting entries over the new budget."""
+    _BAR_CACHE.resize(int(max_mb * 1024 * 1024))
+    return _BAR_CACHE
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import datetime as dt
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from backtesting_bot.cache_reader import (
+    BAR_COLUMNS,
+    TIMESTAMP_TYPE,
+    combine_pieces,
+    read_cache_sessions,
+)
+from backtesting_bot.sessions import EPOCH_DATE, decode_prices, epoch_day
+from src.cache.manifest import load_manifest
+
+STORE_DIR_NAME = "_store"
+# Schema metadata key holding the session index, so bars and offsets are
+# replaced together in one atomic rename.
+INDEX_KEY = b"sessions"
+
+
+def store_path(cache_root: Path, symbol: str = "SPY") -> Path:
+    return Path(cache_root) / STORE_DIR_NAME / f"{symbol}.arrow"
+
+
+def _content_hashes(cache_root: Path) -> dict[dt.date, str]:
+    manifest = load_manifest(cache_root)
+    return dict(zip(manifest["session_date"], manifest["content_hash"]))
+
+
+def build_bar_store(cache_root: Path, symbol: str = "SPY") -> Path:
+    cache_root = Path(cache_root)
+    # Hashes are taken before the bars are read: a session rewritten in
+    # between is stored under its old hash and served from the cache instead.
+    hashes = _content_hashes(cache_root)
+    pieces = read_cache_sessions(cache_root, dt.date.min, dt.date.max, set())
+    if not pieces:
+        raise FileNotFoundError(f"No cached SPY bars found under {cache_root}.")
+    df, days = combine_pieces(pieces)
+
+    boundaries = np.flatnonzero(np.diff(days)) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(days)]))
+    sessions = {}
+    for row_start, row_stop in zip(starts, stops):
+        session_date = EPOCH_DATE + dt.timedelta(days=int(days[row_start]))
+        sessions[session_date.isoformat()] = [
+            int(row_start),
+            int(row_stop),
+            hashes.get(session_date),
+        ]
+
+    # Prices stay scaled int32, as the cache reader returns them.
+    arrays = [pa.array(df.index, TIMESTAMP_TYPE)]
+    arrays.extend(pa.array(df[name].to_numpy()) for name in BAR_COLUMNS)
+    combined = pa.table(arrays, names=["timestamp", *BAR_COLUMNS])
+    index = {"symbol": symbol, "rows": int(len(days)), "sessions": sessions}
+    combined = combined.replace_schema_metadata({INDEX_KEY: json.dumps(index)})
+
+    bars_path = store_path(cache_root, symbol)
+    bars_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write uncompressed so the file can be memory-mapped without decoding. A
+    # per-writer tmp name keeps concurrent builds from clobbering each other.
+    tmp_bars = bars_path.with_name(
+        f"{bars_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    )
+    try:
+        with pa.OSFile(str(tmp_bars), "wb") as sink:
+            with pa.ipc.new_file(sink, combined.schema) as writer:
+                writer.write_table(combined)
+        os.replace(tmp_bars, bars_path)
+    except BaseException:
+        tmp_bars.unlink(missing_ok=True)
+        raise
+    return bars_path
+
+
+@dataclass(frozen=True)
+class BarStore:
+    """Memory-mapped bars of the sessions still current in the cache.
+
+    Sessions whose cache ``content_hash`` changed since the build (re-fetched
+    or upgraded) are left out, so loaders read them from the cache instead.
+    Sessions no longer in the cache at all are still served from the store.
+    """
+
+    table: pa.Table
+    session_dates: list[dt.date]
+    starts: list[int]
+    stops: list[int]
+
+    @classmethod
+    def open(cls, cache_root: Path, symbol: str = "SPY") -> "BarStore | None":
+        bars_path = store_path(cache_root, symbol)
+        if not bars_path.exists():
+            return None
+
+        source = pa.memory_map(str(bars_path), "r")
+        table = pa.ipc.open_file(source).read_all()
+        index = (table.schema.metadata or {}).get(INDEX_KEY)
+        if index is None or table.schema.field("close").type != pa.int32():
+            # Built by an older layout; rebuild it to use it again.
+            return None
+        current = _content_hashes(Path(cache_root))
+        ordered = sorted(
+            (dt.date.fromisoformat(key), bounds)
+            for key, bounds in json.loads(index)["sessions"].items()
+        )
+        ordered = [
+            (session_date, bounds)
+            for session_date, bounds in ordered
+            if current.get(session_date, bounds[2]) == bounds[2]
+        ]
+        return cls(
+            table=table,
+            session_dates=[session_date for session_date, _ in ordered],
+            starts=[int(bounds[0]) for _, bounds in ordered],
+            stops=[int(bounds[1]) for _, bounds in ordered],
+        )
+
+    def _rows(self, table: pa.Table, lo: int, hi: int) -> pa.Table:
+        """Rows of sessions ``lo:hi``, joining the runs split by stale sessions."""
+        runs: list[pa.Table] = []
+        pos = lo
+        while pos < hi:
+            last = pos
+            while last + 1 < hi and self.starts[last + 1] == self.stops[last]:
+                last += 1
+            row_start = self.starts[pos]
+            runs.append(table.slice(row_start, self.stops[last] - row_start))
+            pos = last + 1
+        if not runs:
+            return table.slice(0, 0)
+        return runs[0] if len(runs) == 1 else pa.concat_tables(runs)
+
+    def sessions_between(self, start: dt.date, end: dt.date) -> list[dt.date]:
+        lo = bisect.bisect_left(self.session_dates, start)
+        hi = bisect.bisect_right(self.session_dates, end)
+        return self.session_dates[lo:hi]
+
+    def slice(self, start: dt.date, end: dt.date) -> pa.Table:
+        lo = bisect.bisect_left(self.session_dates, start)
+        hi = bisect.bisect_right(self.session_dates, end)
+        return self._rows(self.table, lo, hi)
+
+    def read(
+        self, start: dt.date, end: dt.date, columns: Sequence[str] | None = None
+    ) -> tuple[pd.DataFrame, np.ndarray]:
+        """Return the bars for ``start``..``end`` and their session epoch days."""
+        lo = bisect.bisect_left(self.session_dates, start)
+        hi = bisect.bisect_right(self.session_dates, end)
+        table = self.slice(start, end)
+        if columns is not None:
+            table = table.select(["timestamp", *columns])
+        # split_blocks keeps each column backed by the memory map instead of
+        # consolidating them into a fresh 2D block.
+        df = table.to_pandas(split_blocks=True).set_index("timestamp")
+        days = np.repeat(
+            [epoch_day(value) for value in self.session_dates[lo:hi]],
+            np.subtract(self.stops[lo:hi], self.starts[lo:hi]),
+        ).astype(np.int64)
+        return df, days
+
+    def iter_sessions(
+        self, start: dt.date, end: dt.date, columns: Sequence[str] | None = None
+    ) -> Iterator[tuple[dt.date, pd.DataFrame]]:
+        """Yield the bars of each session in ``start``..``end`` in date order."""
+        lo = bisect.bisect_left(self.session_dates, start)
+        hi = bisect.bisect_right(self.session_dates, end)
+        table = self.table
+        if columns is not None:
+            table = table.select(["timestamp", *columns])
+        for pos in range(lo, hi):
+            row_start = self.starts[pos]
+            session = table.slice(row_start, self.stops[pos] - row_start)
+            df = session.to_pandas(split_blocks=True).set_index("timestamp")
+            yield self.session_dates[pos], decode_prices(df)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Consolidate cached SPY 1m partitions into a memory-mapped store."
+    )
+    parser.add_argument(
+        "--cache-root",
+        default="data_local/spy/1m",
+        help="Root directory containing date=YYYY-MM-DD partitions.",
+    )
+    parser.add_argument("--symbol", default="SPY")
+    return parser
+
+
+def main() -> int:
+    parser = build_parser()
+    args = parser.parse_args()
+
+    try:
+        bars_path = build_bar_store(Path(args.cache_root), symbol=args.symbol)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}")
+        return 1
+    print(f"Wrote consolidated bar store to {bars_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
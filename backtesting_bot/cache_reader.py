@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+
+from backtesting_bot.sessions import decode_prices, session_days
+from src.cache.manifest import is_legacy, load_manifest
+from src.cache.schema import COMPACT_SCHEMA, decode_bars, scale_prices
+
+BAR_COLUMNS = ("open", "high", "low", "close", "volume")
+TIMESTAMP_COLUMNS = ("timestamp", "ts", "datetime")
+TIMESTAMP_TYPE = pa.timestamp("ns", tz="UTC")
+
+BarPiece = tuple[pd.DataFrame, np.ndarray]
+
+
+def _open_legacy_dataset(cache_root: Path, files: list[str]) -> ds.Dataset:
+    paths = [str(cache_root / file_name) for file_name in files]
+    # Legacy partitions hold whatever the provider returned (ET vs UTC
+    # timestamps, int vs float volume), so scan them through one normalized
+    # schema.
+    fields = []
+    for field in ds.dataset(paths, format="parquet").schema:
+        if field.name in TIMESTAMP_COLUMNS:
+            field = pa.field(field.name, TIMESTAMP_TYPE)
+        elif field.name in BAR_COLUMNS:
+            field = pa.field(field.name, pa.float64())
+        fields.append(field)
+    return ds.dataset(paths, schema=pa.schema(fields), format="parquet")
+
+
+def _read_compact(
+    cache_root: Path, sessions: pd.DataFrame, columns: Sequence[str] | None
+) -> BarPiece | None:
+    if sessions.empty:
+        return None
+    bar_columns = tuple(columns) if columns is not None else BAR_COLUMNS
+    row_groups: dict[str, list[int]] = defaultdict(list)
+    for row in sessions.sort_values("session_date").itertuples(index=False):
+        row_groups[row.file].append(int(row.row_group))
+
+    # One fragment per file restricted to the manifest's row groups, scanned
+    # together so daily and compacted files are read on the same thread pool.
+    file_format = ds.ParquetFileFormat()
+    filesystem = fs.LocalFileSystem()
+    fragments = [
+        file_format.make_fragment(
+            str(cache_root / file_name), filesystem, row_groups=groups
+        )
+        for file_name, groups in row_groups.items()
+    ]
+    dataset = ds.FileSystemDataset(fragments, COMPACT_SCHEMA, file_format, filesystem)
+    table = dataset.to_table(
+        columns=["timestamp", "session_date", *bar_columns], use_threads=True
+    )
+    return decode_bars(table, bar_columns, scaled=True)
+
+
+def _read_legacy(
+    cache_root: Path, sessions: pd.DataFrame, columns: Sequence[str] | None
+) -> BarPiece | None:
+    if sessions.empty:
+        return None
+    dataset = _open_legacy_dataset(cache_root, list(sessions["file"]))
+    timestamp_column = next(
+        (name for name in TIMESTAMP_COLUMNS if name in dataset.schema.names), None
+    )
+    if timestamp_column is None:
+        raise ValueError("SPY parquet must contain a datetime index or timestamp column")
+
+    projection = None
+    if columns is not None:
+        projection = [timestamp_column, *columns]
+    table = dataset.to_table(columns=projection, use_threads=True)
+    if table.num_rows == 0:
+        return None
+    df = table.to_pandas(split_blocks=True)
+    df = df.set_index(timestamp_column)
+    df.index.name = "timestamp"
+    return scale_prices(df), session_days(df.index)
+
+
+def _select_sessions(
+    cache_root: Path, start: dt.date, end: dt.date, exclude: set[dt.date]
+) -> pd.DataFrame:
+    manifest = load_manifest(cache_root)
+    return manifest.loc[
+        manifest["session_date"].between(start, end)
+        & ~manifest["session_date"].isin(exclude)
+        & (manifest["rows"] > 0)
+    ].sort_values("session_date")
+
+
+def cache_session_dates(
+    cache_root: Path, start: dt.date, end: dt.date
+) -> list[dt.date]:
+    """Non-empty cached sessions in ``start``..``end``, from the manifest alone."""
+    if not cache_root.is_dir():
+        return []
+    return list(_select_sessions(cache_root, start, end, set())["session_date"])
+
+
+def read_cache_sessions(
+    cache_root: Path,
+    start: dt.date,
+    end: dt.date,
+    exclude: set[dt.date],
+    columns: Sequence[str] | None = None,
+) -> list[BarPiece]:
+    """Read cached sessions in ``start``..``end`` located through the manifest.
+
+    The manifest names the file and row group of every session, so the range
+    is resolved without probing the filesystem. Compact daily and compacted
+    sessions are read in one scan; legacy partitions in another. Prices stay
+    scaled int32 (see ``sessions.price_values``).
+    """
+    if not cache_root.is_dir():
+        return []
+
+    selected = _select_sessions(cache_root, start, end, exclude)
+    legacy = selected["file"].map(is_legacy).astype(bool)
+    pieces = [
+        _read_compact(cache_root, selected.loc[~legacy], columns),
+        _read_legacy(cache_root, selected.loc[legacy], columns),
+    ]
+    return [piece for piece in pieces if piece is not None]
+
+
+def iter_cache_sessions(
+    cache_root: Path,
+    start: dt.date,
+    end: dt.date,
+    exclude: set[dt.date],
+    columns: Sequence[str] | None = None,
+) -> Iterator[tuple[dt.date, pd.DataFrame]]:
+    """Yield cached sessions in ``start``..``end`` one at a time, in date order.
+
+    Each session is read from its own file or row group, so only one session's
+    bars are held in memory at a time.
+    """
+    if not cache_root.is_dir():
+        return
+
+    selected = _select_sessions(cache_root, start, end, exclude)
+    for pos in range(len(selected)):
+        session = selected.iloc[pos : pos + 1]
+        reader = _read_legacy if is_legacy(session["file"].iloc[0]) else _read_compact
+        piece = reader(cache_root, session, columns)
+        if piece is not None:
+            yield session["session_date"].iloc[0], decode_prices(piece[0])
+
+
+def combine_pieces(pieces: list[BarPiece]) -> BarPiece:
+    if len(pieces) == 1:
+        df, days = pieces[0]
+    else:
+        df = pd.concat([frame for frame, _ in pieces])
+        days = np.concatenate([piece_days for _, piece_days in pieces])
+    if not df.index.is_monotonic_increasing:
+        order = np.argsort(df.index.asi8, kind="stable")
+        df = df.iloc[order]
+        days = days[order]
+    return df, days
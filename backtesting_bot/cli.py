@@ -4,7 +4,23 @@ import argparse
 import datetime as dt
 from pathlib import Path
 
-from backtesting_bot.pass1 import Pass1Config, run_pass1_pipeline
+from backtesting_bot.constants import DEFAULT_SHARD_SESSIONS
+from backtesting_bot.contract_plan import (
+    iter_experiment_runs,
+    plan_contracts,
+    prefetch_plan,
+)
+from backtesting_bot.experiment_runner import list_experiments
+from backtesting_bot.pass1 import ORB_ENGINES, Pass1Config, run_pass1_pipeline
+from backtesting_bot.strategies import STRATEGIES
+from backtesting_bot.strategies.orb import REARM_RULES
+from src.cache.backfill import DEFAULT_BACKFILL_WORKERS
+from src.cache.option_cache import OptionBarCache
+from src.config import load_config, load_local_paths
+from src.providers.massive import MassiveMarketDataProvider
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+EXPERIMENTS_ROOT = Path("data_local") / "experiments"
 
 
 def _parse_date(value: str) -> dt.date:
@@ -22,7 +38,7 @@ def build_parser() -> argparse.ArgumentParser:
     pass1_parser = subparsers.add_parser("pass1", help="Run Pass 1 signal generation")
     pass1_parser.add_argument("--start", required=True, type=_parse_date)
     pass1_parser.add_argument("--end", required=True, type=_parse_date)
-    pass1_parser.add_argument("--strategy", required=True)
+    pass1_parser.add_argument("--strategy", required=True, choices=sorted(STRATEGIES))
     pass1_parser.add_argument("--run-id", required=True)
     pass1_parser.add_argument(
         "--spy-1m-path", default="data_local/spy_1m.parquet"
@@ -30,16 +46,100 @@ def build_parser() -> argparse.ArgumentParser:
     pass1_parser.add_argument(
         "--max-trades-per-day", type=int, default=1, dest="max_trades_per_day"
     )
+    pass1_parser.add_argument(
+        "--rearm",
+        choices=REARM_RULES,
+        default="inside",
+        help="How a session re-arms after an entry when more trades are allowed",
+    )
     pass1_parser.add_argument(
         "--no-entries-after",
         type=_parse_time,
         dest="no_entries_after",
         help="Cutoff time in ET (HH:MM)",
     )
+    pass1_parser.add_argument(
+        "--orb-engine",
+        choices=ORB_ENGINES,
+        default="vectorized",
+        help="ORB breakout scan: array-based or the per-candle loop",
+    )
+    pass1_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes running date shards in parallel (1 runs in-process)",
+    )
+    pass1_parser.add_argument(
+        "--shard-sessions",
+        type=int,
+        default=DEFAULT_SHARD_SESSIONS,
+        dest="shard_sessions",
+        help="Sessions per shard when running with several workers",
+    )
+    pass1_parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Process one session at a time to bound memory on long ranges",
+    )
+
+    prefetch_parser = subparsers.add_parser(
+        "prefetch-options",
+        help="Cache the option contracts needed by experiments' pass1 entries",
+    )
+    prefetch_parser.add_argument(
+        "--experiments",
+        nargs="*",
+        default=None,
+        help="Experiment IDs to plan for (default: all experiments)",
+    )
+    prefetch_parser.add_argument(
+        "--provider", choices=["massive", "synthetic"], default="massive"
+    )
+    prefetch_parser.add_argument("--seed", type=int, default=0)
+    prefetch_parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Option cache root (default: local.data_dir, or <data_dir>/synthetic "
+        "for the synthetic provider)",
+    )
+    prefetch_parser.add_argument(
+        "--workers", type=int, default=DEFAULT_BACKFILL_WORKERS
+    )
+    prefetch_parser.add_argument(
+        "--dry-run", action="store_true", help="Print the plan without fetching"
+    )
 
     return parser
 
 
+def _prefetch_options(args: argparse.Namespace) -> int:
+    experiment_ids = args.experiments or list_experiments()
+    plan = plan_contracts(
+        iter_experiment_runs([EXPERIMENTS_ROOT / value for value in experiment_ids])
+    )
+    print(f"Plan: {plan.describe()}")
+    if args.dry_run or not len(plan):
+        return 0
+
+    if args.provider == "synthetic":
+        provider = SyntheticMarketDataProvider(seed=args.seed)
+        data_dir = load_local_paths().synthetic_data_dir
+    else:
+        config = load_config()
+        if config.massive is None:
+            print("Error: MASSIVE_API_KEY is required for --provider massive")
+            return 1
+        provider = MassiveMarketDataProvider(config.massive)
+        data_dir = config.local.data_dir
+    summary = prefetch_plan(
+        plan, OptionBarCache(args.data_dir or data_dir), provider, args.workers
+    )
+    print(f"Done. {summary.describe()}")
+    return 0 if summary.ok else 1
+
+
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
@@ -52,10 +152,17 @@ def main() -> None:
             run_id=args.run_id,
             spy_1m_path=args.spy_1m_path,
             max_trades_per_day=args.max_trades_per_day,
+            rearm=args.rearm,
             no_entries_after=args.no_entries_after,
+            streaming=args.streaming,
+            orb_engine=args.orb_engine,
+            workers=args.workers,
+            shard_sessions=args.shard_sessions,
         )
         run_dir = run_pass1_pipeline(config)
         print(f"Pass 1 run complete. Outputs saved to {Path(run_dir)}")
+    elif args.command == "prefetch-options":
+        raise SystemExit(_prefetch_options(args))
 
 
 if __name__ == "__main__":
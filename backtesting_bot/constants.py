@@ -8,3 +8,5 @@ SESSION_END = dt.time(16, 0)
 DEFAULT_SPY_1M_PATH = "data_local/spy_1m.parquet"
 DEFAULT_ORB_CANDLES = 3
 DEFAULT_MAX_TRADES_PER_DAY = 1
+DEFAULT_BAR_CACHE_MB = 2048
+DEFAULT_SHARD_SESSIONS = 20
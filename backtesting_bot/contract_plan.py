@@ -0,0 +1,172 @@
+"""Plan the option contracts a sweep needs before it runs.
+
+Each pass1 entry, combined with an experiment's ``ContractSelectionParams``,
+names one contract per DTE and OTM choice. ``plan_contracts`` deduplicates
+those across every entries file and experiment into a ``ContractPlan``: one
+row per ``(trade_date, contract)`` with the minute window it is needed for
+(earliest entry to the session close). ``prefetch_plan`` then fills the option
+cache for the whole plan in one concurrent batch, so experiments sharing
+entries never download the same contract twice.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import pandas as pd
+
+from backtesting_bot.constants import MARKET_TIMEZONE, SESSION_END
+from backtesting_bot.experiment_config import ContractSelectionParams, ExperimentConfig
+from src.cache.backfill import (
+    DEFAULT_BACKFILL_WORKERS,
+    BackfillSummary,
+    backfill_options,
+)
+from src.cache.option_cache import OptionBarCache
+from src.providers.base import OptionContract, OptionsDataProvider
+
+PLAN_COLUMNS = ["trade_date", "contract", "window_start", "window_end", "entries"]
+
+
+def strike_for(price: float, direction: str, dollars: int, prefer_otm: bool) -> int:
+    """Strike ``dollars`` away from ``price`` on the OTM (or ITM) side.
+
+    ``dollars == 1`` is the first whole-dollar strike past the price, matching
+    ``option_strikes._strike_ladder``.
+    """
+    if direction not in {"CALL", "PUT"}:
+        raise ValueError("direction must be CALL or PUT")
+    above = direction == "CALL" if prefer_otm else direction == "PUT"
+    step = max(dollars, 1) - 1
+    if above:
+        return math.ceil(price) + step
+    return math.floor(price) - step
+
+
+def expiry_for(trade_date: dt.date, dte: int) -> dt.date:
+    """Expiry ``dte`` weekdays after ``trade_date`` (0 is same-day)."""
+    return (pd.Timestamp(trade_date) + pd.offsets.BDay(dte)).date()
+
+
+def select_contracts(
+    trade_date: dt.date,
+    direction: str,
+    price: float,
+    params: ContractSelectionParams,
+    underlying: str = "SPY",
+) -> list[OptionContract]:
+    """Contracts an entry may trade under ``params``, one per DTE and OTM choice."""
+    right = "C" if direction == "CALL" else "P"
+    return [
+        OptionContract(
+            underlying,
+            expiry_for(trade_date, dte),
+            float(strike_for(price, direction, dollars, params.prefer_otm)),
+            right,
+        )
+        for dte in params.dte_choices
+        for dollars in params.otm_dollars
+    ]
+
+
+def _session_close(trade_date: dt.date) -> pd.Timestamp:
+    close = dt.datetime.combine(trade_date, SESSION_END)
+    return pd.Timestamp(close, tz=MARKET_TIMEZONE).tz_convert("UTC")
+
+
+@dataclass(frozen=True)
+class ContractPlan:
+    """Deduplicated ``(trade_date, contract)`` requests with their minute windows."""
+
+    frame: pd.DataFrame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def trade_dates(self) -> list[dt.date]:
+        return sorted(set(self.frame["trade_date"]))
+
+    def by_trade_date(self) -> dict[dt.date, list[OptionContract]]:
+        grouped: dict[dt.date, list[OptionContract]] = {}
+        pairs = zip(self.frame["trade_date"], self.frame["contract"])
+        for trade_date, contract in pairs:
+            grouped.setdefault(trade_date, []).append(contract)
+        return grouped
+
+    def describe(self) -> str:
+        requested = int(self.frame["entries"].sum()) if len(self) else 0
+        return (
+            f"{len(self)} contract-sessions over {len(self.trade_dates)} trade dates "
+            f"({requested} entry requests before deduplication)"
+        )
+
+
+def plan_contracts(
+    runs: Iterable[tuple[pd.DataFrame, ContractSelectionParams]],
+    underlying: str = "SPY",
+) -> ContractPlan:
+    """Deduplicate the contracts needed by ``(entries, params)`` pairs."""
+    windows: dict[tuple[dt.date, OptionContract], list] = {}
+    for entries, params in runs:
+        for trade_date_text, direction, price, entry_ts in zip(
+            entries["trade_date"],
+            entries["direction"],
+            entries["spy_price_at_entry"],
+            entries["entry_ts"],
+        ):
+            trade_date = dt.date.fromisoformat(str(trade_date_text))
+            entry_ts = pd.Timestamp(entry_ts)
+            if entry_ts.tzinfo is None:
+                entry_ts = entry_ts.tz_localize("UTC")
+            for contract in select_contracts(
+                trade_date, direction, float(price), params, underlying
+            ):
+                window = windows.get((trade_date, contract))
+                if window is None:
+                    windows[(trade_date, contract)] = [
+                        entry_ts,
+                        _session_close(trade_date),
+                        1,
+                    ]
+                else:
+                    window[0] = min(window[0], entry_ts)
+                    window[2] += 1
+
+    rows = [
+        (trade_date, contract, start, end, count)
+        for (trade_date, contract), (start, end, count) in sorted(windows.items())
+    ]
+    return ContractPlan(pd.DataFrame(rows, columns=PLAN_COLUMNS))
+
+
+def iter_experiment_runs(
+    experiment_dirs: Sequence[Path],
+) -> Iterator[tuple[pd.DataFrame, ContractSelectionParams]]:
+    """Yield each experiment's pass1 entries with its contract selection."""
+    for experiment_dir in experiment_dirs:
+        experiment_dir = Path(experiment_dir)
+        entries_path = experiment_dir / "pass1" / "entries.parquet"
+        config_path = experiment_dir / "config_snapshot" / "experiment.yaml"
+        if not entries_path.exists() or not config_path.exists():
+            continue
+        config = ExperimentConfig.from_yaml(config_path)
+        entries = pd.read_parquet(
+            entries_path,
+            columns=["trade_date", "entry_ts", "direction", "spy_price_at_entry"],
+        )
+        yield entries, config.contract
+
+
+def prefetch_plan(
+    plan: ContractPlan,
+    cache: OptionBarCache,
+    provider: OptionsDataProvider,
+    workers: int = DEFAULT_BACKFILL_WORKERS,
+) -> BackfillSummary:
+    """Fetch every planned contract that is not cached yet, concurrently."""
+    return backfill_options(cache, provider, plan.by_trade_date(), workers=workers)
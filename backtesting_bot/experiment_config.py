@@ -16,6 +16,7 @@ class OrbParams:
     confirm_full_candle: bool
     max_trades_per_day: int
     no_entries_after: dt.time | None
+    rearm: str = "inside"
 
 
 @dataclass(frozen=True)
@@ -82,6 +83,7 @@ class ExperimentConfig:
                 if orb_payload.get("no_entries_after")
                 else None
             ),
+            rearm=str(orb_payload.get("rearm", "inside")),
         )
         exit_payload = payload["exit"]
         exit_params = ExitParams(
@@ -40,7 +40,10 @@ def _experiment_root() -> Path:
 
 
 def run_experiment(
-    config: ExperimentConfig, experiment_id: str | None = None, spy_1m_path: str = DEFAULT_SPY_1M_PATH
+    config: ExperimentConfig,
+    experiment_id: str | None = None,
+    spy_1m_path: str = DEFAULT_SPY_1M_PATH,
+    streaming: bool = False,
 ) -> ExperimentResult:
     experiment_id = experiment_id or generate_experiment_id(config.test_name)
     experiment_dir = _experiment_root() / experiment_id
@@ -60,7 +63,9 @@ def run_experiment(
         candle_interval_minutes=config.orb.candle_interval_minutes,
         breakout_basis=config.orb.breakout_basis,
         confirm_full_candle=config.orb.confirm_full_candle,
+        rearm=config.orb.rearm,
         output_dir=pass1_dir,
+        streaming=streaming,
     )
     run_pass1_pipeline(pass1_config)
 
@@ -74,6 +79,7 @@ def run_experiment(
         exit_params=config.exit,
         account_params=config.account,
         output_dir=pass2_dir,
+        streaming=streaming,
     )
     run_pass2_pipeline(pass2_config, entries_df)
 
@@ -0,0 +1,257 @@
+"""Strategy-declared indicator features, computed lazily and persisted.
+
+A strategy lists the ``FeatureSpec``s it reads; pass 1 adds exactly those
+columns to the bars and nothing else. Each feature is stored under the
+``FeatureStore`` root as::
+
+    <indicator>/period=<N>/timeframe=<TF>/reset=<R>/version=<V>/<start>_<end>.parquet
+
+where ``R`` is ``session`` for features restarting every session (``none``
+otherwise) and ``V`` identifies the bar source (cache manifest version or
+file mtime), so a sweep re-running the same range reads the stored values
+and a refreshed cache computes new ones. Features that do not reset run over
+the whole loaded range, so the range is part of the key. Missing features
+are computed together, one ``IndicatorKernel`` pass per reset mode. Saving a
+feature prunes its values stored under other versions, which a changed bar
+source can never read again.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import math
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backtesting_bot.indicator_kernels import IndicatorKernel, KernelState
+from backtesting_bot.sessions import SessionBars, epoch_day, price_values
+
+FEATURE_STORE_DIR_NAME = "features"
+TIMEFRAMES = ("1m",)
+INDICATORS = ("ema", "rsi")
+
+FEATURE_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("ns", tz="UTC")),
+        ("value", pa.float64()),
+    ]
+)
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """One indicator column: ``indicator`` over ``timeframe`` closes."""
+
+    name: str
+    indicator: str
+    period: int
+    timeframe: str = "1m"
+    session_reset: bool = False
+
+    def __post_init__(self) -> None:
+        if self.indicator not in INDICATORS:
+            raise ValueError(f"Unsupported indicator: {self.indicator}")
+        if self.timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unsupported feature timeframe: {self.timeframe}")
+        if self.period < 1:
+            raise ValueError("Feature period must be at least 1")
+
+    @property
+    def kernel_name(self) -> str:
+        return f"{self.indicator}_{self.period}"
+
+
+def warmup_bars(specs: Sequence[FeatureSpec]) -> int:
+    """Bars of history after which ``specs`` no longer depend on where the data
+    starts, up to floating-point rounding.
+
+    Features that reset every session need none. ``indicators.rsi`` averages
+    gains and losses over a plain rolling window (not Wilder smoothing), so an
+    RSI only sees its last ``period`` deltas. An EMA needs enough bars for the
+    seed's weight ``(1 - alpha) ** n`` to fall below double precision.
+    """
+    bars = 0
+    for spec in specs:
+        if spec.session_reset:
+            continue
+        if spec.indicator == "rsi":
+            bars = max(bars, spec.period)
+        elif spec.period > 1:
+            decay = 1 - 2 / (spec.period + 1)
+            bars = max(bars, math.ceil(-53 * math.log(2) / math.log(decay)))
+    return bars
+
+
+def feature_kernels(
+    specs: Sequence[FeatureSpec],
+) -> list[tuple[IndicatorKernel, list[FeatureSpec]]]:
+    """One kernel per reset mode, covering every spec of that mode."""
+    groups: list[tuple[IndicatorKernel, list[FeatureSpec]]] = []
+    for session_reset in (False, True):
+        members = [spec for spec in specs if spec.session_reset == session_reset]
+        if not members:
+            continue
+        kernel = IndicatorKernel(
+            ema_spans=tuple(
+                sorted({spec.period for spec in members if spec.indicator == "ema"})
+            ),
+            rsi_periods=tuple(
+                sorted({spec.period for spec in members if spec.indicator == "rsi"})
+            ),
+            session_reset=session_reset,
+        )
+        groups.append((kernel, members))
+    return groups
+
+
+def compute_features(
+    bars: SessionBars, specs: Sequence[FeatureSpec]
+) -> dict[str, np.ndarray]:
+    """Values of ``specs`` over ``bars``, keyed by feature name."""
+    close = price_values(bars.frame, "close")
+    session_ids = np.repeat(
+        [epoch_day(value) for value in bars.dates], bars.stops - bars.starts
+    )
+    columns: dict[str, np.ndarray] = {}
+    for kernel, members in feature_kernels(specs):
+        values = kernel.compute(close, session_ids)
+        columns.update((spec.name, values[spec.kernel_name]) for spec in members)
+    return columns
+
+
+def feature_store_root(spy_1m_path: str | Path) -> Path:
+    """Default store location: next to the bar source, never inside a cache.
+
+    A parquet file gets ``features/`` in its directory; a cache directory
+    (``<data_dir>``, ``<data_dir>/spy`` or ``<data_dir>/spy/1m``) gets
+    ``<data_dir>/features``.
+    """
+    path = Path(spy_1m_path).resolve()
+    if not path.is_dir():
+        return path.parent / FEATURE_STORE_DIR_NAME
+    if path.name == "1m" and path.parent.name == "spy":
+        path = path.parent.parent
+    elif path.name == "spy":
+        path = path.parent
+    return path / FEATURE_STORE_DIR_NAME
+
+
+@dataclass(frozen=True)
+class FeatureStore:
+    root_dir: Path
+
+    def path(self, spec: FeatureSpec, version: str, bars: SessionBars) -> Path:
+        start, end = bars.dates[0], bars.dates[-1]
+        return (
+            Path(self.root_dir)
+            / spec.indicator
+            / f"period={spec.period}"
+            / f"timeframe={spec.timeframe}"
+            / f"reset={'session' if spec.session_reset else 'none'}"
+            / f"version={version}"
+            / f"{start}_{end}.parquet"
+        )
+
+    def load(
+        self, spec: FeatureSpec, version: str, bars: SessionBars
+    ) -> np.ndarray | None:
+        """Stored values of ``spec`` for ``bars``, or None if absent or stale."""
+        path = self.path(spec, version, bars)
+        if not path.exists():
+            return None
+        table = pq.read_table(path, schema=FEATURE_SCHEMA)
+        timestamps = table.column("timestamp").to_numpy().astype(np.int64)
+        if not np.array_equal(timestamps, bars.frame.index.as_unit("ns").asi8):
+            return None
+        return table.column("value").to_numpy(zero_copy_only=False)
+
+    def save(
+        self,
+        spec: FeatureSpec,
+        version: str,
+        bars: SessionBars,
+        values: np.ndarray,
+    ) -> Path:
+        path = self.path(spec, version, bars)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.table(
+            {
+                "timestamp": pa.array(
+                    bars.frame.index.as_unit("ns").asi8,
+                    type=FEATURE_SCHEMA.field("timestamp").type,
+                ),
+                "value": pa.array(values, type=pa.float64()),
+            },
+            schema=FEATURE_SCHEMA,
+        )
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        self._prune(path.parent)
+        return path
+
+    def _prune(self, version_dir: Path) -> None:
+        """Drop this feature's values stored for other bar source versions."""
+        for sibling in version_dir.parent.iterdir():
+            if sibling.name.startswith("version=") and sibling != version_dir:
+                shutil.rmtree(sibling, ignore_errors=True)
+
+
+def add_features(
+    bars: SessionBars,
+    specs: Sequence[FeatureSpec],
+    store: FeatureStore | None = None,
+    version: str | None = None,
+) -> SessionBars:
+    """Return ``bars`` with one column per spec, reading ``store`` where possible.
+
+    Without specs the bars are returned as they are, without copying.
+    """
+    if not specs or bars.empty:
+        return bars
+    persist = store is not None and version is not None
+    columns: dict[str, np.ndarray] = {}
+    if persist:
+        for spec in specs:
+            values = store.load(spec, version, bars)
+            if values is not None:
+                columns[spec.name] = values
+    missing = [spec for spec in specs if spec.name not in columns]
+    if missing:
+        computed = compute_features(bars, missing)
+        if persist:
+            for spec in missing:
+                store.save(spec, version, bars, computed[spec.name])
+        columns.update(computed)
+    return bars.with_frame(
+        bars.frame.assign(**{spec.name: columns[spec.name] for spec in specs})
+    )
+
+
+class FeatureStream:
+    """Features for sessions arriving one at a time, carried across sessions."""
+
+    def __init__(self, specs: Sequence[FeatureSpec]) -> None:
+        self._groups = feature_kernels(specs)
+        self._states: list[KernelState | None] = [None] * len(self._groups)
+
+    def add(self, trade_date: dt.date, day_df: pd.DataFrame) -> pd.DataFrame:
+        if not self._groups or day_df.empty:
+            return day_df
+        close = day_df["close"].to_numpy(dtype=np.float64)
+        session_ids = np.full(len(close), epoch_day(trade_date))
+        columns: dict[str, np.ndarray] = {}
+        for position, (kernel, members) in enumerate(self._groups):
+            values, self._states[position] = kernel.update(
+                self._states[position], close, session_ids
+            )
+            columns.update((spec.name, values[spec.kernel_name]) for spec in members)
+        return day_df.assign(**columns)
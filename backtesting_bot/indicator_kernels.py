@@ -0,0 +1,255 @@
+"""Batch EMA and RSI kernels over session-indexed close arrays.
+
+``IndicatorKernel`` computes every requested EMA span and RSI period in one
+pass over a flat close array with a session id per bar:
+
+- EMAs (``adjust=False``, seeded with the first close, as ``indicators.ema``)
+  are evaluated in closed form for all sessions and spans at once, with
+  sessions laid side by side by minute-of-session. A segment that continues
+  an earlier EMA instead of reseeding is then fixed up: its value ``j`` bars
+  in gains ``d ** (j + 1) * (carried - first_close)``, where ``d = 1 - alpha``.
+- RSIs (simple averages of gains and losses, as ``indicators.rsi``) come from
+  one cumulative sum of gains, losses and valid deltas, differenced per
+  period.
+
+With ``session_reset`` each session starts from scratch; otherwise values run
+on across sessions like the pandas versions over the concatenated series.
+``update`` threads a ``KernelState`` between calls so live bars can be added
+as they arrive.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# EMAs work on segments of at most this many bars: long enough to batch many
+# bars per operation, short enough that decay ** -SEGMENT_ROWS stays finite.
+SEGMENT_ROWS = 512
+
+
+@dataclass(frozen=True)
+class KernelState:
+    """What ``IndicatorKernel.update`` needs to continue after the last bar."""
+
+    ema: np.ndarray
+    closes: np.ndarray
+    session: int
+
+
+def _segments(
+    session_ids: np.ndarray, split: bool
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Segment starts, stops and whether each starts a new session."""
+    n = len(session_ids)
+    session_starts = np.flatnonzero(np.diff(session_ids, prepend=session_ids[0] - 1))
+    session_stops = np.append(session_starts[1:], n)
+    if not split:
+        return session_starts, session_stops, np.ones(len(session_starts), bool)
+    chunks = -(-(session_stops - session_starts) // SEGMENT_ROWS)
+    first_chunk = np.cumsum(chunks) - chunks
+    chunk = np.arange(int(chunks.sum())) - np.repeat(first_chunk, chunks)
+    starts = np.repeat(session_starts, chunks) + chunk * SEGMENT_ROWS
+    stops = np.append(starts[1:], n)
+    return starts, stops, chunk == 0
+
+
+def _ema_many(
+    close: np.ndarray,
+    session_ids: np.ndarray,
+    spans: np.ndarray,
+    session_reset: bool,
+    initial: np.ndarray | None,
+) -> np.ndarray:
+    alpha = 2.0 / (spans + 1.0)
+    decay = 1.0 - alpha
+    starts, stops, new_session = _segments(session_ids, split=True)
+    lengths = stops - starts
+
+    # Lay segments out as padded rows of bar positions, one block per span.
+    width = int(lengths.max())
+    segment_of_row = np.repeat(np.arange(len(starts)), lengths)
+    position = np.arange(len(close)) - starts[segment_of_row]
+    flat = segment_of_row * width + position
+    padded = np.zeros(len(starts) * width)
+    padded[flat] = close
+    padded = padded.reshape(len(starts), width)
+
+    # Within a segment y_j = d^j * (x_0 + alpha * sum_{0<i<=j} x_i * d^-i), so
+    # one cumulative sum per span replaces stepping bar by bar. Segments are
+    # short enough that d^-j stays finite for every span above 1 (d >= 1/3);
+    # span 1 (d = 0) is the close itself.
+    stepping = decay > 0
+    safe_decay = np.where(stepping, decay, 1.0)
+    inverse = safe_decay[:, None] ** -np.arange(width)
+    steps = padded[None, :, :] * (alpha[:, None] * inverse)[:, None, :]
+    steps[:, :, 0] = padded[:, 0]
+    np.cumsum(steps, axis=2, out=steps)
+    steps /= inverse[:, None, :]
+    steps[~stepping] = padded
+
+    continues = ~new_session if session_reset else np.ones(len(starts), bool)
+    continues[0] = initial is not None
+    if continues.any():
+        # powers[:, j] = decay ** (j + 1), the weight of a carried value j bars in.
+        powers = decay[:, None] ** np.arange(1, width + 1)
+        # A continuing segment's correction c_s = carried - first close, where
+        # carried is the previous segment's corrected last value:
+        # c_s = (last_{s-1} - x0_s) + decay ** len_{s-1} * c_{s-1}.
+        first_close = close[starts]
+        base = np.zeros((len(spans), len(starts)))
+        base[:, 1:] = steps[:, np.arange(len(starts) - 1), lengths[:-1] - 1]
+        base[:, 1:] -= first_close[1:]
+        if initial is not None:
+            base[:, 0] = initial - first_close[0]
+        carry = np.zeros((len(spans), len(starts)))
+        carry[:, 1:] = powers[:, lengths[:-1] - 1]
+        flags = continues.tolist()
+        correction = np.zeros((len(spans), len(starts)))
+        for row in range(len(spans)):
+            values = []
+            previous = 0.0
+            for flag, offset, weight in zip(
+                flags, base[row].tolist(), carry[row].tolist()
+            ):
+                previous = offset + weight * previous if flag else 0.0
+                values.append(previous)
+            correction[row] = values
+        steps += correction[:, :, None] * powers[:, None, :]
+    return steps.reshape(len(spans), -1)[:, flat]
+
+
+def _window_sums(cumulative: np.ndarray, period: int) -> np.ndarray:
+    return cumulative[period:] - cumulative[:-period]
+
+
+def _rsi_many(
+    close: np.ndarray,
+    session_ids: np.ndarray,
+    periods: np.ndarray,
+    session_reset: bool,
+) -> np.ndarray:
+    delta = np.diff(close, prepend=np.nan)
+    valid = ~np.isnan(delta)
+    if session_reset:
+        starts, _, _ = _segments(session_ids, split=False)
+        valid[starts] = False
+    gain = np.where(valid & (delta > 0), delta, 0.0)
+    loss = np.where(valid & (delta < 0), -delta, 0.0)
+
+    def _cumulative(values: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0], np.cumsum(values)))
+
+    gains, losses = _cumulative(gain), _cumulative(loss)
+    valid_count = _cumulative(valid.astype(np.int64))
+    gain_count = _cumulative((gain > 0).astype(np.int64))
+    loss_count = _cumulative((loss > 0).astype(np.int64))
+
+    out = np.full((len(periods), len(close)), np.nan)
+    for row, period in enumerate(periods.tolist()):
+        if period > len(close):
+            continue
+        full = _window_sums(valid_count, period) == period
+        # Counting moves keeps windows without gains (or losses) exactly zero.
+        up = np.where(
+            _window_sums(gain_count, period) > 0, _window_sums(gains, period), 0.0
+        )
+        down = np.where(
+            _window_sums(loss_count, period) > 0, _window_sums(losses, period), 0.0
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = 100 - 100 / (1 + up / down)
+        out[row, period - 1 :] = np.where(full, values, np.nan)
+    return out
+
+
+@dataclass(frozen=True)
+class IndicatorKernel:
+    """EMAs of ``ema_spans`` and RSIs of ``rsi_periods`` in one pass.
+
+    Results are keyed ``ema_<span>`` and ``rsi_<period>``.
+    """
+
+    ema_spans: tuple[int, ...] = ()
+    rsi_periods: tuple[int, ...] = ()
+    session_reset: bool = False
+
+    def __post_init__(self) -> None:
+        if any(value < 1 for value in (*self.ema_spans, *self.rsi_periods)):
+            raise ValueError("EMA spans and RSI periods must be at least 1")
+
+    @property
+    def names(self) -> list[str]:
+        return [f"ema_{span}" for span in self.ema_spans] + [
+            f"rsi_{period}" for period in self.rsi_periods
+        ]
+
+    def compute(
+        self, close: np.ndarray, session_ids: np.ndarray | None = None
+    ) -> dict[str, np.ndarray]:
+        values, _ = self.update(None, close, session_ids)
+        return values
+
+    def update(
+        self,
+        state: KernelState | None,
+        close: np.ndarray,
+        session_ids: np.ndarray | None = None,
+    ) -> tuple[dict[str, np.ndarray], KernelState | None]:
+        """Values for bars following ``state`` (None to start fresh), and the new state.
+
+        ``session_ids`` labels each bar's session (all one session if None);
+        with ``session_reset`` the first bars only continue ``state`` if they
+        belong to the same session.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        if session_ids is None:
+            session_ids = np.zeros(len(close), dtype=np.int64)
+        session_ids = np.asarray(session_ids, dtype=np.int64)
+        if len(close) == 0:
+            return {name: np.empty(0) for name in self.names}, state
+
+        continues = state is not None and (
+            not self.session_reset or int(session_ids[0]) == state.session
+        )
+        values: dict[str, np.ndarray] = {}
+        ema_last = np.empty(0)
+        if self.ema_spans:
+            emas = _ema_many(
+                close,
+                session_ids,
+                np.asarray(self.ema_spans, dtype=np.float64),
+                self.session_reset,
+                state.ema if continues else None,
+            )
+            values.update(
+                (f"ema_{span}", row) for span, row in zip(self.ema_spans, emas)
+            )
+            ema_last = emas[:, -1].copy()
+
+        carried = state.closes if continues else np.empty(0)
+        history = np.concatenate((carried, close))
+        history_ids = np.concatenate(
+            (np.full(len(carried), session_ids[0]), session_ids)
+        )
+        if self.rsi_periods:
+            rsis = _rsi_many(
+                history,
+                history_ids,
+                np.asarray(self.rsi_periods, dtype=np.int64),
+                self.session_reset,
+            )[:, len(carried) :]
+            values.update(
+                (f"rsi_{period}", row) for period, row in zip(self.rsi_periods, rsis)
+            )
+
+        keep_from = len(history) - max(self.rsi_periods, default=0)
+        if self.session_reset:
+            earlier = np.flatnonzero(history_ids != history_ids[-1])
+            if len(earlier):
+                keep_from = max(keep_from, int(earlier[-1]) + 1)
+        tail = history[max(keep_from, 0) :].copy()
+        return values, KernelState(
+            ema=ema_last, closes=tail, session=int(session_ids[-1])
+        )
@@ -1,13 +1,32 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import heapq
+import os
 from pathlib import Path
+from typing import Iterator, Sequence
 
 import json
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
-from backtesting_bot.constants import MARKET_TIMEZONE
+from backtesting_bot.bar_cache import get_bar_cache
+from backtesting_bot.bar_store import BarStore, store_path
+from backtesting_bot.cache_reader import (
+    TIMESTAMP_COLUMNS,
+    BarPiece,
+    cache_session_dates,
+    combine_pieces,
+    iter_cache_sessions,
+    read_cache_sessions,
+)
+from backtesting_bot.sessions import EPOCH_DATE, SessionBars, epoch_day, session_days
+from src.cache.manifest import cache_version
 
 
 def _ensure_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
@@ -16,7 +35,7 @@ def _ensure_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
         df.index.name = df.index.name or "timestamp"
         return df
 
-    for column in ("timestamp", "ts", "datetime"):
+    for column in TIMESTAMP_COLUMNS:
         if column in df.columns:
             df = df.set_index(column)
             return df
@@ -30,51 +49,220 @@ def _normalize_timezone(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
     return index.tz_convert("UTC")
 
 
-def _date_range(start: dt.date, end: dt.date) -> list[dt.date]:
-    days: list[dt.date] = []
-    current = start
-    while current <= end:
-        days.append(current)
-        current += dt.timedelta(days=1)
-    return days
-
-
-def _load_spy_cache(path: Path, start: dt.date, end: dt.date) -> pd.DataFrame:
+def _resolve_cache_root(path: Path) -> Path:
     base = path if path.is_dir() else path.parent
     if base.name == "1m" and base.parent.name == "spy":
-        cache_root = base
-    elif base.name == "spy":
-        cache_root = base / "1m"
-    else:
-        cache_root = base / "spy" / "1m"
+        return base
+    if base.name == "spy":
+        return base / "1m"
+    return base / "spy" / "1m"
+
+
+def _prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = _ensure_datetime_index(df)
+    df.index = _normalize_timezone(df.index)
+    return df
+
+
+def _load_spy_cache(
+    path: Path, start: dt.date, end: dt.date, columns: Sequence[str] | None = None
+) -> list[BarPiece]:
+    cache_root = _resolve_cache_root(path)
 
-    frames: list[pd.DataFrame] = []
-    for session_date in _date_range(start, end):
-        date_path = cache_root / f"date={session_date.isoformat()}" / "data.parquet"
-        if date_path.exists():
-            frames.append(pd.read_parquet(date_path))
+    pieces: list[BarPiece] = []
+    covered: set[dt.date] = set()
+    store = BarStore.open(cache_root)
+    if store is not None:
+        covered = set(store.sessions_between(start, end))
+        if covered:
+            pieces.append(store.read(start, end, columns=columns))
 
-    if not frames:
+    # Sessions fetched after the store was last built still live in the
+    # cache partitions, so fall back to them for anything not covered.
+    pieces.extend(read_cache_sessions(cache_root, start, end, covered, columns))
+    if not pieces:
         raise FileNotFoundError(
             f"No SPY cache files found under {cache_root} for {start} to {end}."
         )
-    return pd.concat(frames, ignore_index=True)
+    return pieces
 
 
-def load_spy_1m_bars(path: str | Path, start: dt.date, end: dt.date) -> pd.DataFrame:
-    path = Path(path)
+def _source_signature(path: Path) -> tuple:
+    if path.is_file():
+        stat = path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
+    cache_root = _resolve_cache_root(path)
+    store = store_path(cache_root)
+    store_mtime = store.stat().st_mtime_ns if store.exists() else None
+    return (store_mtime, cache_version(cache_root))
+
+
+def source_version(path: str | Path) -> str:
+    """Short digest that changes whenever the bar source at ``path`` changes."""
+    signature = _source_signature(Path(path).resolve())
+    return hashlib.sha1(repr(signature).encode()).hexdigest()[:16]
+
+
+def load_spy_1m_bars(
+    path: str | Path,
+    start: dt.date,
+    end: dt.date,
+    columns: Sequence[str] | None = None,
+    use_cache: bool = True,
+) -> SessionBars:
+    path = Path(path).resolve()
+    if not use_cache:
+        return _read_spy_1m_bars(path, start, end, columns)
+
+    cache = get_bar_cache()
+    signature = _source_signature(path)
+    bars = cache.get(path, start, end, columns, signature)
+    if bars is None:
+        bars = _read_spy_1m_bars(path, start, end, columns)
+        cache.put(path, start, end, columns, signature, bars)
+    return bars
+
+
+def _read_parquet_window(path: Path, start: dt.date, end: dt.date) -> pd.DataFrame:
+    """Rows of a single parquet file within a day of ``start``..``end``.
+
+    The timestamp filter is pushed into the read, so a shard only loads its own
+    row groups; the day of slack covers ET vs UTC timestamps and the exact range
+    is cut after the timezone is normalized. Files without a timestamp column
+    are read whole.
+    """
+    schema = pq.read_schema(path)
+    column = next((name for name in TIMESTAMP_COLUMNS if name in schema.names), None)
+    if column is None or not pa.types.is_timestamp(schema.field(column).type):
+        return pd.read_parquet(path)
+    field_type = schema.field(column).type
+    lower = dt.datetime.combine(start - dt.timedelta(days=1), dt.time())
+    upper = dt.datetime.combine(end + dt.timedelta(days=2), dt.time())
+    window = (pc.field(column) >= pa.scalar(lower, field_type)) & (
+        pc.field(column) < pa.scalar(upper, field_type)
+    )
+    return pq.read_table(path, filters=window).to_pandas()
+
+
+def _read_spy_1m_bars(
+    path: Path,
+    start: dt.date,
+    end: dt.date,
+    columns: Sequence[str] | None,
+) -> SessionBars:
     if path.exists() and path.is_file():
-        df = pd.read_parquet(path)
+        df = _prepare_frame(_read_parquet_window(path, start, end))
+        if columns is not None:
+            df = df[list(columns)]
+        pieces = [(df, session_days(df.index))]
     else:
-        df = _load_spy_cache(path, start, end)
-    df = _ensure_datetime_index(df)
-    df.index = _normalize_timezone(df.index)
-    df = df.sort_index()
+        pieces = _load_spy_cache(path, start, end, columns=columns)
+
+    df, days = combine_pieces(pieces)
+    mask = (days >= epoch_day(start)) & (days <= epoch_day(end))
+    if not mask.all():
+        df = df.loc[mask].copy()
+        days = days[mask]
+    return SessionBars.from_frame(df, days=days)
+
+
+def spy_1m_session_dates(
+    path: str | Path, start: dt.date, end: dt.date
+) -> list[dt.date]:
+    """Sessions with bars in ``start``..``end``, without loading the bars.
+
+    Cache directories answer from the bar store index and the manifest; a single
+    parquet file is scanned for its timestamp column only.
+    """
+    path = Path(path).resolve()
+    if path.exists() and path.is_file():
+        names = pq.read_schema(path).names
+        column = next((name for name in TIMESTAMP_COLUMNS if name in names), None)
+        frame = pd.read_parquet(path, columns=[column] if column else None)
+        index = _prepare_frame(frame).index
+        days = np.unique(session_days(index))
+        days = days[(days >= epoch_day(start)) & (days <= epoch_day(end))]
+        return [EPOCH_DATE + dt.timedelta(days=int(day)) for day in days]
+
+    cache_root = _resolve_cache_root(path)
+    store = BarStore.open(cache_root)
+    dates = set(store.sessions_between(start, end)) if store is not None else set()
+    dates.update(cache_session_dates(cache_root, start, end))
+    return sorted(dates)
+
+
+def iter_spy_1m_sessions(
+    path: str | Path,
+    start: dt.date,
+    end: dt.date,
+    columns: Sequence[str] | None = None,
+) -> Iterator[tuple[dt.date, pd.DataFrame]]:
+    """Yield ``(session_date, bars)`` for each session in ``start``..``end``.
+
+    Sessions are read one at a time from the bar store or the cache partitions,
+    so peak memory stays around one session's bars regardless of the range.
+    Streamed sessions bypass the process-wide bar cache. A single parquet file
+    cannot be read per session and is loaded whole.
+    """
+    path = Path(path).resolve()
+    if path.exists() and path.is_file():
+        yield from _read_spy_1m_bars(path, start, end, columns).items()
+        return
+
+    cache_root = _resolve_cache_root(path)
+    covered: set[dt.date] = set()
+    sources: list[Iterator[tuple[dt.date, pd.DataFrame]]] = []
+    store = BarStore.open(cache_root)
+    if store is not None:
+        covered = set(store.sessions_between(start, end))
+        sources.append(store.iter_sessions(start, end, columns=columns))
+    sources.append(iter_cache_sessions(cache_root, start, end, covered, columns))
+
+    found = False
+    for session_date, df in heapq.merge(*sources, key=lambda item: item[0]):
+        found = True
+        yield session_date, df
+    if not found:
+        raise FileNotFoundError(
+            f"No SPY cache files found under {cache_root} for {start} to {end}."
+        )
+
+
+class ParquetAppender:
+    """Write frames to one parquet file, one row group per appended frame.
+
+    The file is written under a temporary name and moved into place on
+    ``close``, so readers never see a partial file. Closing without any rows
+    still writes an empty file with ``schema``.
+    """
+
+    def __init__(self, path: str | Path, schema: pa.Schema) -> None:
+        self.path = Path(path)
+        self.schema = schema
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        self._writer = pq.ParquetWriter(self._tmp_path, schema)
+
+    def append(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self) -> "ParquetAppender":
+        return self
 
-    et_index = df.index.tz_convert(MARKET_TIMEZONE)
-    trade_date = et_index.date
-    mask = (trade_date >= start) & (trade_date <= end)
-    return df.loc[mask].copy()
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        self._writer.close()
+        self._tmp_path.unlink(missing_ok=True)
 
 
 def save_parquet(df: pd.DataFrame, path: str | Path) -> None:
@@ -67,22 +67,21 @@ def main() -> int:
 
     cache_root = Path(args.cache_root)
     try:
-        df = load_spy_1m_bars(cache_root, args.start, args.end)
+        bars = load_spy_1m_bars(
+            cache_root, args.start, args.end, columns=("high", "low")
+        )
     except FileNotFoundError as exc:
         print(f"Error: {exc}")
         return 1
 
-    if df.empty:
+    if bars.empty:
         print("No SPY 1m bars found for the requested range.")
         return 1
 
-    df = df.sort_index()
-    df.index = df.index.tz_convert(MARKET_TIMEZONE)
-
     rows: list[dict[str, object]] = []
     for session_date in _date_range(args.start, args.end):
-        mask = df.index.date == session_date
-        if not mask.any():
+        session_df = bars.session(session_date)
+        if session_df.empty:
             rows.append(
                 {
                     "date": session_date.isoformat(),
@@ -100,7 +99,7 @@ def main() -> int:
             )
             continue
 
-        session_df = df.loc[mask]
+        session_df = session_df.tz_convert(MARKET_TIMEZONE)
         orb_15 = _orb_window(session_df, session_date, 15)
         orb_30 = _orb_window(session_df, session_date, 30)
 
@@ -2,25 +2,55 @@ from __future__ import annotations
 
 import datetime as dt
 import json
-from dataclasses import dataclass
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, Sequence
 
 import pandas as pd
+import pyarrow as pa
 
 from backtesting_bot.constants import (
     DEFAULT_MAX_TRADES_PER_DAY,
+    DEFAULT_SHARD_SESSIONS,
     DEFAULT_SPY_1M_PATH,
-    MARKET_TIMEZONE,
-    SESSION_END,
-    SESSION_START,
 )
-from backtesting_bot.indicators import ema, rsi
-from backtesting_bot.io import load_spy_1m_bars, save_json, save_parquet
-from backtesting_bot.strategies.orb import (
-    calculate_orb_range,
-    find_orb_entry,
-    resample_bars,
+from backtesting_bot.io import (
+    ParquetAppender,
+    iter_spy_1m_sessions,
+    load_spy_1m_bars,
+    save_json,
+    save_parquet,
+    source_version,
+    spy_1m_session_dates,
+)
+from backtesting_bot.features import (
+    FeatureSpec,
+    FeatureStore,
+    FeatureStream,
+    add_features,
+    feature_store_root,
+    warmup_bars,
+)
+from backtesting_bot.sessions import SessionBars
+from backtesting_bot.strategies import get_strategy
+from backtesting_bot.strategies.orb import ORB_ENGINES, REARM_RULES, OrbStrategy
+
+# Bars in the shortest regular session (an early close); turns a feature
+# warm-up measured in bars into a first guess of whole sessions to load.
+MIN_SESSION_BARS = 210
+
+ENTRY_SCHEMA = pa.schema(
+    [
+        ("trade_date", pa.string()),
+        ("entry_ts", pa.timestamp("ns", tz="UTC")),
+        ("direction", pa.string()),
+        ("spy_price_at_entry", pa.float64()),
+        ("strategy_name", pa.string()),
+        ("context", pa.string()),
+    ]
 )
 
 
@@ -38,6 +68,17 @@ class Pass1Config:
     breakout_basis: str = "close"
     confirm_full_candle: bool = False
     output_dir: Path | None = None
+    streaming: bool = False
+    orb_engine: str = "vectorized"
+    rearm: str = "inside"
+    feature_store_dir: Path | None = None
+    ema_fast_period: int = 8
+    ema_slow_period: int = 21
+    rsi_period: int = 14
+    rsi_oversold: float = 30.0
+    rsi_overbought: float = 70.0
+    workers: int = 1
+    shard_sessions: int = DEFAULT_SHARD_SESSIONS
 
 
 @dataclass(frozen=True)
@@ -50,73 +91,55 @@ class EntrySignal:
     context: dict
 
 
-def _session_filter(df: pd.DataFrame) -> pd.DataFrame:
-    et_index = df.index.tz_convert(MARKET_TIMEZONE)
-    df = df.copy()
-    df["_et_ts"] = et_index
-    df = df.set_index("_et_ts")
-    df = df.between_time(SESSION_START, SESSION_END, inclusive="both")
-    return df
+def _iter_prepared_sessions(
+    sessions: Iterable[tuple[dt.date, pd.DataFrame]], specs: Sequence[FeatureSpec]
+) -> Iterator[tuple[dt.date, pd.DataFrame]]:
+    """Add ``specs`` to each session, continuing the indicators across sessions."""
+    stream = FeatureStream(specs)
+    for trade_date, day_df in sessions:
+        yield trade_date, stream.add(trade_date, day_df)
 
 
-def _iterate_trade_dates(df: pd.DataFrame) -> Iterable[dt.date]:
-    et_index = df.index.tz_convert(MARKET_TIMEZONE)
-    return pd.Index(et_index.date).unique().tolist()
-
+def _entry_signal(trade_date: dt.date, entry: dict, config: Pass1Config) -> EntrySignal:
+    return EntrySignal(
+        trade_date=trade_date,
+        entry_ts=entry["entry_ts"].tz_convert("UTC"),
+        direction=entry["direction"],
+        spy_price_at_entry=entry["spy_price_at_entry"],
+        strategy_name=config.strategy,
+        context=entry["context"],
+    )
 
-def _prepare_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["ema_fast"] = ema(df["close"], 8)
-    df["ema_slow"] = ema(df["close"], 21)
-    df["rsi_14"] = rsi(df["close"], 14)
-    return df
 
+def generate_entries(bars: SessionBars, config: Pass1Config) -> list[EntrySignal]:
+    """Entries of ``config.strategy`` over every session of ``bars``."""
+    found = get_strategy(config.strategy).find_entries(bars, config)
+    return [
+        _entry_signal(trade_date, entry, config)
+        for trade_date, day_entries in found.items()
+        for entry in day_entries
+    ]
 
-def generate_orb_entries(
-    df: pd.DataFrame, config: Pass1Config
-) -> list[EntrySignal]:
-    entries: list[EntrySignal] = []
-    for trade_date in _iterate_trade_dates(df):
-        day_mask = df.index.tz_convert(MARKET_TIMEZONE).date == trade_date
-        day_df = df.loc[day_mask]
-        if day_df.empty:
-            continue
 
-        session_df = _session_filter(day_df)
-        if session_df.empty:
-            continue
+def generate_orb_entries(bars: SessionBars, config: Pass1Config) -> list[EntrySignal]:
+    """ORB entries over every session of ``bars``, whatever ``config.strategy`` is."""
+    return generate_entries(bars, replace(config, strategy=OrbStrategy.name))
 
-        resampled_df = resample_bars(
-            session_df, interval_minutes=config.candle_interval_minutes
-        )
-        orb_candles = max(1, config.orb_minutes // config.candle_interval_minutes)
-        orb_range = calculate_orb_range(resampled_df, orb_candles=orb_candles)
-        if orb_range is None:
-            continue
-
-        entry = find_orb_entry(
-            resampled_df,
-            orb_range,
-            cutoff_time=config.no_entries_after,
-            breakout_basis=config.breakout_basis,
-            confirm_full_candle=config.confirm_full_candle,
-        )
-        if entry is None:
-            continue
-
-        entry_ts_utc = entry["entry_ts"].tz_convert("UTC")
-        entries.append(
-            EntrySignal(
-                trade_date=trade_date,
-                entry_ts=entry_ts_utc,
-                direction=entry["direction"],
-                spy_price_at_entry=entry["spy_price_at_entry"],
-                strategy_name=config.strategy,
-                context=entry["context"],
-            )
-        )
 
-    return entries
+def _entries_frame(entries: list[EntrySignal]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "trade_date": entry.trade_date.isoformat(),
+                "entry_ts": entry.entry_ts,
+                "direction": entry.direction,
+                "spy_price_at_entry": entry.spy_price_at_entry,
+                "strategy_name": entry.strategy_name,
+                "context": json.dumps(entry.context, sort_keys=True),
+            }
+            for entry in entries
+        ]
+    )
 
 
 def _build_run_metadata(entries_df: pd.DataFrame, dates: list[dt.date]) -> dict:
@@ -132,14 +155,13 @@ def _build_run_metadata(entries_df: pd.DataFrame, dates: list[dt.date]) -> dict:
     }
 
 
-def write_run_outputs(
-    entries_df: pd.DataFrame, config: Pass1Config, dates: list[dt.date]
-) -> Path:
+def _run_dir(config: Pass1Config) -> Path:
     run_dir = config.output_dir or (Path("data_local") / "runs" / config.run_id)
     run_dir.mkdir(parents=True, exist_ok=True)
+    return run_dir
 
-    save_parquet(entries_df, run_dir / "entries.parquet")
-    save_json(_build_run_metadata(entries_df, dates), run_dir / "run_metadata.json")
+
+def _write_config_snapshot(config: Pass1Config, run_dir: Path) -> None:
     save_json(
         {
             "start": config.start.isoformat(),
@@ -156,43 +178,198 @@ def write_run_outputs(
             "candle_interval_minutes": config.candle_interval_minutes,
             "breakout_basis": config.breakout_basis,
             "confirm_full_candle": config.confirm_full_candle,
+            "streaming": config.streaming,
+            "orb_engine": config.orb_engine,
+            "rearm": config.rearm,
+            "ema_fast_period": config.ema_fast_period,
+            "ema_slow_period": config.ema_slow_period,
+            "rsi_period": config.rsi_period,
+            "rsi_oversold": config.rsi_oversold,
+            "rsi_overbought": config.rsi_overbought,
+            "workers": config.workers,
+            "shard_sessions": config.shard_sessions,
         },
         run_dir / "config_snapshot.json",
     )
-    return run_dir
 
 
-def run_pass1_pipeline(config: Pass1Config) -> Path:
-    df = load_spy_1m_bars(config.spy_1m_path, config.start, config.end)
-    df = _prepare_indicators(df)
+def write_run_outputs(
+    entries_df: pd.DataFrame, config: Pass1Config, dates: list[dt.date]
+) -> Path:
+    run_dir = _run_dir(config)
+    save_parquet(entries_df, run_dir / "entries.parquet")
+    save_json(_build_run_metadata(entries_df, dates), run_dir / "run_metadata.json")
+    _write_config_snapshot(config, run_dir)
+    return run_dir
 
-    dates = list(pd.Index(df.index.tz_convert(MARKET_TIMEZONE).date).unique())
 
-    if config.strategy == "orb_v1":
-        entries = generate_orb_entries(df, config)
-    elif config.strategy in {"ema_v1", "rsi_v1"}:
-        entries = []
-    else:
-        raise ValueError(f"Unsupported strategy: {config.strategy}")
+def _check_strategy(config: Pass1Config) -> None:
+    get_strategy(config.strategy)
+    if config.orb_engine not in ORB_ENGINES:
+        raise ValueError(f"Unsupported ORB engine: {config.orb_engine}")
+    if config.rearm not in REARM_RULES:
+        raise ValueError(f"Unsupported re-arm rule: {config.rearm}")
+    if config.max_trades_per_day < 1:
+        raise ValueError("max_trades_per_day must be at least 1")
+    if config.ema_fast_period >= config.ema_slow_period:
+        raise ValueError("ema_fast_period must be shorter than ema_slow_period")
+    if not 0 <= config.rsi_oversold < config.rsi_overbought <= 100:
+        raise ValueError("RSI levels must satisfy 0 <= oversold < overbought <= 100")
+    if config.workers < 1:
+        raise ValueError("workers must be at least 1")
+    if config.shard_sessions < 1:
+        raise ValueError("shard_sessions must be at least 1")
+
+
+def _sort_entries(entries_df: pd.DataFrame) -> pd.DataFrame:
+    if entries_df.empty:
+        return entries_df
+    return entries_df.sort_values(["entry_ts", "strategy_name"]).reset_index(drop=True)
+
+
+def _load_with_warmup(
+    config: Pass1Config,
+    start: dt.date,
+    end: dt.date,
+    warmup_start: dt.date,
+    needed: int,
+    use_cache: bool,
+) -> SessionBars:
+    """Bars for ``warmup_start``..``end`` holding at least ``needed`` bars before
+    ``start`` (or every bar from ``config.start``, if there are fewer)."""
+    while True:
+        bars = load_spy_1m_bars(
+            config.spy_1m_path, warmup_start, end, use_cache=use_cache
+        )
+        history = len(bars.frame) - len(bars.between(start, end).frame)
+        if history >= needed or warmup_start <= config.start:
+            return bars
+        # Short or gappy sessions: double the warm-up span until it holds
+        # enough bars.
+        span = max(1, (start - warmup_start).days)
+        warmup_start = max(config.start, start - dt.timedelta(days=2 * span))
+
+
+def _run_shard(
+    config: Pass1Config,
+    start: dt.date,
+    end: dt.date,
+    warmup_start: dt.date | None = None,
+    use_cache: bool = True,
+) -> tuple[pd.DataFrame, list[dt.date]]:
+    """Entries and session dates for ``start``..``end``.
+
+    Indicators that carry across sessions are warmed up from ``warmup_start``
+    (widened if that holds too few bars); entries are only taken from ``start``.
+    """
+    features = get_strategy(config.strategy).features(config)
+    bars = _load_with_warmup(
+        config, start, end, warmup_start or start, warmup_bars(features), use_cache
+    )
+    bars = add_features(
+        bars,
+        features,
+        store=FeatureStore(
+            config.feature_store_dir or feature_store_root(config.spy_1m_path)
+        ),
+        version=source_version(config.spy_1m_path),
+    )
+    bars = bars.between(start, end)
+    entries_df = _entries_frame(generate_entries(bars, config))
+    return entries_df, list(bars.dates)
+
+
+def _parallel_entries(
+    config: Pass1Config,
+) -> tuple[pd.DataFrame, list[dt.date]] | None:
+    """Run shards of ``shard_sessions`` sessions on ``workers`` processes.
+
+    Returns None when the range fits in one shard, so it runs in-process.
+    """
+    dates = spy_1m_session_dates(config.spy_1m_path, config.start, config.end)
+    firsts = range(0, len(dates), config.shard_sessions)
+    if len(firsts) < 2:
+        return None
+
+    starts = [dates[first] for first in firsts]
+    ends = [
+        dates[min(first + config.shard_sessions, len(dates)) - 1] for first in firsts
+    ]
+    # Each shard only gets the date its warm-up starts from, a first guess of
+    # whole sessions from the feature warm-up in bars.
+    needed = warmup_bars(get_strategy(config.strategy).features(config))
+    lookback = math.ceil(needed / MIN_SESSION_BARS)
+    warmup_starts = [
+        dates[first - lookback] if first > lookback else config.start
+        for first in firsts
+    ]
+    with ProcessPoolExecutor(max_workers=min(config.workers, len(starts))) as pool:
+        # map yields in submission order, so the merge does not depend on
+        # which shard finishes first.
+        results = list(
+            pool.map(
+                _run_shard,
+                repeat(config),
+                starts,
+                ends,
+                warmup_starts,
+                repeat(False),
+            )
+        )
+    frames = [frame for frame, _ in results if not frame.empty]
+    entries_df = pd.concat(frames, ignore_index=True) if frames else _entries_frame([])
+    return entries_df, [date for _, shard_dates in results for date in shard_dates]
 
-    entries_df = pd.DataFrame(
-        [
-            {
-                "trade_date": entry.trade_date.isoformat(),
-                "entry_ts": entry.entry_ts,
-                "direction": entry.direction,
-                "spy_price_at_entry": entry.spy_price_at_entry,
-                "strategy_name": entry.strategy_name,
-                "context": json.dumps(entry.context, sort_keys=True),
-            }
-            for entry in entries
-        ]
+
+def run_pass1_pipeline(config: Pass1Config) -> Path:
+    """Run pass 1 over ``config.start``..``config.end``.
+
+    With ``workers`` above 1 the sessions are split into shards of
+    ``shard_sessions`` that run in a process pool, each loading only its own
+    bars plus an indicator warm-up (``features.warmup_bars``). Strategies
+    without indicators, or with indicators that reset every session, produce
+    exactly the single-process entries. Indicators carried across sessions
+    restart at each shard's warm-up, so their values agree with a single
+    process only to within floating-point rounding, and an entry can differ
+    where an indicator sits exactly on its crossing level.
+    """
+    if config.streaming:
+        return run_pass1_streaming(config)
+
+    _check_strategy(config)
+    result = _parallel_entries(config) if config.workers > 1 else None
+    if result is None:
+        result = _run_shard(config, config.start, config.end)
+    entries_df, dates = result
+    return write_run_outputs(_sort_entries(entries_df), config, dates)
+
+
+def run_pass1_streaming(config: Pass1Config) -> Path:
+    """Run pass 1 one session at a time with memory bounded by a single session.
+
+    Entries are appended to ``entries.parquet`` as one row group per session
+    that produced any, so the output matches ``run_pass1_pipeline``.
+    """
+    _check_strategy(config)
+    run_dir = _run_dir(config)
+    sessions = _iter_prepared_sessions(
+        iter_spy_1m_sessions(config.spy_1m_path, config.start, config.end),
+        get_strategy(config.strategy).features(config),
     )
 
-    if not entries_df.empty:
-        entries_df = entries_df.sort_values(["entry_ts", "strategy_name"]).reset_index(
-            drop=True
-        )
+    dates: list[dt.date] = []
+    entry_dates: list[str] = []
+    with ParquetAppender(run_dir / "entries.parquet", ENTRY_SCHEMA) as writer:
+        for trade_date, day_df in sessions:
+            dates.append(trade_date)
+            entries = generate_entries(SessionBars.from_frame(day_df), config)
+            if entries:
+                entry_dates.extend(trade_date.isoformat() for _ in entries)
+                writer.append(_entries_frame(entries))
 
-    run_dir = write_run_outputs(entries_df, config, dates)
+    save_json(
+        _build_run_metadata(pd.DataFrame({"trade_date": entry_dates}), dates),
+        run_dir / "run_metadata.json",
+    )
+    _write_config_snapshot(config, run_dir)
     return run_dir
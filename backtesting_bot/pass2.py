@@ -5,11 +5,49 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 
 from backtesting_bot.constants import MARKET_TIMEZONE, SESSION_END
 from backtesting_bot.experiment_config import AccountParams, ExitParams
-from backtesting_bot.io import load_spy_1m_bars, save_json, save_parquet
+from backtesting_bot.io import (
+    ParquetAppender,
+    iter_spy_1m_sessions,
+    load_spy_1m_bars,
+    save_json,
+    save_parquet,
+)
+from backtesting_bot.sessions import SessionBars, price_values
+
+PASS2_COLUMNS = ("high", "low", "close")
+# "vectorized" finds every trade's exit bar with array operations; "loop" is
+# the original per-bar walk. Both produce identical trades.
+EXIT_ENGINES = ("vectorized", "loop")
+# Upper bound on (trade, bar) cells the vectorized engine scans at once.
+EXIT_SCAN_ROWS = 1 << 22
+
+TRADE_SCHEMA = pa.schema(
+    [
+        ("trade_date", pa.string()),
+        ("entry_ts", pa.timestamp("ns", tz="UTC")),
+        ("exit_ts", pa.timestamp("ns", tz="UTC")),
+        ("direction", pa.string()),
+        ("entry_price", pa.float64()),
+        ("exit_price", pa.float64()),
+        ("exit_reason", pa.string()),
+        ("allocation", pa.float64()),
+        ("pnl", pa.float64()),
+        ("return_pct", pa.float64()),
+        ("partial_exit_ts", pa.timestamp("ns", tz="UTC")),
+        ("partial_exit_price", pa.float64()),
+        ("partial_pnl", pa.float64()),
+        ("runner_pnl", pa.float64()),
+    ]
+)
+EQUITY_SCHEMA = pa.schema(
+    [("timestamp", pa.timestamp("ns", tz="UTC")), ("equity", pa.float64())]
+)
 
 
 @dataclass(frozen=True)
@@ -20,6 +58,19 @@ class Pass2Config:
     exit_params: ExitParams
     account_params: AccountParams
     output_dir: Path
+    streaming: bool = False
+    exit_engine: str = "vectorized"
+
+
+@dataclass(frozen=True)
+class TradeExit:
+    """Where and why a trade closed, independent of its allocation."""
+
+    exit_ts: pd.Timestamp
+    exit_price: float
+    exit_reason: str
+    partial_exit_ts: pd.Timestamp | None = None
+    partial_exit_price: float | None = None
 
 
 def _iter_dates(entries_df: pd.DataFrame) -> Iterable[dt.date]:
@@ -89,15 +140,18 @@ def _apply_trailing_stop(
     return min(current_trail, candidate)
 
 
-def _simulate_trade(
-    entry: pd.Series,
-    day_df: pd.DataFrame,
-    exit_params: ExitParams,
-    allocation: float,
-) -> dict:
+def _entry_timestamp(entry: pd.Series) -> pd.Timestamp:
     entry_ts = pd.Timestamp(entry["entry_ts"])
     if entry_ts.tzinfo is None:
         entry_ts = entry_ts.tz_localize("UTC")
+    return entry_ts
+
+
+def _walk_exit(
+    entry: pd.Series, day_df: pd.DataFrame, exit_params: ExitParams
+) -> TradeExit | None:
+    """Exit of one trade found by stepping through its bars one at a time."""
+    entry_ts = _entry_timestamp(entry)
     entry_price = float(entry["spy_price_at_entry"])
     direction = entry["direction"]
 
@@ -107,14 +161,12 @@ def _simulate_trade(
 
     trade_df = day_df.loc[day_df.index >= entry_ts].copy()
     if trade_df.empty:
-        return {}
+        return None
 
     exit_ts = trade_df.index[-1]
     exit_price = float(trade_df.iloc[-1]["close"])
     exit_reason = "session_end"
 
-    split_pct = exit_params.split_pct
-    remaining_pct = 1 - split_pct
     partial_taken = False
     partial_exit_price = None
     partial_exit_ts = None
@@ -168,6 +220,217 @@ def _simulate_trade(
             exit_reason = reason
             break
 
+    return TradeExit(
+        exit_ts=exit_ts,
+        exit_price=exit_price,
+        exit_reason=exit_reason,
+        partial_exit_ts=partial_exit_ts,
+        partial_exit_price=partial_exit_price,
+    )
+
+
+def _first_touch(
+    target_hit: np.ndarray, stop_hit: np.ndarray, tp_first: bool
+) -> tuple[np.ndarray, np.ndarray]:
+    """Column of each row's first touch (the width if none) and whether the
+    target, rather than the stop, is hit there."""
+    touched = target_hit | stop_hit
+    width = touched.shape[1]
+    at = np.where(touched.any(axis=1), touched.argmax(axis=1), width)
+    column = np.minimum(at, width - 1)[:, None]
+    on_target = np.take_along_axis(target_hit, column, axis=1)[:, 0]
+    on_stop = np.take_along_axis(stop_hit, column, axis=1)[:, 0]
+    return at, on_target & (~on_stop | tp_first)
+
+
+def _trailing(
+    candidates: np.ndarray, floor: np.ndarray, trailing: bool
+) -> np.ndarray:
+    """Stop level per bar: the best trail candidate so far, never below ``floor``."""
+    if not trailing:
+        return np.broadcast_to(floor, candidates.shape)
+    return np.maximum(np.maximum.accumulate(candidates, axis=1), floor)
+
+
+def _scan_exits(
+    entries: pd.DataFrame,
+    frame: pd.DataFrame,
+    starts: np.ndarray,
+    stops: np.ndarray,
+    exit_params: ExitParams,
+) -> list[TradeExit | None]:
+    """Exits of every entry found with array operations instead of a bar loop.
+
+    Entry ``i`` trades the bars ``starts[i]:stops[i]`` of ``frame`` from its
+    entry time on. Trades are laid out as rows of a (trade, bar) grid, with
+    PUT prices negated so every comparison reads as for a CALL. A trailing
+    stop is then the running max of the bars' trail candidates, floored at the
+    phase's starting stop, and each phase is a first-touch search: before a
+    partial take-profit the initial stop and first target are watched next to
+    the trailing stop and final target; after it, the runner's trail restarts
+    from the partial fill price.
+    """
+    timestamps = frame.index.as_unit("ns").asi8
+    entry_index = pd.DatetimeIndex(entries["entry_ts"])
+    if entry_index.tz is None:
+        entry_index = entry_index.tz_localize("UTC")
+    first = np.clip(
+        np.searchsorted(timestamps, entry_index.as_unit("ns").asi8), starts, stops
+    )
+    lengths = stops - first
+
+    entry_price = entries["spy_price_at_entry"].to_numpy(dtype=np.float64)
+    is_call = (entries["direction"] == "CALL").to_numpy()
+    sign = np.where(is_call, 1.0, -1.0)
+
+    def _level(pct: float, favourable: bool) -> np.ndarray:
+        above, below = entry_price * (1 + pct), entry_price * (1 - pct)
+        return sign * np.where(is_call == favourable, above, below)
+
+    stop_price = _level(exit_params.stop_loss_pct, False)
+    target = _level(exit_params.take_profit_pct, True)
+    first_target = _level(exit_params.first_tp_pct, True)
+    partial = exit_params.partial_tp_enabled
+    trailing = exit_params.trailing_enabled
+    trail_pct = exit_params.runner_trail_pct if partial else exit_params.trail_pct
+    trail_factor = np.where(is_call, 1 - trail_pct, 1 + trail_pct)
+    tp_first = exit_params.both_hit_same_second == "tp_first"
+
+    high = price_values(frame, "high")
+    low = price_values(frame, "low")
+    close = price_values(frame, "close")
+    # Per trade: exit column (-1 for none), whether it hit the target, the
+    # (mirrored) stop level it hit otherwise, and the partial fill column.
+    exit_column = np.full(len(entries), -1, dtype=np.int64)
+    exit_on_target = np.zeros(len(entries), dtype=bool)
+    exit_level = np.zeros(len(entries))
+    partial_column = np.full(len(entries), -1, dtype=np.int64)
+
+    width = int(lengths.max(initial=0))
+    step = max(1, EXIT_SCAN_ROWS // max(width, 1))
+    for lo in range(0, len(entries) if width else 0, step):
+        hi = min(lo + step, len(entries))
+        columns = np.arange(width)
+        valid = columns < lengths[lo:hi, None]
+        rows = np.minimum(first[lo:hi, None] + columns, len(frame) - 1)
+        call = is_call[lo:hi, None]
+        # The favourable and adverse extreme of each bar; padding never hits.
+        up = np.where(valid, np.where(call, high[rows], -low[rows]), -np.inf)
+        down = np.where(valid, np.where(call, low[rows], -high[rows]), np.inf)
+        candidates = up * trail_factor[lo:hi, None]
+        stop_level = stop_price[lo:hi, None]
+        target_level = target[lo:hi, None]
+        target_hit = up >= target_level
+
+        trail = _trailing(candidates, stop_level, trailing)
+        at, on_target = _first_touch(target_hit, down <= trail, tp_first)
+        level = np.take_along_axis(trail, np.minimum(at, width - 1)[:, None], 1)[:, 0]
+        fill = np.full(hi - lo, -1, dtype=np.int64)
+
+        if partial:
+            partial_level = first_target[lo:hi, None]
+            touch, on_partial = _first_touch(
+                up >= partial_level, down <= stop_level, tp_first
+            )
+            # A first-target or initial-stop touch ends phase one unless the
+            # trailing stop or final target was hit on an earlier bar; on the
+            # same bar the first-target check comes first.
+            phase_one = (touch <= at) & (touch < width)
+            stopped = phase_one & ~on_partial
+            at = np.where(phase_one, touch, at)
+            on_target &= ~phase_one
+            level = np.where(stopped, stop_price[lo:hi], level)
+
+            filled = phase_one & on_partial
+            after = columns > touch[:, None]
+            runner_trail = _trailing(
+                np.where(after, candidates, -np.inf), partial_level, trailing
+            )
+            runner_at, runner_on_target = _first_touch(
+                after & target_hit, after & (down <= runner_trail), tp_first
+            )
+            runner_level = np.take_along_axis(
+                runner_trail, np.minimum(runner_at, width - 1)[:, None], 1
+            )[:, 0]
+            fill = np.where(filled, touch, fill)
+            at = np.where(filled, runner_at, at)
+            on_target = np.where(filled, runner_on_target, on_target)
+            level = np.where(filled, runner_level, level)
+
+        exit_column[lo:hi] = np.where(at < width, at, -1)
+        exit_on_target[lo:hi] = on_target
+        exit_level[lo:hi] = level
+        partial_column[lo:hi] = fill
+
+    exits: list[TradeExit | None] = []
+    for position in range(len(entries)):
+        if lengths[position] <= 0:
+            exits.append(None)
+            continue
+        column = int(exit_column[position])
+        if column < 0:
+            row = int(stops[position]) - 1
+            price, reason = float(close[row]), "session_end"
+        else:
+            row = int(first[position]) + column
+            mirrored = target if exit_on_target[position] else exit_level
+            price = float(mirrored[position] * sign[position])
+            reason = "take_profit" if exit_on_target[position] else "stop_loss"
+        fill = int(partial_column[position])
+        exits.append(
+            TradeExit(
+                frame.index[row],
+                price,
+                reason,
+                frame.index[int(first[position]) + fill] if fill >= 0 else None,
+                float(first_target[position] * sign[position]) if fill >= 0 else None,
+            )
+        )
+    return exits
+
+
+def _session_exits(
+    entries: pd.DataFrame, bars: SessionBars, exit_params: ExitParams
+) -> list[TradeExit | None]:
+    """``_scan_exits`` for entries spread over the sessions of ``bars``."""
+    positions = np.array(
+        [
+            bars.positions.get(dt.date.fromisoformat(value), -1)
+            for value in entries["trade_date"]
+        ],
+        dtype=np.int64,
+    )
+    found = positions >= 0
+    starts = np.where(found, bars.starts[positions], 0)
+    stops = np.where(found, bars.stops[positions], 0)
+    return _scan_exits(entries, bars.frame, starts, stops, exit_params)
+
+
+def _simulate_trade(
+    entry: pd.Series,
+    day_df: pd.DataFrame,
+    exit_params: ExitParams,
+    allocation: float,
+    trade_exit: TradeExit | None = None,
+) -> dict:
+    if trade_exit is None:
+        trade_exit = _walk_exit(entry, day_df, exit_params)
+        if trade_exit is None:
+            return {}
+
+    entry_ts = _entry_timestamp(entry)
+    entry_price = float(entry["spy_price_at_entry"])
+    direction = entry["direction"]
+    exit_ts = trade_exit.exit_ts
+    exit_price = trade_exit.exit_price
+    exit_reason = trade_exit.exit_reason
+    partial_exit_ts = trade_exit.partial_exit_ts
+    partial_exit_price = trade_exit.partial_exit_price
+    partial_taken = partial_exit_ts is not None
+
+    split_pct = exit_params.split_pct
+    remaining_pct = 1 - split_pct
+
     qty = allocation / entry_price if entry_price else 0
     if direction == "CALL":
         pnl_full = qty * (exit_price - entry_price)
@@ -243,72 +506,197 @@ def _build_metrics(trades_df: pd.DataFrame, equity_df: pd.DataFrame, starting_ca
     }
 
 
+def _simulate_day(
+    daily_entries: pd.DataFrame,
+    day_df: pd.DataFrame,
+    config: Pass2Config,
+    current_cash: float,
+    exits: list[TradeExit | None] | None = None,
+) -> tuple[list[dict], float]:
+    """Simulate one session's entries in order, returning its trades and ending cash.
+
+    ``exits`` holds each entry's precomputed exit (None where it has no bars to
+    trade); without it every exit is found by walking the bars.
+    """
+    trades: list[dict] = []
+    daily_loss_limit = config.account_params.max_daily_loss_pct
+    day_loss = 0.0
+    for position, (_, entry) in enumerate(daily_entries.iterrows()):
+        allocation = current_cash * config.account_params.allocation_pct_per_trade
+        if allocation <= 0:
+            continue
+
+        if exits is None:
+            trade = _simulate_trade(entry, day_df, config.exit_params, allocation)
+        elif exits[position] is None:
+            continue
+        else:
+            trade = _simulate_trade(
+                entry, day_df, config.exit_params, allocation, exits[position]
+            )
+        if not trade:
+            continue
+        trades.append(trade)
+        current_cash += trade["pnl"]
+        day_loss += min(0.0, trade["pnl"])
+
+        if daily_loss_limit is not None:
+            if abs(day_loss) >= config.account_params.starting_cash * daily_loss_limit:
+                break
+    return trades, current_cash
+
+
+def _write_outputs(
+    trades_df: pd.DataFrame, equity_df: pd.DataFrame, metrics: dict, output_dir: Path
+) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    save_parquet(trades_df, output_dir / "trades.parquet")
+    save_parquet(equity_df, output_dir / "equity_curve.parquet")
+    save_json(metrics, output_dir / "metrics.json")
+    return output_dir
+
+
+def _use_scan(config: Pass2Config) -> bool:
+    if config.exit_engine not in EXIT_ENGINES:
+        raise ValueError(f"Unsupported exit engine: {config.exit_engine}")
+    return config.exit_engine == "vectorized"
+
+
 def run_pass2_pipeline(config: Pass2Config, entries_df: pd.DataFrame) -> Path:
-    spy_df = load_spy_1m_bars(config.spy_1m_path, config.start, config.end)
-    if spy_df.empty or entries_df.empty:
-        trades_df = pd.DataFrame(
-            columns=[
-                "trade_date",
-                "entry_ts",
-                "exit_ts",
-                "direction",
-                "entry_price",
-                "exit_price",
-                "exit_reason",
-                "allocation",
-                "pnl",
-                "return_pct",
-                "partial_exit_ts",
-                "partial_exit_price",
-                "partial_pnl",
-                "runner_pnl",
-            ]
-        )
-        equity_df = _build_equity_curve(trades_df, config.account_params.starting_cash)
-        metrics = _build_metrics(trades_df, equity_df, config.account_params.starting_cash)
-        save_parquet(trades_df, config.output_dir / "trades.parquet")
-        save_parquet(equity_df, config.output_dir / "equity_curve.parquet")
-        save_json(metrics, config.output_dir / "metrics.json")
-        return config.output_dir
+    if config.streaming:
+        return run_pass2_streaming(config, entries_df)
 
-    trades: list[dict] = []
-    current_cash = config.account_params.starting_cash
-    daily_loss_limit = (
-        config.account_params.max_daily_loss_pct
-        if config.account_params.max_daily_loss_pct is not None
+    bars = load_spy_1m_bars(
+        config.spy_1m_path, config.start, config.end, columns=PASS2_COLUMNS
+    )
+    starting_cash = config.account_params.starting_cash
+    if bars.empty or entries_df.empty:
+        trades_df = pd.DataFrame(columns=TRADE_SCHEMA.names)
+        equity_df = _build_equity_curve(trades_df, starting_cash)
+        metrics = _build_metrics(trades_df, equity_df, starting_cash)
+        return _write_outputs(trades_df, equity_df, metrics, config.output_dir)
+
+    # All trades' exits are found in one batch up front; only the allocations
+    # depend on the order trades close in.
+    exits = (
+        _session_exits(entries_df, bars, config.exit_params)
+        if _use_scan(config)
         else None
     )
-
+    trades: list[dict] = []
+    current_cash = starting_cash
     for trade_date in _iter_dates(entries_df):
-        daily_entries = entries_df.loc[entries_df["trade_date"] == trade_date.isoformat()]
-        day_mask = spy_df.index.tz_convert(MARKET_TIMEZONE).date == trade_date
-        day_df = spy_df.loc[day_mask]
+        in_day = (entries_df["trade_date"] == trade_date.isoformat()).to_numpy()
+        daily_entries = entries_df.loc[in_day]
+        day_df = bars.session(trade_date)
         if day_df.empty:
             continue
-
-        day_loss = 0.0
-        for _, entry in daily_entries.iterrows():
-            allocation = current_cash * config.account_params.allocation_pct_per_trade
-            if allocation <= 0:
-                continue
-
-            trade = _simulate_trade(entry, day_df, config.exit_params, allocation)
-            if not trade:
-                continue
-            trades.append(trade)
-            current_cash += trade["pnl"]
-            day_loss += min(0.0, trade["pnl"])
-
-            if daily_loss_limit is not None:
-                if abs(day_loss) >= config.account_params.starting_cash * daily_loss_limit:
-                    break
+        day_exits = (
+            [exits[position] for position in np.flatnonzero(in_day)]
+            if exits is not None
+            else None
+        )
+        day_trades, current_cash = _simulate_day(
+            daily_entries, day_df, config, current_cash, day_exits
+        )
+        trades.extend(day_trades)
 
     trades_df = pd.DataFrame(trades)
-    equity_df = _build_equity_curve(trades_df, config.account_params.starting_cash)
-    metrics = _build_metrics(trades_df, equity_df, config.account_params.starting_cash)
-
-    config.output_dir.mkdir(parents=True, exist_ok=True)
-    save_parquet(trades_df, config.output_dir / "trades.parquet")
-    save_parquet(equity_df, config.output_dir / "equity_curve.parquet")
-    save_json(metrics, config.output_dir / "metrics.json")
-    return config.output_dir
+    equity_df = _build_equity_curve(trades_df, starting_cash)
+    metrics = _build_metrics(trades_df, equity_df, starting_cash)
+    return _write_outputs(trades_df, equity_df, metrics, config.output_dir)
+
+
+@dataclass
+class _RunningMetrics:
+    """Incremental counterpart of ``_build_metrics`` for streamed trades."""
+
+    total_trades: int = 0
+    wins: int = 0
+    total_pnl: float = 0.0
+    equity: float = 0.0
+    peak: float = -np.inf
+    max_drawdown_pct: float = 0.0
+
+    def update(self, trades_df: pd.DataFrame) -> pd.DataFrame:
+        """Fold one session's trades in and return their equity curve rows."""
+        ordered = trades_df.sort_values("exit_ts")
+        pnl = ordered["pnl"].to_numpy(dtype=np.float64)
+        equity = self.equity + np.cumsum(pnl)
+        peaks = np.maximum.accumulate(np.concatenate(([self.peak], equity)))[1:]
+        self.max_drawdown_pct = min(
+            self.max_drawdown_pct, float(((equity - peaks) / peaks).min())
+        )
+        self.total_trades += len(pnl)
+        self.wins += int((pnl > 0).sum())
+        self.total_pnl += float(pnl.sum())
+        self.equity = float(equity[-1])
+        self.peak = float(peaks[-1])
+        return pd.DataFrame({"timestamp": ordered["exit_ts"].array, "equity": equity})
+
+    def as_dict(self, starting_cash: float) -> dict:
+        total_trades = self.total_trades
+        return {
+            "total_trades": total_trades,
+            "wins": self.wins,
+            "losses": total_trades - self.wins,
+            "win_rate": self.wins / total_trades if total_trades else 0.0,
+            "total_pnl": self.total_pnl,
+            "total_return_pct": self.total_pnl / starting_cash if starting_cash else 0.0,
+            "max_drawdown_pct": self.max_drawdown_pct,
+            "ending_equity": starting_cash + self.total_pnl,
+        }
+
+
+def run_pass2_streaming(config: Pass2Config, entries_df: pd.DataFrame) -> Path:
+    """Run pass 2 one session at a time with memory bounded by a single session.
+
+    Trades and equity points are appended to their parquet files as one row
+    group per session, and metrics are accumulated as sessions complete.
+    """
+    starting_cash = config.account_params.starting_cash
+    scan = _use_scan(config)
+    output_dir = config.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    running = _RunningMetrics(equity=starting_cash)
+    entries_by_date = (
+        {key: group for key, group in entries_df.groupby("trade_date", sort=False)}
+        if not entries_df.empty
+        else {}
+    )
+
+    trades_path = output_dir / "trades.parquet"
+    equity_path = output_dir / "equity_curve.parquet"
+    with ParquetAppender(trades_path, TRADE_SCHEMA) as trades_out:
+        with ParquetAppender(equity_path, EQUITY_SCHEMA) as equity_out:
+            if entries_by_date:
+                sessions = iter_spy_1m_sessions(
+                    config.spy_1m_path, config.start, config.end, columns=PASS2_COLUMNS
+                )
+                current_cash = starting_cash
+                for trade_date, day_df in sessions:
+                    daily_entries = entries_by_date.get(trade_date.isoformat())
+                    if daily_entries is None or day_df.empty:
+                        continue
+                    exits = (
+                        _scan_exits(
+                            daily_entries,
+                            day_df,
+                            np.zeros(len(daily_entries), dtype=np.int64),
+                            np.full(len(daily_entries), len(day_df), dtype=np.int64),
+                            config.exit_params,
+                        )
+                        if scan
+                        else None
+                    )
+                    day_trades, current_cash = _simulate_day(
+                        daily_entries, day_df, config, current_cash, exits
+                    )
+                    if not day_trades:
+                        continue
+                    trades_df = pd.DataFrame(day_trades)
+                    trades_out.append(trades_df)
+                    equity_out.append(running.update(trades_df))
+
+    save_json(running.as_dict(starting_cash), output_dir / "metrics.json")
+    return output_dir
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from backtesting_bot.constants import MARKET_TIMEZONE, SESSION_END, SESSION_START
+from src.cache.schema import PRICE_COLUMNS, PRICE_SCALE
+
+EPOCH_DATE = dt.date(1970, 1, 1)
+
+
+def session_days(index: pd.DatetimeIndex) -> np.ndarray:
+    """Return ET session dates as integer days since the epoch."""
+    local = index.tz_convert(MARKET_TIMEZONE).tz_localize(None)
+    return local.values.astype("datetime64[D]").astype(np.int64)
+
+
+def epoch_day(value: dt.date) -> int:
+    return (value - EPOCH_DATE).days
+
+
+def price_values(frame: pd.DataFrame, name: str) -> np.ndarray:
+    """Values of ``frame[name]``; prices come back as float64 even when scaled."""
+    values = frame[name].to_numpy()
+    if name not in PRICE_COLUMNS:
+        return values
+    if values.dtype.kind == "i":
+        return values.astype(np.float64) / PRICE_SCALE
+    return values.astype(np.float64, copy=False)
+
+
+def decode_prices(frame: pd.DataFrame) -> pd.DataFrame:
+    """``frame`` with any scaled int32 price columns decoded to floats."""
+    scaled = [
+        name
+        for name in PRICE_COLUMNS
+        if name in frame.columns and frame[name].dtype.kind == "i"
+    ]
+    if not scaled:
+        return frame
+    return frame.assign(**{name: price_values(frame, name) for name in scaled})
+
+
+def regular_hours(df: pd.DataFrame) -> pd.DataFrame:
+    """The 09:30-16:00 ET bars of ``df`` (both ends included), indexed in ET."""
+    et_index = df.index.tz_convert(MARKET_TIMEZONE)
+    df = df.copy()
+    df["_et_ts"] = et_index
+    df = df.set_index("_et_ts")
+    df = df.between_time(SESSION_START, SESSION_END, inclusive="both")
+    return df
+
+
+@dataclass(frozen=True)
+class SessionBars:
+    """Time-sorted bars with precomputed per-session row offsets.
+
+    ``frame`` keeps its UTC index; ``starts``/``stops`` delimit each ET session so
+    a day's bars are a positional slice rather than a mask over the whole frame.
+    Cache loads keep prices as scaled int32 in ``frame``; read them through
+    ``price_values``. ``session`` and ``items`` return float prices.
+    """
+
+    frame: pd.DataFrame
+    dates: tuple[dt.date, ...]
+    starts: np.ndarray
+    stops: np.ndarray
+    positions: dict[dt.date, int]
+
+    @classmethod
+    def from_frame(
+        cls, frame: pd.DataFrame, days: np.ndarray | None = None
+    ) -> "SessionBars":
+        if days is None:
+            days = session_days(frame.index)
+        if len(days) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(frame=frame, dates=(), starts=empty, stops=empty, positions={})
+
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        starts = np.concatenate(([0], boundaries)).astype(np.int64)
+        stops = np.concatenate((boundaries, [len(days)])).astype(np.int64)
+        dates = tuple(
+            EPOCH_DATE + dt.timedelta(days=int(day)) for day in days[starts]
+        )
+        return cls(
+            frame=frame,
+            dates=dates,
+            starts=starts,
+            stops=stops,
+            positions={value: pos for pos, value in enumerate(dates)},
+        )
+
+    @property
+    def empty(self) -> bool:
+        return self.frame.empty
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def session(self, trade_date: dt.date) -> pd.DataFrame:
+        pos = self.positions.get(trade_date)
+        if pos is None:
+            return decode_prices(self.frame.iloc[0:0])
+        return decode_prices(self.frame.iloc[self.starts[pos] : self.stops[pos]])
+
+    def items(self) -> Iterator[tuple[dt.date, pd.DataFrame]]:
+        for pos, trade_date in enumerate(self.dates):
+            frame = self.frame.iloc[self.starts[pos] : self.stops[pos]]
+            yield trade_date, decode_prices(frame)
+
+    def between(self, start: dt.date, end: dt.date) -> "SessionBars":
+        lo = bisect.bisect_left(self.dates, start)
+        hi = bisect.bisect_right(self.dates, end)
+        if lo >= hi:
+            return SessionBars.from_frame(self.frame.iloc[0:0])
+        row_start = int(self.starts[lo])
+        row_stop = int(self.stops[hi - 1])
+        dates = self.dates[lo:hi]
+        return SessionBars(
+            frame=self.frame.iloc[row_start:row_stop],
+            dates=dates,
+            starts=self.starts[lo:hi] - row_start,
+            stops=self.stops[lo:hi] - row_start,
+            positions={value: pos for pos, value in enumerate(dates)},
+        )
+
+    def with_frame(self, frame: pd.DataFrame) -> "SessionBars":
+        if len(frame) != len(self.frame):
+            raise ValueError("Replacement frame must keep the same rows")
+        return replace(self, frame=frame)
+
+
+@dataclass(frozen=True)
+class SessionCandles:
+    """N-minute candles of many sessions as flat arrays with per-session offsets.
+
+    ``index`` holds the ET right-edge label of each candle; session ``i`` spans
+    rows ``starts[i]:stops[i]``. Array-based strategies scan all sessions at
+    once instead of looping over per-day frames.
+    """
+
+    index: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    dates: tuple[dt.date, ...]
+    starts: np.ndarray
+    stops: np.ndarray
+
+    @classmethod
+    def from_frames(
+        cls, sessions: Iterable[tuple[dt.date, pd.DataFrame]]
+    ) -> "SessionCandles":
+        """Stack per-session candle frames (``open``..``volume``, ET index)."""
+        frames = [(value, frame) for value, frame in sessions if not frame.empty]
+        counts = np.array([len(frame) for _, frame in frames], dtype=np.int64)
+        stops = np.cumsum(counts)
+        starts = stops - counts
+        if frames:
+            index = pd.DatetimeIndex(
+                np.concatenate([frame.index.as_unit("ns").asi8 for _, frame in frames])
+            ).tz_localize("UTC").tz_convert(MARKET_TIMEZONE)
+        else:
+            index = pd.DatetimeIndex([], tz=MARKET_TIMEZONE)
+
+        def _column(name: str) -> np.ndarray:
+            if not frames:
+                return np.empty(0, dtype=np.float64)
+            return np.concatenate([frame[name].to_numpy() for _, frame in frames])
+
+        return cls(
+            index=index,
+            open=_column("open"),
+            high=_column("high"),
+            low=_column("low"),
+            close=_column("close"),
+            volume=_column("volume"),
+            dates=tuple(value for value, _ in frames),
+            starts=starts,
+            stops=stops,
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def session_ids(self) -> np.ndarray:
+        """Position in ``dates`` of each candle's session."""
+        return np.repeat(np.arange(len(self.dates)), self.stops - self.starts)
+
+    def session(self, trade_date: dt.date) -> pd.DataFrame:
+        if trade_date not in self.dates:
+            return pd.DataFrame(
+                columns=["open", "high", "low", "close", "volume"],
+                index=self.index[:0],
+            )
+        pos = self.dates.index(trade_date)
+        rows = slice(int(self.starts[pos]), int(self.stops[pos]))
+        return pd.DataFrame(
+            {
+                "open": self.open[rows],
+                "high": self.high[rows],
+                "low": self.low[rows],
+                "close": self.close[rows],
+                "volume": self.volume[rows],
+            },
+            index=self.index[rows],
+        )
@@ -1 +1,27 @@
-"""Strategy implementations."""
+"""Strategy implementations and the registry pass 1 looks them up in."""
+
+from __future__ import annotations
+
+from backtesting_bot.strategies.base import Strategy
+from backtesting_bot.strategies.ema_cross import EmaCrossStrategy
+from backtesting_bot.strategies.orb import OrbStrategy
+from backtesting_bot.strategies.rsi_threshold import RsiThresholdStrategy
+
+STRATEGIES: dict[str, Strategy] = {}
+
+
+def register_strategy(strategy: Strategy) -> Strategy:
+    """Make ``strategy`` available to pass 1 under ``strategy.name``."""
+    STRATEGIES[strategy.name] = strategy
+    return strategy
+
+
+def get_strategy(name: str) -> Strategy:
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unsupported strategy: {name}") from None
+
+
+for _strategy in (OrbStrategy(), EmaCrossStrategy(), RsiThresholdStrategy()):
+    register_strategy(_strategy)
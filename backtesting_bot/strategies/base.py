@@ -0,0 +1,123 @@
+"""Batch strategy interface shared by every pass 1 strategy.
+
+A strategy sees all sessions of a run at once: ``find_entries`` receives the
+prepared ``SessionBars`` (with the columns its ``features`` declared) and
+returns entry dicts per trade date, so implementations work on whole arrays
+instead of looping over days and rows.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Mapping
+
+import numpy as np
+import pandas as pd
+
+from backtesting_bot.constants import MARKET_TIMEZONE, SESSION_END, SESSION_START
+from backtesting_bot.features import FeatureSpec
+from backtesting_bot.sessions import SessionBars, price_values
+
+if TYPE_CHECKING:
+    from backtesting_bot.pass1 import Pass1Config
+
+NANOS_PER_DAY = 86_400 * 10**9
+NANOS_PER_MINUTE = 60 * 10**9
+
+Entries = dict[dt.date, list[dict]]
+
+
+class Strategy(ABC):
+    """Turns a run's bars into entries, one call for every session."""
+
+    name: str
+
+    def features(self, config: "Pass1Config") -> tuple[FeatureSpec, ...]:
+        """Indicator columns ``find_entries`` reads from the bars."""
+        return ()
+
+    @abstractmethod
+    def find_entries(self, bars: SessionBars, config: "Pass1Config") -> Entries:
+        """Entry dicts (``entry_ts`` in ET, ``direction``, ``spy_price_at_entry``,
+        ``context``) for each trade date with entries, in time order."""
+
+
+def time_nanos(value: dt.time) -> int:
+    return (
+        (value.hour * 60 + value.minute) * 60 + value.second
+    ) * 10**9 + value.microsecond * 1000
+
+
+def first_per_session(
+    rows: np.ndarray, session_ids: np.ndarray, limit: int
+) -> np.ndarray:
+    """The first ``limit`` of time-ordered ``rows`` within each session."""
+    sessions = session_ids[rows]
+    _, first, inverse = np.unique(sessions, return_index=True, return_inverse=True)
+    return rows[np.arange(len(rows)) - first[inverse] < limit]
+
+
+def signal_entries(
+    bars: SessionBars,
+    calls: np.ndarray,
+    puts: np.ndarray,
+    config: "Pass1Config",
+    context: Mapping[str, np.ndarray | float | int | str],
+) -> Entries:
+    """Entries at the close of each 1-minute bar flagged in ``calls``/``puts``.
+
+    Only regular-hours bars closing before the session end, and not after
+    ``no_entries_after``, can enter; each session keeps its first
+    ``max_trades_per_day`` signals. ``context`` values given as arrays are
+    read at the signalling bar.
+    """
+    index = bars.frame.index
+    local = index.tz_convert(MARKET_TIMEZONE).tz_localize(None).as_unit("ns").asi8
+    closes_at = local % NANOS_PER_DAY + NANOS_PER_MINUTE
+    eligible = (closes_at > time_nanos(SESSION_START)) & (
+        closes_at < time_nanos(SESSION_END)
+    )
+    if config.no_entries_after is not None:
+        eligible &= closes_at <= time_nanos(config.no_entries_after)
+
+    session_ids = np.repeat(np.arange(len(bars.dates)), bars.stops - bars.starts)
+    rows = first_per_session(
+        np.flatnonzero(eligible & (calls | puts)),
+        session_ids,
+        config.max_trades_per_day,
+    )
+    close = price_values(bars.frame, "close")
+    entry_ts = (index[rows] + pd.Timedelta(minutes=1)).tz_convert(MARKET_TIMEZONE)
+
+    entries: Entries = {}
+    for position, row in enumerate(rows.tolist()):
+        details = {
+            key: float(value[row]) if isinstance(value, np.ndarray) else value
+            for key, value in context.items()
+        }
+        entries.setdefault(bars.dates[session_ids[row]], []).append(
+            {
+                "entry_ts": entry_ts[position],
+                "direction": "CALL" if calls[row] else "PUT",
+                "spy_price_at_entry": float(close[row]),
+                "context": details,
+            }
+        )
+    return entries
+
+
+def crossings(
+    values: np.ndarray, level: np.ndarray | float, bars: SessionBars
+) -> tuple[np.ndarray, np.ndarray]:
+    """Bars where ``values`` crosses above / below ``level`` within a session."""
+    above = np.zeros(len(values), dtype=bool)
+    below = np.zeros(len(values), dtype=bool)
+    if len(values) < 2:
+        return above, below
+    difference = values - level
+    same_session = np.ones(len(values) - 1, dtype=bool)
+    same_session[bars.starts[1:] - 1] = False
+    above[1:] = (difference[1:] > 0) & (difference[:-1] <= 0) & same_session
+    below[1:] = (difference[1:] < 0) & (difference[:-1] >= 0) & same_session
+    return above, below
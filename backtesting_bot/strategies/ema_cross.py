@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from backtesting_bot.features import FeatureSpec
+from backtesting_bot.sessions import SessionBars
+from backtesting_bot.strategies.base import (
+    Entries,
+    Strategy,
+    crossings,
+    signal_entries,
+)
+
+if TYPE_CHECKING:
+    from backtesting_bot.pass1 import Pass1Config
+
+
+class EmaCrossStrategy(Strategy):
+    """Fast/slow EMA crossover on 1-minute closes.
+
+    A CALL enters at the close of the bar where the fast EMA crosses above the
+    slow one, a PUT where it crosses below. Every crossover re-arms, so later
+    crosses in a session are further entries up to ``max_trades_per_day``.
+    """
+
+    name = "ema_v1"
+
+    def features(self, config: "Pass1Config") -> tuple[FeatureSpec, ...]:
+        return (
+            FeatureSpec("ema_fast", "ema", config.ema_fast_period),
+            FeatureSpec("ema_slow", "ema", config.ema_slow_period),
+        )
+
+    def find_entries(self, bars: SessionBars, config: "Pass1Config") -> Entries:
+        fast = bars.frame["ema_fast"].to_numpy()
+        slow = bars.frame["ema_slow"].to_numpy()
+        calls, puts = crossings(fast, slow, bars)
+        return signal_entries(
+            bars,
+            calls,
+            puts,
+            config,
+            {
+                "ema_fast": fast,
+                "ema_slow": slow,
+                "fast_period": config.ema_fast_period,
+                "slow_period": config.ema_slow_period,
+            },
+        )
@@ -2,11 +2,44 @@ from __future__ import annotations
 
 import datetime as dt
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
+import numpy as np
 import pandas as pd
 
-from backtesting_bot.constants import DEFAULT_ORB_CANDLES, MARKET_TIMEZONE
+from backtesting_bot.constants import (
+    DEFAULT_ORB_CANDLES,
+    MARKET_TIMEZONE,
+    SESSION_END,
+    SESSION_START,
+)
+from backtesting_bot.sessions import (
+    EPOCH_DATE,
+    SessionBars,
+    SessionCandles,
+    price_values,
+    regular_hours,
+)
+from backtesting_bot.strategies.base import (
+    NANOS_PER_DAY,
+    NANOS_PER_MINUTE,
+    Entries,
+    Strategy,
+    first_per_session,
+    time_nanos,
+)
+
+if TYPE_CHECKING:
+    from backtesting_bot.pass1 import Pass1Config
+
+# ``resample_bars`` anchors its bins at local midnight plus this offset.
+RESAMPLE_ORIGIN_OFFSET = pd.Timedelta(minutes=30).value
+# "vectorized" scans all sessions' candles with array operations; "loop" is the
+# original per-session, per-candle scan. Both produce identical entries.
+ORB_ENGINES = ("vectorized", "loop")
+# How a session re-arms after an entry when more than one trade per day is
+# allowed: a candle closing back inside the range, or an opposite-side break.
+REARM_RULES = ("inside", "opposite")
 
 
 @dataclass(frozen=True)
@@ -40,6 +73,70 @@ def resample_bars(session_df: pd.DataFrame, interval_minutes: int) -> pd.DataFra
     return resampled
 
 
+def resample_sessions(bars: SessionBars, interval_minutes: int) -> SessionCandles:
+    """Bucket every session's regular-hours bars into N-minute candles in one pass.
+
+    Matches ``resample_bars`` applied to each session's 09:30-16:00 ET bars:
+    bins are closed on the left, labelled on the right and anchored at the
+    session's local midnight plus 30 minutes (in absolute time, as pandas does,
+    so DST sessions bin identically), and a partial last candle is kept.
+    """
+    frame = bars.frame
+    utc = frame.index.as_unit("ns").asi8
+    local = frame.index.tz_convert(MARKET_TIMEZONE).tz_localize(None).as_unit("ns").asi8
+    time_of_day = local % NANOS_PER_DAY
+    keep = np.flatnonzero(
+        (time_of_day >= time_nanos(SESSION_START))
+        & (time_of_day <= time_nanos(SESSION_END))
+    )
+    if len(keep) == 0:
+        return SessionCandles.from_frames([])
+
+    utc = utc[keep]
+    local_day = (local[keep] - time_of_day[keep]) // NANOS_PER_DAY
+    day_starts = np.flatnonzero(np.diff(local_day, prepend=local_day[0] - 1))
+    session_days = local_day[day_starts]
+    session_ids = np.repeat(
+        np.arange(len(day_starts)), np.diff(np.append(day_starts, len(keep)))
+    )
+    midnights = (
+        pd.DatetimeIndex(session_days.astype("datetime64[D]").astype("datetime64[ns]"))
+        .tz_localize(MARKET_TIMEZONE)
+        .as_unit("ns")
+        .asi8
+    )
+    origins = midnights + RESAMPLE_ORIGIN_OFFSET
+
+    interval = interval_minutes * NANOS_PER_MINUTE
+    buckets = (utc - origins[session_ids]) // interval
+    changes = np.flatnonzero(
+        (np.diff(buckets) != 0) | (np.diff(session_ids) != 0)
+    ) + 1
+    group_starts = np.concatenate(([0], changes))
+    group_stops = np.append(changes, len(keep))
+    group_sessions = session_ids[group_starts]
+    labels = origins[group_sessions] + (buckets[group_starts] + 1) * interval
+
+    def _values(name: str) -> np.ndarray:
+        return price_values(frame, name)[keep]
+
+    counts = np.bincount(group_sessions, minlength=len(day_starts))
+    stops = np.cumsum(counts)
+    return SessionCandles(
+        index=pd.DatetimeIndex(labels).tz_localize("UTC").tz_convert(MARKET_TIMEZONE),
+        open=_values("open")[group_starts],
+        high=np.maximum.reduceat(_values("high"), group_starts),
+        low=np.minimum.reduceat(_values("low"), group_starts),
+        close=_values("close")[group_stops - 1],
+        volume=np.add.reduceat(_values("volume"), group_starts),
+        dates=tuple(
+            EPOCH_DATE + dt.timedelta(days=int(day)) for day in session_days
+        ),
+        starts=stops - counts,
+        stops=stops,
+    )
+
+
 def resample_to_five_minutes(session_df: pd.DataFrame) -> pd.DataFrame:
     return resample_bars(session_df, interval_minutes=5)
 
@@ -58,6 +155,76 @@ def calculate_orb_range(
     )
 
 
+def _breakout(
+    ts: pd.Timestamp,
+    row: pd.Series,
+    orb_range: OrbRange,
+    breakout_basis: str,
+    confirm_full_candle: bool,
+) -> dict | None:
+    close_price = float(row["close"])
+    open_price = float(row["open"])
+    high_price = float(row["high"])
+    low_price = float(row["low"])
+
+    if breakout_basis == "wick":
+        if high_price > orb_range.high:
+            direction, price = "CALL", high_price
+        elif low_price < orb_range.low:
+            direction, price = "PUT", low_price
+        else:
+            return None
+        return {
+            "entry_ts": ts,
+            "direction": direction,
+            "spy_price_at_entry": price,
+            "context": {
+                "orb_high": orb_range.high,
+                "orb_low": orb_range.low,
+                "orb_end_ts": orb_range.end_ts.isoformat(),
+                "candle_high": high_price,
+                "candle_low": low_price,
+                "candle_close": close_price,
+                "breakout_basis": breakout_basis,
+            },
+        }
+
+    if close_price > orb_range.high:
+        if confirm_full_candle and open_price <= orb_range.high:
+            return None
+        direction = "CALL"
+    elif close_price < orb_range.low:
+        if confirm_full_candle and open_price >= orb_range.low:
+            return None
+        direction = "PUT"
+    else:
+        return None
+    return {
+        "entry_ts": ts,
+        "direction": direction,
+        "spy_price_at_entry": close_price,
+        "context": {
+            "orb_high": orb_range.high,
+            "orb_low": orb_range.low,
+            "orb_end_ts": orb_range.end_ts.isoformat(),
+            "candle_open": open_price,
+            "candle_close": close_price,
+            "breakout_basis": breakout_basis,
+        },
+    }
+
+
+def _breakout_candles(
+    five_min_df: pd.DataFrame, orb_range: OrbRange, cutoff_time: dt.time | None
+) -> pd.DataFrame:
+    breakout_df = five_min_df.loc[five_min_df.index > orb_range.end_ts]
+    if cutoff_time is not None:
+        cutoff = dt.datetime.combine(orb_range.end_ts.date(), cutoff_time)
+        cutoff = pd.Timestamp(cutoff, tz=MARKET_TIMEZONE)
+        breakout_df = breakout_df.loc[breakout_df.index <= cutoff]
+    return breakout_df
+
+
 def find_orb_entry(
     five_min_df: pd.DataFrame,
     orb_range: OrbRange,
@@ -65,81 +232,203 @@ def find_orb_entry(
     breakout_basis: str = "close",
     confirm_full_candle: bool = False,
 ) -> dict | None:
-    breakout_df = five_min_df.loc[five_min_df.index > orb_range.end_ts]
+    for ts, row in _breakout_candles(five_min_df, orb_range, cutoff_time).iterrows():
+        entry = _breakout(ts, row, orb_range, breakout_basis, confirm_full_candle)
+        if entry is not None:
+            return entry
+    return None
+
+
+def find_orb_session_entries(
+    five_min_df: pd.DataFrame,
+    orb_range: OrbRange,
+    cutoff_time: dt.time | None = None,
+    breakout_basis: str = "close",
+    confirm_full_candle: bool = False,
+    max_entries: int = 1,
+    rearm: str = "inside",
+) -> list[dict]:
+    """Up to ``max_entries`` breakouts of one session, re-arming per ``rearm``.
+
+    After an entry the scan is disarmed. With ``"inside"`` it re-arms on a
+    later candle that closes back inside the range without breaking out;
+    with ``"opposite"`` only a breakout on the other side of the range
+    can enter next.
+    """
+    entries: list[dict] = []
+    armed = True
+    for ts, row in _breakout_candles(five_min_df, orb_range, cutoff_time).iterrows():
+        if len(entries) >= max_entries:
+            break
+        entry = _breakout(ts, row, orb_range, breakout_basis, confirm_full_candle)
+        if entry is None:
+            if orb_range.low <= float(row["close"]) <= orb_range.high:
+                armed = armed or rearm == "inside"
+            continue
+        if rearm == "opposite":
+            armed = not entries or entry["direction"] != entries[-1]["direction"]
+        if armed:
+            entries.append(entry)
+            armed = False
+    return entries
+
+
+def find_orb_entries(
+    candles: SessionCandles,
+    orb_candles: int = DEFAULT_ORB_CANDLES,
+    cutoff_time: dt.time | None = None,
+    breakout_basis: str = "close",
+    confirm_full_candle: bool = False,
+    max_entries: int = 1,
+    rearm: str = "inside",
+) -> dict[dt.date, list[dict]]:
+    """Array counterpart of ``calculate_orb_range`` + ``find_orb_session_entries``.
+
+    Computes every session's opening range and breakouts in one linear pass
+    over ``candles`` and returns the same entry dicts, keyed by trade date.
+    Instead of rescanning after each entry, every breakout is tested against
+    the re-arm rule at once: with ``"inside"`` a breakout enters if a
+    non-breakout candle closed inside the range since the previous breakout,
+    with ``"opposite"`` if it points the other way from the previous one.
+    """
+    counts = candles.stops - candles.starts
+    valid = np.flatnonzero(counts >= orb_candles)
+    if len(valid) == 0:
+        return {}
+
+    # Opening range: the first ``orb_candles`` candles of each session.
+    orb_rows = candles.starts[valid, None] + np.arange(orb_candles)
+    session_high = np.full(len(candles), np.nan)
+    session_low = np.full(len(candles), np.nan)
+    session_high[valid] = candles.high[orb_rows].max(axis=1)
+    session_low[valid] = candles.low[orb_rows].min(axis=1)
+    end_rows = candles.starts + orb_candles - 1
+
+    session_ids = candles.session_ids
+    position = np.arange(len(session_ids)) - candles.starts[session_ids]
+    eligible = position >= orb_candles
     if cutoff_time is not None:
-        cutoff = dt.datetime.combine(orb_range.end_ts.date(), cutoff_time)
-        cutoff = pd.Timestamp(cutoff, tz=MARKET_TIMEZONE)
-        breakout_df = breakout_df.loc[breakout_df.index <= cutoff]
+        local = candles.index.tz_localize(None).as_unit("ns").asi8
+        end_local = local[np.minimum(end_rows, len(local) - 1)]
+        offset = pd.Timedelta(
+            hours=cutoff_time.hour,
+            minutes=cutoff_time.minute,
+            seconds=cutoff_time.second,
+            microseconds=cutoff_time.microsecond,
+        ).value
+        cutoff = end_local - end_local % NANOS_PER_DAY + offset
+        eligible &= local <= cutoff[session_ids]
+
+    orb_high = session_high[session_ids]
+    orb_low = session_low[session_ids]
+    if breakout_basis == "wick":
+        calls = candles.high > orb_high
+        puts = candles.low < orb_low
+    else:
+        calls = candles.close > orb_high
+        puts = candles.close < orb_low
+        if confirm_full_candle:
+            calls &= candles.open > orb_high
+            puts &= candles.open < orb_low
+
+    is_hit = eligible & (calls | puts)
+    hits = np.flatnonzero(is_hit)
+    hit_sessions = session_ids[hits]
+    take = np.ones(len(hits), dtype=bool)
+    take[1:] = hit_sessions[1:] != hit_sessions[:-1]
+    if rearm == "opposite":
+        take[1:] |= calls[hits[1:]] != calls[hits[:-1]]
+    else:
+        inside = (
+            (position >= orb_candles)
+            & ~is_hit
+            & (candles.close >= orb_low)
+            & (candles.close <= orb_high)
+        )
+        rows = np.arange(len(session_ids))
+        last_inside = np.maximum.accumulate(np.where(inside, rows, -1))
+        take[1:] |= hits[:-1] < last_inside[hits[1:]]
+    taken = hits[take]
 
-    for ts, row in breakout_df.iterrows():
-        close_price = float(row["close"])
-        open_price = float(row["open"])
-        high_price = float(row["high"])
-        low_price = float(row["low"])
+    taken = first_per_session(taken, session_ids, max_entries)
 
+    entries: dict[dt.date, list[dict]] = {}
+    for session, row in zip(session_ids[taken].tolist(), taken.tolist()):
+        high = float(session_high[session])
+        low = float(session_low[session])
+        context = {
+            "orb_high": high,
+            "orb_low": low,
+            "orb_end_ts": candles.index[end_rows[session]].isoformat(),
+        }
+        is_call = bool(calls[row])
         if breakout_basis == "wick":
-            if high_price > orb_range.high:
-                return {
-                    "entry_ts": ts,
-                    "direction": "CALL",
-                    "spy_price_at_entry": high_price,
-                    "context": {
-                        "orb_high": orb_range.high,
-                        "orb_low": orb_range.low,
-                        "orb_end_ts": orb_range.end_ts.isoformat(),
-                        "candle_high": high_price,
-                        "candle_low": low_price,
-                        "candle_close": close_price,
-                        "breakout_basis": breakout_basis,
-                    },
-                }
-            if low_price < orb_range.low:
-                return {
-                    "entry_ts": ts,
-                    "direction": "PUT",
-                    "spy_price_at_entry": low_price,
-                    "context": {
-                        "orb_high": orb_range.high,
-                        "orb_low": orb_range.low,
-                        "orb_end_ts": orb_range.end_ts.isoformat(),
-                        "candle_high": high_price,
-                        "candle_low": low_price,
-                        "candle_close": close_price,
-                        "breakout_basis": breakout_basis,
-                    },
-                }
-            continue
+            price = float(candles.high[row] if is_call else candles.low[row])
+            context.update(
+                candle_high=float(candles.high[row]),
+                candle_low=float(candles.low[row]),
+                candle_close=float(candles.close[row]),
+            )
+        else:
+            price = float(candles.close[row])
+            context.update(
+                candle_open=float(candles.open[row]),
+                candle_close=float(candles.close[row]),
+            )
+        context["breakout_basis"] = breakout_basis
+        entries.setdefault(candles.dates[session], []).append(
+            {
+                "entry_ts": candles.index[row],
+                "direction": "CALL" if is_call else "PUT",
+                "spy_price_at_entry": price,
+                "context": context,
+            }
+        )
+    return entries
+
 
-        if close_price > orb_range.high:
-            if confirm_full_candle and open_price <= orb_range.high:
+class OrbStrategy(Strategy):
+    """Opening-range breakout on N-minute candles; reads no indicators."""
+
+    name = "orb_v1"
+
+    def find_entries(self, bars: SessionBars, config: "Pass1Config") -> Entries:
+        orb_candles = max(1, config.orb_minutes // config.candle_interval_minutes)
+        if config.orb_engine == "loop":
+            return self._loop_entries(bars, config, orb_candles)
+        return find_orb_entries(
+            resample_sessions(bars, interval_minutes=config.candle_interval_minutes),
+            orb_candles=orb_candles,
+            cutoff_time=config.no_entries_after,
+            breakout_basis=config.breakout_basis,
+            confirm_full_candle=config.confirm_full_candle,
+            max_entries=config.max_trades_per_day,
+            rearm=config.rearm,
+        )
+
+    def _loop_entries(
+        self, bars: SessionBars, config: "Pass1Config", orb_candles: int
+    ) -> Entries:
+        entries: Entries = {}
+        for trade_date, day_df in bars.items():
+            session_df = regular_hours(day_df)
+            if session_df.empty:
                 continue
-            return {
-                "entry_ts": ts,
-                "direction": "CALL",
-                "spy_price_at_entry": close_price,
-                "context": {
-                    "orb_high": orb_range.high,
-                    "orb_low": orb_range.low,
-                    "orb_end_ts": orb_range.end_ts.isoformat(),
-                    "candle_open": open_price,
-                    "candle_close": close_price,
-                    "breakout_basis": breakout_basis,
-                },
-            }
-        if close_price < orb_range.low:
-            if confirm_full_candle and open_price >= orb_range.low:
+            resampled_df = resample_bars(
+                session_df, interval_minutes=config.candle_interval_minutes
+            )
+            orb_range = calculate_orb_range(resampled_df, orb_candles=orb_candles)
+            if orb_range is None:
                 continue
-            return {
-                "entry_ts": ts,
-                "direction": "PUT",
-                "spy_price_at_entry": close_price,
-                "context": {
-                    "orb_high": orb_range.high,
-                    "orb_low": orb_range.low,
-                    "orb_end_ts": orb_range.end_ts.isoformat(),
-                    "candle_open": open_price,
-                    "candle_close": close_price,
-                    "breakout_basis": breakout_basis,
-                },
-            }
-    return None
+            found = find_orb_session_entries(
+                resampled_df,
+                orb_range,
+                cutoff_time=config.no_entries_after,
+                breakout_basis=config.breakout_basis,
+                confirm_full_candle=config.confirm_full_candle,
+                max_entries=config.max_trades_per_day,
+                rearm=config.rearm,
+            )
+            if found:
+                entries[trade_date] = found
+        return entries
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from backtesting_bot.features import FeatureSpec
+from backtesting_bot.sessions import SessionBars
+from backtesting_bot.strategies.base import (
+    Entries,
+    Strategy,
+    crossings,
+    signal_entries,
+)
+
+if TYPE_CHECKING:
+    from backtesting_bot.pass1 import Pass1Config
+
+
+class RsiThresholdStrategy(Strategy):
+    """RSI mean reversion on 1-minute closes.
+
+    A CALL enters at the close of the bar where RSI climbs back above the
+    oversold level, a PUT where it falls back below the overbought level.
+    """
+
+    name = "rsi_v1"
+
+    def features(self, config: "Pass1Config") -> tuple[FeatureSpec, ...]:
+        return (FeatureSpec("rsi", "rsi", config.rsi_period),)
+
+    def find_entries(self, bars: SessionBars, config: "Pass1Config") -> Entries:
+        rsi = bars.frame["rsi"].to_numpy()
+        calls, _ = crossings(rsi, config.rsi_oversold, bars)
+        _, puts = crossings(rsi, config.rsi_overbought, bars)
+        return signal_entries(
+            bars,
+            calls,
+            puts & ~calls,
+            config,
+            {
+                "rsi": rsi,
+                "rsi_period": config.rsi_period,
+                "rsi_oversold": config.rsi_oversold,
+                "rsi_overbought": config.rsi_overbought,
+            },
+        )
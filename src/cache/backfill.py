@@ -0,0 +1,218 @@
+"""Concurrent backfill of the SPY 1-minute and option bar caches."""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Mapping
+
+import pandas as pd
+
+from src.cache.journal import DONE, FetchJournal
+from src.cache.option_cache import OptionBarCache
+from src.cache.spy_cache import Spy1mCache, range_chunks
+from src.providers.base import MarketDataProvider, OptionContract, OptionsDataProvider
+from src.providers.http import CircuitOpenError
+
+DEFAULT_BACKFILL_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackfillSummary:
+    fetched: list[date] = field(default_factory=list)
+    skipped: list[date] = field(default_factory=list)
+    failed: dict[date, str] = field(default_factory=dict)
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    interrupted: bool = False
+    contracts_fetched: int = 0
+
+    @property
+    def days_per_second(self) -> float:
+        return len(self.fetched) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes_written / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.interrupted
+
+    def describe(self) -> str:
+        status = " (interrupted)" if self.interrupted else ""
+        contracts = (
+            f" Contracts={self.contracts_fetched}" if self.contracts_fetched else ""
+        )
+        return (
+            f"Cached={len(self.fetched)}{contracts} Skipped={len(self.skipped)} "
+            f"Failed={len(self.failed)}{status} in {self.elapsed:.1f}s "
+            f"({self.days_per_second:.2f} days/s, "
+            f"{self.bytes_per_second / 1024:.1f} KiB/s written)"
+        )
+
+
+def backfill(
+    cache: Spy1mCache,
+    provider: MarketDataProvider,
+    session_dates: Iterable[date],
+    workers: int = DEFAULT_BACKFILL_WORKERS,
+    journal: FetchJournal | None = None,
+) -> BackfillSummary:
+    """Fetch uncached sessions on a bounded thread pool and write them to ``cache``.
+
+    Sessions are requested in runs of at most ``provider.range_chunk_sessions``
+    adjacent sessions, split at cached or missing sessions (see ``range_chunks``).
+    Provider requests run concurrently, throttled, retried and circuit-broken
+    by the provider itself; cache writes happen on the calling thread as each
+    fetch completes, so the manifest and ``journal`` are only ever updated from
+    one thread. A chunk that still fails is recorded and the backfill moves on,
+    unless the provider's circuit breaker gives up, which stops new fetches and
+    leaves the remaining sessions pending in the journal.
+    """
+    summary = BackfillSummary()
+    started = time.perf_counter()
+    cached = cache.cached_dates()
+    session_dates = list(session_dates)
+    pending_dates = []
+    for session_date in session_dates:
+        if session_date in cached:
+            summary.skipped.append(session_date)
+            logger.info("Cache hit for %s", session_date)
+        else:
+            pending_dates.append(session_date)
+    if journal is not None:
+        finished = [
+            session_date
+            for session_date in summary.skipped
+            if journal.status(session_date) not in (None, DONE)
+        ]
+        if finished:
+            journal.mark_done(finished)
+        journal.mark_pending(pending_dates)
+
+    # Runs of adjacent sessions are fetched together when the provider supports
+    # multi-session range requests.
+    chunks = range_chunks(session_dates, pending_dates, provider.range_chunk_sessions)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        queued = iter(chunks)
+        in_flight: dict[Future[dict[date, pd.DataFrame]], list[date]] = {}
+        stopped = False
+
+        def _submit_next() -> None:
+            dates = next(queued, None)
+            if dates is not None:
+                in_flight[executor.submit(provider.fetch_spy_1m_range, dates)] = dates
+
+        # Keep at most ``workers`` fetches queued so a stop takes effect
+        # without a long tail of already-submitted requests.
+        for _ in range(max(1, workers)):
+            _submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                dates = in_flight.pop(future)
+                try:
+                    paths = cache.write_dates(future.result())
+                except CircuitOpenError as exc:
+                    stopped = True
+                    logger.error("Stopping backfill: %s", exc)
+                    continue
+                except Exception as exc:  # noqa: BLE001 - reported in the summary
+                    for session_date in dates:
+                        summary.failed[session_date] = str(exc)
+                    if journal is not None:
+                        journal.mark_failed(dates, str(exc))
+                    logger.error(
+                        "Failed to fetch %s to %s: %s", dates[0], dates[-1], exc
+                    )
+                else:
+                    summary.fetched.extend(dates)
+                    summary.bytes_written += sum(path.stat().st_size for path in paths)
+                    if journal is not None:
+                        journal.mark_done(dates)
+                    logger.info(
+                        "Cached %s to %s (%s sessions)", dates[0], dates[-1], len(dates)
+                    )
+                if not stopped:
+                    _submit_next()
+
+    summary.interrupted = stopped
+    summary.fetched.sort()
+    summary.elapsed = time.perf_counter() - started
+    return summary
+
+
+def backfill_options(
+    cache: OptionBarCache,
+    provider: OptionsDataProvider,
+    contracts_by_date: Mapping[date, Iterable[OptionContract]],
+    workers: int = DEFAULT_BACKFILL_WORKERS,
+) -> BackfillSummary:
+    """Fetch uncached option contracts, one task per trade date, on a thread pool.
+
+    Each task fetches every missing contract of its trade date, so the
+    date's expiry files are rewritten once. As with ``backfill``, writes and
+    manifest updates stay on the calling thread and a circuit breaker that
+    gives up stops new fetches.
+    """
+    summary = BackfillSummary()
+    started = time.perf_counter()
+    tasks: list[tuple[date, list[OptionContract]]] = []
+    for trade_date in sorted(contracts_by_date):
+        missing = cache.missing(trade_date, contracts_by_date[trade_date])
+        if missing:
+            tasks.append((trade_date, missing))
+        else:
+            summary.skipped.append(trade_date)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        queued = iter(tasks)
+        in_flight: dict[Future[dict[OptionContract, pd.DataFrame]], date] = {}
+        stopped = False
+
+        def _submit_next() -> None:
+            task = next(queued, None)
+            if task is not None:
+                trade_date, contracts = task
+                future = executor.submit(
+                    provider.fetch_option_1m_many, contracts, trade_date
+                )
+                in_flight[future] = trade_date
+
+        for _ in range(max(1, workers)):
+            _submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                trade_date = in_flight.pop(future)
+                try:
+                    frames = future.result()
+                    paths = cache.write(trade_date, frames)
+                except CircuitOpenError as exc:
+                    stopped = True
+                    logger.error("Stopping option backfill: %s", exc)
+                    continue
+                except Exception as exc:  # noqa: BLE001 - reported in the summary
+                    summary.failed[trade_date] = str(exc)
+                    logger.error("Failed to fetch options for %s: %s", trade_date, exc)
+                else:
+                    summary.fetched.append(trade_date)
+                    summary.contracts_fetched += len(frames)
+                    summary.bytes_written += sum(path.stat().st_size for path in paths)
+                    logger.info(
+                        "Cached %s option contracts for %s", len(frames), trade_date
+                    )
+                if not stopped:
+                    _submit_next()
+
+    summary.interrupted = stopped
+    summary.fetched.sort()
+    summary.elapsed = time.perf_counter() - started
+    return summary
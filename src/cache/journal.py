@@ -0,0 +1,95 @@
+"""Persistent journal of SPY cache fetches.
+
+The journal (``spy/1m/_fetch_journal.json``) records every session a backfill
+was asked for as ``pending``, ``done`` or ``failed``, with the attempt count and
+last error. It is rewritten atomically after each update, so an interrupted
+backfill can be resumed from the sessions that are not ``done``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+JOURNAL_FILE_NAME = "_fetch_journal.json"
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def journal_path(cache_root: Path) -> Path:
+    return Path(cache_root) / JOURNAL_FILE_NAME
+
+
+@dataclass
+class FetchJournal:
+    path: Path
+    sessions: dict[date, dict] = field(default_factory=dict)
+
+    @classmethod
+    def open(cls, cache_root: Path) -> "FetchJournal":
+        path = journal_path(cache_root)
+        if not path.exists():
+            return cls(path=path)
+        payload = json.loads(path.read_text())
+        return cls(
+            path=path,
+            sessions={
+                date.fromisoformat(key): value
+                for key, value in payload.get("sessions", {}).items()
+            },
+        )
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "sessions": {
+                key.isoformat(): value for key, value in sorted(self.sessions.items())
+            }
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(payload, indent=2))
+        os.replace(tmp_path, self.path)
+
+    def status(self, session_date: date) -> str | None:
+        entry = self.sessions.get(session_date)
+        return entry["status"] if entry else None
+
+    def unfinished(self) -> list[date]:
+        """Sessions still pending or failed, in date order."""
+        return sorted(
+            session_date
+            for session_date, entry in self.sessions.items()
+            if entry["status"] != DONE
+        )
+
+    def mark_pending(self, session_dates: Iterable[date]) -> None:
+        for session_date in session_dates:
+            entry = self.sessions.setdefault(session_date, {"attempts": 0, "error": None})
+            entry["status"] = PENDING
+            entry["updated"] = _now()
+        self.save()
+
+    def mark_done(self, session_dates: Iterable[date]) -> None:
+        self._update(session_dates, DONE, None)
+
+    def mark_failed(self, session_dates: Iterable[date], error: str) -> None:
+        self._update(session_dates, FAILED, error)
+
+    def _update(self, session_dates: Iterable[date], status: str, error: str | None) -> None:
+        for session_date in session_dates:
+            entry = self.sessions.setdefault(session_date, {"attempts": 0})
+            entry["status"] = status
+            entry["attempts"] = entry.get("attempts", 0) + 1
+            entry["error"] = error
+            entry["updated"] = _now()
+        self.save()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
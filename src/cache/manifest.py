@@ -0,0 +1,265 @@
+"""Manifest of cached SPY 1-minute sessions.
+
+The manifest (``spy/1m/_manifest.parquet``) has one row per cached session:
+
+- ``file``/``row_group``: where the session lives, relative to ``spy/1m``.
+  Daily partitions (``date=YYYY-MM-DD/``) hold a single row group; compacted
+  files under ``spy/1m/_compacted/`` hold one row group per session.
+- ``rows``, ``first_ts``, ``last_ts``: bar count and timestamp bounds.
+- ``file_size``: size in bytes of the file holding the session.
+- ``content_hash``: digest of the session's bars in the compact schema.
+
+The file metadata also carries a ``cache_version``, a digest over every
+session's content hash. It changes whenever any cached bar changes, so
+downstream caches can key on it without touching the bar files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.cache.schema import (
+    COMPACT_FILE_NAME,
+    LEGACY_FILE_NAME,
+    PRICE_COLUMNS,
+    encode_bars,
+)
+
+MANIFEST_FILE_NAME = "_manifest.parquet"
+COMPACTED_DIR_NAME = "_compacted"
+CACHE_VERSION_KEY = b"cache_version"
+
+MANIFEST_SCHEMA = pa.schema(
+    [
+        ("session_date", pa.date32()),
+        ("file", pa.string()),
+        ("row_group", pa.int32()),
+        ("rows", pa.int64()),
+        ("first_ts", pa.timestamp("ns", tz="UTC")),
+        ("last_ts", pa.timestamp("ns", tz="UTC")),
+        ("file_size", pa.int64()),
+        ("content_hash", pa.string()),
+    ]
+)
+
+_HASHED_COLUMNS = ("timestamp", *PRICE_COLUMNS, "volume")
+
+logger = logging.getLogger(__name__)
+
+
+def manifest_path(cache_root: Path) -> Path:
+    return Path(cache_root) / MANIFEST_FILE_NAME
+
+
+def empty_manifest() -> pd.DataFrame:
+    return MANIFEST_SCHEMA.empty_table().to_pandas()
+
+
+def content_hash(table: pa.Table) -> str:
+    """Digest the bars of a compact-schema table."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in _HASHED_COLUMNS:
+        digest.update(np.ascontiguousarray(table.column(name).to_numpy()).tobytes())
+    return digest.hexdigest()
+
+
+def session_entry(
+    session_date: date, file_name: str, row_group: int, table: pa.Table, file_size: int
+) -> dict:
+    """Build the manifest row for one session stored as ``table``."""
+    timestamps = table.column("timestamp")
+    first_ts = last_ts = None
+    if table.num_rows:
+        first_ts = pd.Timestamp(timestamps[0].as_py(), tz="UTC")
+        last_ts = pd.Timestamp(timestamps[-1].as_py(), tz="UTC")
+    return {
+        "session_date": session_date,
+        "file": file_name,
+        "row_group": row_group,
+        "rows": table.num_rows,
+        "first_ts": first_ts,
+        "last_ts": last_ts,
+        "file_size": file_size,
+        "content_hash": content_hash(table),
+    }
+
+
+def compute_cache_version(manifest: pd.DataFrame) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for session_date, session_hash in sorted(
+        zip(manifest["session_date"], manifest["content_hash"])
+    ):
+        digest.update(f"{session_date.isoformat()}:{session_hash}\n".encode())
+    return digest.hexdigest()
+
+
+def read_manifest(cache_root: Path) -> pd.DataFrame | None:
+    """Return the stored manifest, or None if it is missing or predates this layout."""
+    path = manifest_path(cache_root)
+    if not path.exists():
+        return None
+    stored_schema = pq.read_schema(path)
+    if not (stored_schema.metadata or {}).get(CACHE_VERSION_KEY):
+        return None
+    return pq.read_table(path, schema=MANIFEST_SCHEMA).to_pandas()
+
+
+def write_manifest(cache_root: Path, manifest: pd.DataFrame) -> Path:
+    path = manifest_path(cache_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(
+        manifest.sort_values("session_date").reset_index(drop=True),
+        schema=MANIFEST_SCHEMA,
+        preserve_index=False,
+    )
+    table = table.replace_schema_metadata(
+        {CACHE_VERSION_KEY: compute_cache_version(manifest).encode()}
+    )
+    # A per-writer tmp name, so concurrent writers never replace each other's
+    # half-written file.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def upsert_sessions(manifest: pd.DataFrame, entries: Iterable[dict]) -> pd.DataFrame:
+    """Replace or add the manifest rows for ``entries``."""
+    updates = pd.DataFrame(list(entries), columns=MANIFEST_SCHEMA.names)
+    if updates.empty:
+        return manifest
+    kept = manifest.loc[~manifest["session_date"].isin(set(updates["session_date"]))]
+    if kept.empty:
+        merged = updates
+    else:
+        merged = pd.concat([kept, updates], ignore_index=True)
+    return merged.sort_values("session_date").reset_index(drop=True)
+
+
+def daily_partition_dirs(cache_root: Path) -> dict[date, str]:
+    """Map session dates to their ``date=YYYY-MM-DD`` directory names in one listing."""
+    partitions: dict[date, str] = {}
+    if not Path(cache_root).is_dir():
+        return partitions
+    with os.scandir(cache_root) as entries:
+        for entry in entries:
+            if not entry.is_dir() or not entry.name.startswith("date="):
+                continue
+            try:
+                session_date = date.fromisoformat(entry.name[len("date=") :])
+            except ValueError:
+                continue
+            partitions[session_date] = entry.name
+    return partitions
+
+
+def partition_file(cache_root: Path, partition_dir: str) -> str | None:
+    """Return the data file (relative) of a daily partition, preferring the compact one."""
+    for file_name in (COMPACT_FILE_NAME, LEGACY_FILE_NAME):
+        if (Path(cache_root) / partition_dir / file_name).exists():
+            return f"{partition_dir}/{file_name}"
+    return None
+
+
+def is_compacted(file_name: str) -> bool:
+    return file_name.startswith(f"{COMPACTED_DIR_NAME}/")
+
+
+def is_legacy(file_name: str) -> bool:
+    return file_name.endswith(f"/{LEGACY_FILE_NAME}")
+
+
+def daily_entry(cache_root: Path, session_date: date, file_name: str) -> dict:
+    """Index a daily partition file written outside ``Spy1mCache.write_date``."""
+    path = Path(cache_root) / file_name
+    if is_legacy(file_name):
+        table = encode_bars(pd.read_parquet(path))
+    else:
+        table = pq.read_table(path)
+    return session_entry(session_date, file_name, 0, table, path.stat().st_size)
+
+
+def _compacted_entries(cache_root: Path) -> list[dict]:
+    entries: list[dict] = []
+    for path in sorted((Path(cache_root) / COMPACTED_DIR_NAME).glob("*.parquet")):
+        parquet_file = pq.ParquetFile(path)
+        file_name = path.relative_to(cache_root).as_posix()
+        file_size = path.stat().st_size
+        for row_group in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(row_group)
+            if table.num_rows == 0:
+                continue
+            session_date = table.column("session_date")[0].as_py()
+            entries.append(
+                session_entry(session_date, file_name, row_group, table, file_size)
+            )
+    return entries
+
+
+def load_manifest(cache_root: Path, persist: bool = False) -> pd.DataFrame:
+    """Return the manifest, reconciled against one listing of the cache root.
+
+    ``Spy1mCache`` keeps the manifest current as it writes. Daily partitions
+    added or removed by other writers are picked up here, and a missing or
+    outdated manifest is rebuilt from the files on disk. Only writers pass
+    ``persist`` to save the reconciled manifest (when the cache root is
+    writable); readers keep it in memory, so they never race a writer.
+    """
+    cache_root = Path(cache_root)
+    manifest = read_manifest(cache_root)
+    changed = manifest is None
+    if manifest is None:
+        manifest = upsert_sessions(empty_manifest(), _compacted_entries(cache_root))
+
+    # Known daily partitions are trusted; only directories the manifest has
+    # not seen are probed for their data file.
+    on_disk = daily_partition_dirs(cache_root)
+    daily_rows = ~manifest["file"].map(is_compacted)
+    indexed = dict(
+        zip(manifest.loc[daily_rows, "session_date"], manifest.loc[daily_rows, "file"])
+    )
+    removed = [
+        session_date
+        for session_date, file_name in indexed.items()
+        if on_disk.get(session_date) != file_name.split("/", 1)[0]
+    ]
+    if removed:
+        manifest = manifest.loc[~manifest["session_date"].isin(removed)]
+        changed = True
+    added = []
+    for session_date, partition_dir in on_disk.items():
+        if session_date in indexed and session_date not in removed:
+            continue
+        file_name = partition_file(cache_root, partition_dir)
+        if file_name is not None:
+            added.append(daily_entry(cache_root, session_date, file_name))
+    if added:
+        manifest = upsert_sessions(manifest, added)
+        changed = True
+
+    if persist and changed and cache_root.is_dir():
+        try:
+            write_manifest(cache_root, manifest)
+        except OSError as exc:
+            logger.warning("Could not persist cache manifest under %s: %s", cache_root, exc)
+    return manifest.reset_index(drop=True)
+
+
+def cache_version(cache_root: Path) -> str:
+    """Cheap digest of the cached bars, for keying derived results."""
+    return compute_cache_version(load_manifest(cache_root))
@@ -0,0 +1,290 @@
+"""Local Parquet cache for option 1-minute bars and quotes.
+
+Layout under ``<root>/options/1m/<UNDERLYING>/``::
+
+    trade_date=YYYY-MM-DD/expiry=YYYY-MM-DD.parquet
+    _manifest.parquet
+
+Each file holds the contracts of one expiry traded on one session, one row
+group per contract ordered by right and strike. The manifest has one row per
+cached ``(trade_date, contract)`` with the file and row group holding it, so a
+backtest can read just the handful of contracts an entry needs: contracts
+sharing a file are read with a single ``read_row_groups`` call. Contracts that
+did not trade are recorded with ``rows == 0`` and no row group, so they are
+not fetched again.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.cache.schema import OPTION_SCHEMA, decode_option_bars, encode_option_bars
+from src.providers.base import OptionContract, OptionsDataProvider
+
+MANIFEST_FILE_NAME = "_manifest.parquet"
+NO_ROW_GROUP = -1
+
+OPTION_MANIFEST_SCHEMA = pa.schema(
+    [
+        ("trade_date", pa.date32()),
+        ("symbol", pa.string()),
+        ("expiry", pa.date32()),
+        ("strike", pa.float64()),
+        ("right", pa.string()),
+        ("file", pa.string()),
+        ("row_group", pa.int32()),
+        ("rows", pa.int64()),
+        ("first_ts", pa.timestamp("ns", tz="UTC")),
+        ("last_ts", pa.timestamp("ns", tz="UTC")),
+    ]
+)
+
+ContractKey = tuple[date, str]
+
+
+def option_manifest_path(cache_root: Path) -> Path:
+    return Path(cache_root) / MANIFEST_FILE_NAME
+
+
+def read_option_manifest(cache_root: Path) -> pd.DataFrame:
+    path = option_manifest_path(cache_root)
+    if not path.exists():
+        return OPTION_MANIFEST_SCHEMA.empty_table().to_pandas()
+    return pq.read_table(path, schema=OPTION_MANIFEST_SCHEMA).to_pandas()
+
+
+def write_option_manifest(cache_root: Path, manifest: pd.DataFrame) -> Path:
+    path = option_manifest_path(cache_root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(
+        manifest.sort_values(["trade_date", "symbol"]).reset_index(drop=True),
+        schema=OPTION_MANIFEST_SCHEMA,
+        preserve_index=False,
+    )
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _entry(
+    trade_date: date,
+    contract: OptionContract,
+    file_name: str,
+    row_group: int,
+    table: pa.Table,
+) -> dict:
+    timestamps = table.column("timestamp")
+    first_ts = last_ts = None
+    if table.num_rows:
+        first_ts = pd.Timestamp(timestamps[0].as_py(), tz="UTC")
+        last_ts = pd.Timestamp(timestamps[-1].as_py(), tz="UTC")
+    return {
+        "trade_date": trade_date,
+        "symbol": contract.symbol,
+        "expiry": contract.expiry,
+        "strike": contract.strike,
+        "right": contract.right,
+        "file": file_name,
+        "row_group": row_group,
+        "rows": table.num_rows,
+        "first_ts": first_ts,
+        "last_ts": last_ts,
+    }
+
+
+@dataclass
+class OptionBarCache:
+    root_dir: Path
+    underlying: str = "SPY"
+    _manifest: pd.DataFrame | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _index: dict[ContractKey, tuple[str, int, int]] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def cache_root(self) -> Path:
+        return Path(self.root_dir) / "options" / "1m" / self.underlying
+
+    def _file_name(self, trade_date: date, expiry: date) -> str:
+        return f"trade_date={trade_date}/expiry={expiry}.parquet"
+
+    def manifest(self) -> pd.DataFrame:
+        if self._manifest is None:
+            self._manifest = read_option_manifest(self.cache_root)
+        return self._manifest
+
+    def _locations(self) -> dict[ContractKey, tuple[str, int, int]]:
+        """``(trade_date, symbol) -> (file, row_group, rows)`` for cached contracts."""
+        if self._index is None:
+            manifest = self.manifest()
+            self._index = {
+                (trade_date, symbol): (file_name, int(row_group), int(rows))
+                for trade_date, symbol, file_name, row_group, rows in zip(
+                    manifest["trade_date"],
+                    manifest["symbol"],
+                    manifest["file"],
+                    manifest["row_group"],
+                    manifest["rows"],
+                )
+            }
+        return self._index
+
+    def has(self, trade_date: date, contract: OptionContract) -> bool:
+        return (trade_date, contract.symbol) in self._locations()
+
+    def missing(
+        self, trade_date: date, contracts: Iterable[OptionContract]
+    ) -> list[OptionContract]:
+        """The ``contracts`` not yet cached for ``trade_date``, deduplicated."""
+        locations = self._locations()
+        return sorted(
+            {
+                contract
+                for contract in contracts
+                if (trade_date, contract.symbol) not in locations
+            }
+        )
+
+    def write(
+        self, trade_date: date, frames: Mapping[OptionContract, pd.DataFrame]
+    ) -> list[Path]:
+        """Cache one session's bars for ``frames``' contracts in one manifest update.
+
+        Files of the touched expiries are rewritten with their existing row
+        groups plus the new contracts, then renamed into place.
+        """
+        if not frames:
+            return []
+        locations = self._locations()
+        by_expiry: dict[date, dict[OptionContract, pa.Table]] = defaultdict(dict)
+        for contract, frame in frames.items():
+            if contract.underlying != self.underlying:
+                raise ValueError(
+                    f"{contract.symbol} does not belong to the {self.underlying} cache"
+                )
+            by_expiry[contract.expiry][contract] = encode_option_bars(frame)
+
+        manifest = self.manifest()
+        same_day = manifest.loc[manifest["trade_date"] == trade_date]
+        written: list[Path] = []
+        entries: list[dict] = []
+        for expiry, tables in sorted(by_expiry.items()):
+            file_name = self._file_name(trade_date, expiry)
+            path = self.cache_root / file_name
+            for symbol in same_day.loc[same_day["expiry"] == expiry, "symbol"]:
+                contract = OptionContract.from_symbol(symbol)
+                if contract not in tables:
+                    location = locations[(trade_date, symbol)]
+                    tables[contract] = self._read_table(*location)
+
+            ordered = sorted(
+                tables.items(), key=lambda item: (item[0].right, item[0].strike)
+            )
+            non_empty = [(contract, table) for contract, table in ordered if len(table)]
+            row_groups: dict[OptionContract, int] = {}
+            if non_empty:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.tmp")
+                with pq.ParquetWriter(tmp_path, OPTION_SCHEMA) as writer:
+                    for row_group, (contract, table) in enumerate(non_empty):
+                        writer.write_table(table, row_group_size=table.num_rows)
+                        row_groups[contract] = row_group
+                os.replace(tmp_path, path)
+                written.append(path)
+            for contract, table in ordered:
+                entries.append(
+                    _entry(
+                        trade_date,
+                        contract,
+                        file_name,
+                        row_groups.get(contract, NO_ROW_GROUP),
+                        table,
+                    )
+                )
+        self._record(entries)
+        return written
+
+    def _record(self, entries: list[dict]) -> None:
+        updates = pd.DataFrame(entries, columns=OPTION_MANIFEST_SCHEMA.names)
+        manifest = self.manifest()
+        keys = set(zip(updates["trade_date"], updates["symbol"]))
+        kept = manifest.loc[
+            [key not in keys for key in zip(manifest["trade_date"], manifest["symbol"])]
+        ]
+        if kept.empty:
+            merged = updates
+        else:
+            merged = pd.concat([kept, updates], ignore_index=True)
+        write_option_manifest(self.cache_root, merged)
+        self._manifest = merged.sort_values(["trade_date", "symbol"]).reset_index(
+            drop=True
+        )
+        self._index = None
+
+    def _read_table(self, file_name: str, row_group: int, rows: int) -> pa.Table:
+        if row_group == NO_ROW_GROUP or rows == 0:
+            return OPTION_SCHEMA.empty_table()
+        return pq.ParquetFile(self.cache_root / file_name).read_row_group(row_group)
+
+    def load(
+        self,
+        trade_date: date,
+        contracts: Sequence[OptionContract],
+        columns: Sequence[str] | None = None,
+    ) -> dict[OptionContract, pd.DataFrame]:
+        """Read cached bars for ``contracts``, UTC-indexed with float prices.
+
+        Row groups living in the same file are read together, so loading the
+        few contracts of an entry costs one read per expiry. Raises
+        ``KeyError`` for contracts that are not cached.
+        """
+        locations = self._locations()
+        by_file: dict[str, list[tuple[OptionContract, int, int]]] = defaultdict(list)
+        frames: dict[OptionContract, pd.DataFrame] = {}
+        empty = OPTION_SCHEMA.empty_table()
+        for contract in dict.fromkeys(contracts):
+            location = locations.get((trade_date, contract.symbol))
+            if location is None:
+                raise KeyError(f"{contract.symbol} is not cached for {trade_date}")
+            file_name, row_group, rows = location
+            if row_group == NO_ROW_GROUP or rows == 0:
+                frames[contract] = decode_option_bars(empty, columns)
+            else:
+                by_file[file_name].append((contract, row_group, rows))
+
+        for file_name, members in by_file.items():
+            table = pq.ParquetFile(self.cache_root / file_name).read_row_groups(
+                [row_group for _, row_group, _ in members],
+                columns=["timestamp", *columns] if columns is not None else None,
+            )
+            offset = 0
+            for contract, _, rows in members:
+                piece = table.slice(offset, rows)
+                frames[contract] = decode_option_bars(piece, columns)
+                offset += rows
+        return {contract: frames[contract] for contract in dict.fromkeys(contracts)}
+
+    def fetch_and_cache(
+        self,
+        provider: OptionsDataProvider,
+        trade_date: date,
+        contracts: Iterable[OptionContract],
+    ) -> list[Path]:
+        """Fetch and cache the contracts not yet cached for ``trade_date``."""
+        missing = self.missing(trade_date, contracts)
+        if not missing:
+            return []
+        frames = provider.fetch_option_1m_many(missing, trade_date)
+        return self.write(trade_date, frames)
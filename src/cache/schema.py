@@ -0,0 +1,190 @@
+"""Compact on-disk schema for cached 1-minute bars.
+
+Schema version 2 stores:
+
+- ``timestamp``: int64 nanoseconds since the Unix epoch (UTC)
+- ``open``/``high``/``low``/``close``: int32 prices scaled by ``PRICE_SCALE``
+- ``volume``: int32
+- ``session_date``: date32 ET trading session of the bar
+
+Rows are sorted by timestamp at write time, so readers never need a tz
+conversion or a sort. Scaled integer prices round-trip exactly for prices with
+up to four decimals, which keeps backtest arithmetic identical to the raw
+provider values. Backtest loaders keep them scaled in memory
+(``decode_bars(..., scaled=True)``) and divide by ``PRICE_SCALE`` where a
+price is used. Files written before ``minute_of_session`` was dropped still
+carry that column; readers ignore it.
+
+Option bars (``OPTION_SCHEMA``) use the same timestamp and price encoding plus
+nullable ``bid``/``ask`` quote columns.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+MARKET_TIMEZONE = "America/New_York"
+CACHE_SCHEMA_VERSION = 2
+PRICE_SCALE = 10_000
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+LEGACY_FILE_NAME = "data.parquet"
+COMPACT_FILE_NAME = f"data.v{CACHE_SCHEMA_VERSION}.parquet"
+
+COMPACT_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.int64()),
+        ("open", pa.int32()),
+        ("high", pa.int32()),
+        ("low", pa.int32()),
+        ("close", pa.int32()),
+        ("volume", pa.int32()),
+        ("session_date", pa.date32()),
+    ],
+    metadata={
+        b"cache_schema_version": str(CACHE_SCHEMA_VERSION).encode(),
+        b"price_scale": str(PRICE_SCALE).encode(),
+    },
+)
+
+OPTION_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.int64()),
+        ("open", pa.int32()),
+        ("high", pa.int32()),
+        ("low", pa.int32()),
+        ("close", pa.int32()),
+        ("volume", pa.int32()),
+        ("bid", pa.int32()),
+        ("ask", pa.int32()),
+    ],
+    metadata={
+        b"cache_schema_version": str(CACHE_SCHEMA_VERSION).encode(),
+        b"price_scale": str(PRICE_SCALE).encode(),
+    },
+)
+QUOTE_COLUMNS = ("bid", "ask")
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+
+def _scale_prices(name: str, prices: pd.Series, order: np.ndarray) -> np.ndarray:
+    """Scale prices to int32; a missing or unrepresentable price is an error."""
+    values = prices.to_numpy(dtype=np.float64)[order]
+    scaled = np.round(values * PRICE_SCALE)
+    invalid = ~(np.abs(scaled) <= _INT32_MAX)
+    if invalid.any():
+        raise ValueError(
+            f"Unsupported {name} price {values[invalid][0]:g}: "
+            f"expected a number within +/-{_INT32_MAX / PRICE_SCALE:g}"
+        )
+    return scaled.astype(np.int32)
+
+
+def _encode_volume(volume: pd.Series, order: np.ndarray) -> pa.Array:
+    """Round volumes to int32; missing volume is 0 and anything else must fit."""
+    values = np.round(volume.to_numpy(dtype=np.float64)[order])
+    values = np.where(np.isnan(values), 0.0, values)
+    out_of_range = (values < 0) | (values > _INT32_MAX)
+    if out_of_range.any():
+        raise ValueError(
+            f"Unsupported volume {values[out_of_range][0]:g}: "
+            f"expected 0..{_INT32_MAX}"
+        )
+    return pa.array(values.astype(np.int32), pa.int32())
+
+
+def encode_bars(frame: pd.DataFrame) -> pa.Table:
+    """Convert a provider frame (``timestamp`` + OHLCV columns) to the compact schema."""
+    timestamps = pd.DatetimeIndex(pd.to_datetime(frame["timestamp"], utc=True))
+    order = np.argsort(timestamps.asi8, kind="stable")
+    timestamps = timestamps[order].as_unit("ns")
+
+    local = timestamps.tz_convert(MARKET_TIMEZONE).tz_localize(None).values
+    session_days = local.astype("datetime64[D]")
+
+    columns: dict[str, pa.Array] = {"timestamp": pa.array(timestamps.asi8, pa.int64())}
+    for name in PRICE_COLUMNS:
+        columns[name] = pa.array(_scale_prices(name, frame[name], order), pa.int32())
+    columns["volume"] = _encode_volume(frame["volume"], order)
+    columns["session_date"] = pa.array(session_days, pa.date32())
+    return pa.Table.from_pydict(columns, schema=COMPACT_SCHEMA)
+
+
+def decode_bars(
+    table: pa.Table, columns: Sequence[str] | None = None, scaled: bool = False
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Decode compact rows into a UTC-indexed frame plus session epoch days.
+
+    Prices are floats unless ``scaled``, which keeps the stored int32 values.
+    """
+    columns = tuple(columns) if columns is not None else (*PRICE_COLUMNS, "volume")
+    timestamps = table.column("timestamp").to_numpy().astype("datetime64[ns]")
+    index = pd.DatetimeIndex(timestamps, name="timestamp").tz_localize("UTC")
+
+    data: dict[str, np.ndarray] = {}
+    for name in columns:
+        values = table.column(name).to_numpy()
+        if name in PRICE_COLUMNS and not scaled:
+            values = values.astype(np.float64) / PRICE_SCALE
+        data[name] = values
+    days = table.column("session_date").to_numpy().astype("datetime64[D]")
+    return pd.DataFrame(data, index=index), days.astype(np.int64)
+
+
+def scale_prices(frame: pd.DataFrame) -> pd.DataFrame:
+    """``frame`` with float price columns stored as ``decode_bars(scaled=True)``."""
+    order = np.arange(len(frame))
+    return frame.assign(
+        **{
+            name: _scale_prices(name, frame[name], order)
+            for name in PRICE_COLUMNS
+            if name in frame.columns and frame[name].dtype.kind == "f"
+        }
+    )
+
+
+def encode_option_bars(frame: pd.DataFrame) -> pa.Table:
+    """Convert option bars (``timestamp``, OHLCV, optional bid/ask) to the schema."""
+    timestamps = pd.DatetimeIndex(pd.to_datetime(frame["timestamp"], utc=True))
+    order = np.argsort(timestamps.asi8, kind="stable")
+    columns: dict[str, pa.Array] = {
+        "timestamp": pa.array(timestamps[order].as_unit("ns").asi8, pa.int64())
+    }
+    for name in (*PRICE_COLUMNS, *QUOTE_COLUMNS):
+        if name not in frame.columns:
+            columns[name] = pa.nulls(len(frame), pa.int32())
+            continue
+        values = frame[name]
+        missing = np.isnan(values.to_numpy(dtype=np.float64)[order])
+        columns[name] = pa.array(
+            _scale_prices(name, values.fillna(0.0), order), pa.int32(), mask=missing
+        )
+    columns["volume"] = _encode_volume(frame["volume"], order)
+    return pa.Table.from_pydict(columns, schema=OPTION_SCHEMA)
+
+
+def decode_option_bars(
+    table: pa.Table, columns: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """Decode option rows into a UTC-indexed float frame (missing quotes are NaN)."""
+    columns = (
+        tuple(columns)
+        if columns is not None
+        else (*PRICE_COLUMNS, "volume", *QUOTE_COLUMNS)
+    )
+    timestamps = table.column("timestamp").to_numpy().astype("datetime64[ns]")
+    index = pd.DatetimeIndex(timestamps, name="timestamp").tz_localize("UTC")
+    data: dict[str, np.ndarray] = {}
+    for name in columns:
+        column = table.column(name)
+        if name == "volume":
+            data[name] = column.to_numpy()
+            continue
+        values = column.to_numpy(zero_copy_only=False).astype(np.float64)
+        data[name] = values / PRICE_SCALE
+    return pd.DataFrame(data, index=index)
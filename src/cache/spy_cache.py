@@ -2,42 +2,275 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+import shutil
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Mapping
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from src.cache.journal import FetchJournal
+from src.cache.manifest import (
+    COMPACTED_DIR_NAME,
+    compute_cache_version,
+    is_compacted,
+    is_legacy,
+    load_manifest,
+    session_entry,
+    upsert_sessions,
+    write_manifest,
+)
+from src.cache.schema import (
+    COMPACT_FILE_NAME,
+    COMPACT_SCHEMA,
+    LEGACY_FILE_NAME,
+    MARKET_TIMEZONE,
+    decode_bars,
+    encode_bars,
+)
 from src.providers.base import MarketDataProvider
 
+COMPACTION_GRANULARITIES = {"month": 7, "year": 4}
+# Longest calendar gap between two sessions fetched in one range request: a
+# weekend next to a market holiday.
+MAX_SESSION_GAP_DAYS = 4
+
+
+def range_chunks(
+    session_dates: Iterable[date], pending: Iterable[date], size: int
+) -> list[list[date]]:
+    """Group ``pending`` into range requests of at most ``size`` sessions.
+
+    A range request spans its first to its last session, so a chunk is split
+    wherever two pending dates are not adjacent in ``session_dates`` (a cached
+    session sits between them) or are more than ``MAX_SESSION_GAP_DAYS``
+    apart; a sparse resume never downloads the months in between.
+    """
+    pending = set(pending)
+    chunks: list[list[date]] = []
+    current: list[date] = []
+    previous: date | None = None
+    for session_date in session_dates:
+        if session_date not in pending:
+            previous = None
+            continue
+        if current and (
+            previous is None
+            or len(current) >= max(1, size)
+            or (session_date - previous).days > MAX_SESSION_GAP_DAYS
+        ):
+            chunks.append(current)
+            current = []
+        current.append(session_date)
+        previous = session_date
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 @dataclass
 class Spy1mCache:
     root_dir: Path
+    _manifest: pd.DataFrame | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def cache_root(self) -> Path:
+        return Path(self.root_dir) / "spy" / "1m"
+
+    def _partition_dir(self, session_date: date) -> Path:
+        return self.cache_root / f"date={session_date.isoformat()}"
 
     def _date_path(self, session_date: date) -> Path:
-        return self.root_dir / "spy" / "1m" / f"date={session_date.isoformat()}" / "data.parquet"
+        return self._partition_dir(session_date) / COMPACT_FILE_NAME
+
+    def manifest(self) -> pd.DataFrame:
+        if self._manifest is None:
+            self._manifest = load_manifest(self.cache_root, persist=True)
+        return self._manifest
+
+    def _record(self, entries: list[dict]) -> None:
+        manifest = upsert_sessions(self.manifest(), entries)
+        write_manifest(self.cache_root, manifest)
+        self._manifest = manifest
+
+    def cached_dates(self) -> set[date]:
+        return set(self.manifest()["session_date"])
+
+    def cache_version(self) -> str:
+        return compute_cache_version(self.manifest())
 
     def has_date(self, session_date: date) -> bool:
-        return self._date_path(session_date).exists()
+        return bool((self.manifest()["session_date"] == session_date).any())
+
+    def read_date(self, session_date: date) -> pd.DataFrame:
+        """Return a cached session as a provider frame (ET ``timestamp`` + OHLCV)."""
+        manifest = self.manifest()
+        rows = manifest.loc[manifest["session_date"] == session_date]
+        if rows.empty:
+            raise KeyError(f"{session_date} is not cached under {self.cache_root}")
+        row = rows.iloc[0]
+        table = self._read_session(row["file"], int(row["row_group"]))
+        frame, _ = decode_bars(table.cast(COMPACT_SCHEMA))
+        frame.index = frame.index.tz_convert(MARKET_TIMEZONE)
+        return frame.reset_index()
 
     def write_date(self, session_date: date, frame: pd.DataFrame) -> Path:
-        path = self._date_path(session_date)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        frame.to_parquet(path, index=False)
-        return path
+        return self.write_dates({session_date: frame})[0]
+
+    def write_dates(self, frames: Mapping[date, pd.DataFrame]) -> list[Path]:
+        """Write one daily partition per session and record them in one manifest update."""
+        paths: list[Path] = []
+        entries: list[dict] = []
+        for session_date, frame in frames.items():
+            path = self._date_path(session_date)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            table = encode_bars(frame)
+            # Write then rename so an interrupted write never leaves a partial
+            # partition behind.
+            tmp_path = path.with_name(f"{path.name}.tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+            legacy_path = path.parent / LEGACY_FILE_NAME
+            if legacy_path.exists():
+                legacy_path.unlink()
+            entries.append(
+                session_entry(
+                    session_date,
+                    path.relative_to(self.cache_root).as_posix(),
+                    0,
+                    table,
+                    path.stat().st_size,
+                )
+            )
+            paths.append(path)
+        if entries:
+            self._record(entries)
+        return paths
+
+    def upgrade_schema(self) -> list[Path]:
+        """Rewrite legacy ``data.parquet`` partitions in the compact schema."""
+        upgraded: list[Path] = []
+        manifest = self.manifest()
+        for row in manifest.loc[manifest["file"].map(is_legacy)].itertuples(index=False):
+            frame = pd.read_parquet(self.cache_root / row.file)
+            upgraded.append(self.write_date(row.session_date, frame))
+        return upgraded
+
+    def compact(self, granularity: str = "month") -> list[Path]:
+        """Merge daily partitions into monthly or yearly files.
+
+        Each compacted file holds one sorted row group per session and is
+        indexed by the manifest. Daily partitions are removed once their
+        sessions are recorded in the manifest; sessions fetched later land in
+        new daily partitions and are merged on the next compaction.
+        """
+        if granularity not in COMPACTION_GRANULARITIES:
+            raise ValueError(f"Unsupported compaction granularity: {granularity}")
+        key_length = COMPACTION_GRANULARITIES[granularity]
+
+        manifest = self.manifest()
+        locations = {
+            row.session_date: (row.file, int(row.row_group))
+            for row in manifest.itertuples(index=False)
+        }
+
+        groups: dict[str, set[date]] = defaultdict(set)
+        # Groups that gained daily sessions, or were compacted at a different
+        # granularity, are rewritten so each group stays in one file.
+        for session_date, (file_name, _) in locations.items():
+            key = session_date.isoformat()[:key_length]
+            if not is_compacted(file_name) or file_name != self._compacted_file(key):
+                groups[key].add(session_date)
+        for session_date, (file_name, _) in locations.items():
+            key = session_date.isoformat()[:key_length]
+            if key in groups:
+                groups[key].add(session_date)
+
+        written: list[Path] = []
+        merged: list[Path] = []
+        entries: list[dict] = []
+        for key in sorted(groups):
+            sessions: list[tuple[date, pa.Table]] = []
+            for session_date in sorted(groups[key]):
+                file_name, row_group = locations[session_date]
+                table = self._read_session(file_name, row_group)
+                if table.num_rows == 0:
+                    continue
+                sessions.append((session_date, table.cast(COMPACT_SCHEMA)))
+            if not sessions:
+                continue
+
+            relative = self._compacted_file(key)
+            path = self.cache_root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.tmp")
+            with pq.ParquetWriter(tmp_path, COMPACT_SCHEMA) as writer:
+                for session_date, table in sessions:
+                    writer.write_table(table, row_group_size=table.num_rows)
+            os.replace(tmp_path, path)
+            file_size = path.stat().st_size
+            for row_group, (session_date, table) in enumerate(sessions):
+                entries.append(
+                    session_entry(session_date, relative, row_group, table, file_size)
+                )
+                file_name, _ = locations[session_date]
+                if not is_compacted(file_name):
+                    merged.append(self.cache_root / file_name.split("/", 1)[0])
+            written.append(path)
+
+        self._record(entries)
+
+        referenced = set(self.manifest()["file"])
+        for stale in (self.cache_root / COMPACTED_DIR_NAME).glob("*.parquet"):
+            if stale.relative_to(self.cache_root).as_posix() not in referenced:
+                stale.unlink()
+        for partition in merged:
+            shutil.rmtree(partition)
+        return written
+
+    @staticmethod
+    def _compacted_file(key: str) -> str:
+        return f"{COMPACTED_DIR_NAME}/{key}.parquet"
+
+    def _read_session(self, file_name: str, row_group: int) -> pa.Table:
+        path = self.cache_root / file_name
+        if is_legacy(file_name):
+            return encode_bars(pd.read_parquet(path))
+        return pq.ParquetFile(path).read_row_group(
+            row_group, columns=COMPACT_SCHEMA.names
+        )
 
     def fetch_and_cache(self, provider: MarketDataProvider, session_date: date) -> Path:
         frame = provider.fetch_spy_1m(session_date)
         return self.write_date(session_date, frame)
 
+    def journal(self) -> FetchJournal:
+        return FetchJournal.open(self.cache_root)
+
     def cache_range(
         self, provider: MarketDataProvider, session_dates: Iterable[date]
     ) -> list[Path]:
+        """Fetch and cache the uncached ``session_dates``, recording progress in the journal."""
+        journal = self.journal()
+        cached = self.cached_dates()
+        session_dates = list(session_dates)
+        missing = [value for value in session_dates if value not in cached]
+        journal.mark_pending(missing)
         written: list[Path] = []
-        for session_date in session_dates:
-            if self.has_date(session_date):
-                continue
-            written.append(self.fetch_and_cache(provider, session_date))
+        for dates in range_chunks(
+            session_dates, missing, provider.range_chunk_sessions
+        ):
+            try:
+                written.extend(self.write_dates(provider.fetch_spy_1m_range(dates)))
+            except Exception as exc:
+                journal.mark_failed(dates, str(exc))
+                raise
+            journal.mark_done(dates)
         return written
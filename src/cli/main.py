@@ -8,9 +8,12 @@ from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Iterable, List
 
+from src.cache.backfill import DEFAULT_BACKFILL_WORKERS, backfill
 from src.cache.spy_cache import Spy1mCache
-from src.config import ConfigError, load_config
+from src.config import ConfigError, load_config, load_local_paths
 from src.providers.alpaca import AlpacaBroker, AlpacaMarketDataProvider
+from src.providers.base import MarketDataProvider
+from src.providers.synthetic import SyntheticMarketDataProvider
 
 
 def _parse_date(value: str) -> date:
@@ -70,37 +73,61 @@ def health_check(args: argparse.Namespace) -> int:
 
 
 def fetch_spy(args: argparse.Namespace) -> int:
-    try:
-        config = load_config(Path(args.config) if args.config else None)
-    except ConfigError as exc:
-        logging.error("Config error: %s", exc)
-        return 1
-
-    start = _parse_date(args.start)
-    end = _parse_date(args.end)
-    if end < start:
-        logging.error("End date must be on or after start date.")
-        return 1
-
-    provider = AlpacaMarketDataProvider(config.alpaca)
-    cache = Spy1mCache(config.local.data_dir)
-
-    cached = 0
-    fetched = 0
-    for session_date in _trading_days(start, end):
-        if cache.has_date(session_date):
-            cached += 1
-            logging.info("Cache hit for %s", session_date)
-            continue
+    config_path = Path(args.config) if args.config else None
+    provider: MarketDataProvider
+    if args.provider == "synthetic":
+        provider = SyntheticMarketDataProvider(seed=args.seed)
+        data_dir = load_local_paths(config_path).synthetic_data_dir
+    else:
         try:
-            path = cache.fetch_and_cache(provider, session_date)
-        except Exception as exc:  # noqa: BLE001 - surface provider failures
-            logging.error("Failed to fetch %s: %s", session_date, exc)
+            config = load_config(config_path)
+        except ConfigError as exc:
+            logging.error("Config error: %s", exc)
             return 1
-        fetched += 1
-        logging.info("Cached %s -> %s", session_date, path)
+        provider = AlpacaMarketDataProvider(config.alpaca)
+        data_dir = config.local.data_dir
 
-    logging.info("Done. Cached=%s Skipped=%s", fetched, cached)
+    cache = Spy1mCache(args.data_dir or data_dir)
+    journal = cache.journal()
+
+    session_dates: List[date] = []
+    if args.start or args.end:
+        if not (args.start and args.end):
+            logging.error("Both --start and --end are required.")
+            return 1
+        start = _parse_date(args.start)
+        end = _parse_date(args.end)
+        if end < start:
+            logging.error("End date must be on or after start date.")
+            return 1
+        session_dates = _trading_days(start, end)
+    elif not args.resume:
+        logging.error("Provide --start and --end, or --resume.")
+        return 1
+    if args.resume:
+        unfinished = journal.unfinished()
+        logging.info(
+            "Resuming %s unfinished sessions from the fetch journal.", len(unfinished)
+        )
+        session_dates = sorted(set(session_dates) | set(unfinished))
+
+    summary = backfill(
+        cache, provider, session_dates, workers=args.workers, journal=journal
+    )
+    print(f"Done. {summary.describe()}")
+    if not summary.ok:
+        logging.error("Some sessions were not cached; re-run with --resume to retry.")
+    return 0 if summary.ok else 1
+
+
+def compact_spy(args: argparse.Namespace) -> int:
+    # Only rewrites local files, so it needs no provider credentials.
+    local = load_local_paths(Path(args.config) if args.config else None)
+    cache = Spy1mCache(local.data_dir)
+    written = cache.compact(args.granularity)
+    for path in written:
+        logging.info("Compacted -> %s", path)
+    logging.info("Done. Files written=%s", len(written))
     return 0
 
 
@@ -116,10 +143,48 @@ def build_parser() -> argparse.ArgumentParser:
     health_parser.set_defaults(func=health_check)
 
     fetch_parser = subparsers.add_parser("fetch-spy", help="Fetch SPY 1-minute bars")
-    fetch_parser.add_argument("--start", required=True, help="Start date YYYY-MM-DD")
-    fetch_parser.add_argument("--end", required=True, help="End date YYYY-MM-DD")
+    fetch_parser.add_argument("--start", help="Start date YYYY-MM-DD")
+    fetch_parser.add_argument("--end", help="End date YYYY-MM-DD")
+    fetch_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Retry sessions left pending or failed by earlier runs",
+    )
+    fetch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_BACKFILL_WORKERS,
+        help="Number of sessions fetched concurrently",
+    )
+    fetch_parser.add_argument(
+        "--provider",
+        choices=["alpaca", "synthetic"],
+        default="alpaca",
+        help="Data source; 'synthetic' generates deterministic bars offline",
+    )
+    fetch_parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=None,
+        help="Cache root (default: local.data_dir, or <data_dir>/synthetic "
+        "for the synthetic provider)",
+    )
+    fetch_parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the synthetic provider"
+    )
     fetch_parser.set_defaults(func=fetch_spy)
 
+    compact_parser = subparsers.add_parser(
+        "compact-spy", help="Merge daily SPY cache partitions into larger files"
+    )
+    compact_parser.add_argument(
+        "--granularity",
+        choices=["month", "year"],
+        default="month",
+        help="Period covered by each compacted file",
+    )
+    compact_parser.set_defaults(func=compact_spy)
+
     return parser
 
 
@@ -14,6 +14,7 @@ import yaml
 class MassiveConfig:
     api_key: str
     base_url: str = "https://api.polygon.io"
+    max_requests_per_minute: float = 5
 
 
 @dataclass(frozen=True)
@@ -22,12 +23,21 @@ class AlpacaConfig:
     secret_key: str
     base_url: str = "https://paper-api.alpaca.markets"
     data_base_url: str = "https://data.alpaca.markets"
+    max_requests_per_minute: float = 200
+
+
+# Generated data lives under its own root so it never mixes with vendor data.
+SYNTHETIC_DIR_NAME = "synthetic"
 
 
 @dataclass(frozen=True)
 class LocalPaths:
     data_dir: Path
 
+    @property
+    def synthetic_data_dir(self) -> Path:
+        return self.data_dir / SYNTHETIC_DIR_NAME
+
 
 @dataclass(frozen=True)
 class AppConfig:
@@ -73,6 +83,16 @@ def _load_dotenv(path: Path) -> None:
             os.environ[key] = value
 
 
+def _local_paths(raw: Dict[str, Any]) -> LocalPaths:
+    local_cfg = raw.get("local", {})
+    return LocalPaths(data_dir=Path(local_cfg.get("data_dir", "data_local")))
+
+
+def load_local_paths(path: Optional[Path] = None) -> LocalPaths:
+    """Load only the local paths, without requiring provider credentials."""
+    return _local_paths(_load_yaml(path or DEFAULT_CONFIG_PATH))
+
+
 def load_config(path: Optional[Path] = None) -> AppConfig:
     _load_dotenv(DEFAULT_ENV_PATH)
     config_path = path or DEFAULT_CONFIG_PATH
@@ -80,7 +100,6 @@ def load_config(path: Optional[Path] = None) -> AppConfig:
 
     massive_cfg = raw.get("massive", {})
     alpaca_cfg = raw.get("alpaca", {})
-    local_cfg = raw.get("local", {})
 
     massive_key = _get_env("MASSIVE_API_KEY") or massive_cfg.get("api_key")
     alpaca_key = _get_env("ALPACA_API_KEY") or alpaca_cfg.get("api_key")
@@ -91,13 +110,36 @@ def load_config(path: Optional[Path] = None) -> AppConfig:
     if not alpaca_secret:
         raise ConfigError("Missing ALPACA_SECRET_KEY (env or config).")
 
-    massive_base = massive_cfg.get("base_url") or "https://api.polygon.io"
-    alpaca_base = alpaca_cfg.get("base_url") or "https://paper-api.alpaca.markets"
-    alpaca_data_base = alpaca_cfg.get("data_base_url") or "https://data.alpaca.markets"
-    data_dir = Path(local_cfg.get("data_dir", "data_local"))
+    massive_base = (
+        _get_env("MASSIVE_BASE_URL")
+        or massive_cfg.get("base_url")
+        or "https://api.polygon.io"
+    )
+    alpaca_base = (
+        _get_env("ALPACA_BASE_URL")
+        or alpaca_cfg.get("base_url")
+        or "https://paper-api.alpaca.markets"
+    )
+    alpaca_data_base = (
+        _get_env("ALPACA_DATA_BASE_URL")
+        or alpaca_cfg.get("data_base_url")
+        or "https://data.alpaca.markets"
+    )
+    massive_rate = float(
+        massive_cfg.get("max_requests_per_minute")
+        or MassiveConfig.max_requests_per_minute
+    )
+    alpaca_rate = float(
+        alpaca_cfg.get("max_requests_per_minute")
+        or AlpacaConfig.max_requests_per_minute
+    )
 
     return AppConfig(
-        massive=MassiveConfig(api_key=massive_key, base_url=massive_base)
+        massive=MassiveConfig(
+            api_key=massive_key,
+            base_url=massive_base,
+            max_requests_per_minute=massive_rate,
+        )
         if massive_key
         else None,
         alpaca=AlpacaConfig(
@@ -105,6 +147,7 @@ def load_config(path: Optional[Path] = None) -> AppConfig:
             secret_key=alpaca_secret,
             base_url=alpaca_base,
             data_base_url=alpaca_data_base,
+            max_requests_per_minute=alpaca_rate,
         ),
-        local=LocalPaths(data_dir=data_dir),
+        local=_local_paths(raw),
     )
@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime, time, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 import pandas as pd
 import requests
 
 from src.config import AlpacaConfig
-from src.providers.base import Broker, MarketDataProvider
+from src.providers.base import (
+    Broker,
+    MarketDataProvider,
+    regular_hours_bars,
+    split_sessions,
+)
+from src.providers.http import (
+    CircuitBreaker,
+    RetryPolicy,
+    TokenBucket,
+    pooled_session,
+    resilient_get,
+)
+
+PAGE_LIMIT = 10000
 
 
 @dataclass
@@ -30,7 +44,30 @@ class AlpacaBroker(Broker):
 
 @dataclass
 class AlpacaMarketDataProvider(MarketDataProvider):
+    # About two pages of extended-hours minute bars per request. The page size,
+    # not the window, bounds the request count: a year is still ~25 pages, so
+    # wider windows would only cost fetch concurrency.
+    range_chunk_sessions = 20
+
     config: AlpacaConfig
+    session: requests.Session = field(default_factory=pooled_session, repr=False)
+    rate_limiter: TokenBucket = field(init=False, repr=False)
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy, repr=False)
+    circuit_breaker: CircuitBreaker = field(default_factory=CircuitBreaker, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rate_limiter = TokenBucket.per_minute(self.config.max_requests_per_minute)
+
+    def _get(self, url: str, **kwargs: Any) -> requests.Response:
+        return resilient_get(
+            self.session,
+            url,
+            self.rate_limiter,
+            self.retry_policy,
+            self.circuit_breaker,
+            headers=self._headers(),
+            **kwargs,
+        )
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -40,48 +77,42 @@ class AlpacaMarketDataProvider(MarketDataProvider):
 
     def ping(self) -> bool:
         url = f"{self.config.data_base_url}/v2/stocks/SPY/bars"
-        response = requests.get(
-            url,
-            headers=self._headers(),
-            params={"timeframe": "1Min", "limit": 1},
-            timeout=10,
-        )
-        response.raise_for_status()
+        self._get(url, params={"timeframe": "1Min", "limit": 1}, timeout=10)
         return True
 
     def fetch_spy_1m(self, session_date: date) -> pd.DataFrame:
+        return self.fetch_spy_1m_range([session_date])[session_date]
+
+    def fetch_spy_1m_range(
+        self, session_dates: Sequence[date]
+    ) -> Dict[date, pd.DataFrame]:
+        """Fetch several sessions in one paginated request window.
+
+        The window spans the first to the last requested session (backfills pass
+        runs of adjacent sessions, see ``range_chunks``), and every
+        ``next_page_token`` is followed so large windows are never truncated.
+        """
+        if not session_dates:
+            return {}
         url = f"{self.config.data_base_url}/v2/stocks/SPY/bars"
-        start_dt = datetime.combine(session_date, time(0, 0), tzinfo=timezone.utc)
-        end_dt = datetime.combine(session_date, time(23, 59, 59), tzinfo=timezone.utc)
-        params = {
+        start_dt = datetime.combine(min(session_dates), time(0, 0), tzinfo=timezone.utc)
+        end_dt = datetime.combine(
+            max(session_dates), time(23, 59, 59), tzinfo=timezone.utc
+        )
+        params: Dict[str, Any] = {
             "timeframe": "1Min",
             "start": start_dt.isoformat(),
             "end": end_dt.isoformat(),
             "adjustment": "all",
-            "limit": 10000,
+            "limit": PAGE_LIMIT,
         }
-        response = requests.get(url, headers=self._headers(), params=params, timeout=30)
-        response.raise_for_status()
-        payload: Dict[str, Any] = response.json()
-        bars: List[Dict[str, Any]] = payload.get("bars", [])
-        if not bars:
-            return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
-
-        frame = pd.DataFrame(bars)
-        frame = frame.rename(
-            columns={
-                "t": "timestamp",
-                "o": "open",
-                "h": "high",
-                "l": "low",
-                "c": "close",
-                "v": "volume",
-            }
-        )
-        frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True).dt.tz_convert("America/New_York")
-        market_open = time(9, 30)
-        market_close = time(16, 0)
-        times = frame["timestamp"].dt.time
-        frame = frame[(times >= market_open) & (times <= market_close)]
-        frame = frame[["timestamp", "open", "high", "low", "close", "volume"]]
-        return frame
+        bars: List[Dict[str, Any]] = []
+        while True:
+            payload: Dict[str, Any] = self._get(url, params=params, timeout=30).json()
+            bars.extend(payload.get("bars") or [])
+            page_token = payload.get("next_page_token")
+            if not page_token:
+                break
+            params["page_token"] = page_token
+        return split_sessions(regular_hours_bars(bars), session_dates)
+
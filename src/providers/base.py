@@ -3,13 +3,77 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from datetime import date
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import pandas as pd
 
+BAR_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+MARKET_TIMEZONE = "America/New_York"
+MARKET_OPEN = pd.Timedelta(hours=9, minutes=30)
+MARKET_CLOSE = pd.Timedelta(hours=16)
+OPTION_RIGHTS = ("C", "P")
+AGGREGATE_FIELDS = {
+    "t": "timestamp",
+    "o": "open",
+    "h": "high",
+    "l": "low",
+    "c": "close",
+    "v": "volume",
+}
+
+
+def empty_bars() -> pd.DataFrame:
+    return pd.DataFrame(columns=BAR_COLUMNS)
+
+
+def regular_hours_bars(
+    records: List[Dict[str, Any]], timestamp_unit: Optional[str] = None
+) -> pd.DataFrame:
+    """Normalize provider bar records (``t``/``o``/``h``/``l``/``c``/``v``).
+
+    Timestamps are converted to ET and bars outside 09:30-16:00 ET are dropped.
+    ``timestamp_unit`` is the epoch unit of numeric timestamps; ``None`` parses
+    ISO strings.
+    """
+    if not records:
+        return empty_bars()
+
+    frame = pd.DataFrame(records).rename(columns=AGGREGATE_FIELDS)
+    frame["timestamp"] = pd.to_datetime(
+        frame["timestamp"], unit=timestamp_unit, utc=True
+    ).dt.tz_convert(MARKET_TIMEZONE)
+    local = frame["timestamp"].dt.tz_localize(None)
+    time_of_day = local - local.dt.normalize()
+    frame = frame[(time_of_day >= MARKET_OPEN) & (time_of_day <= MARKET_CLOSE)]
+    return frame[BAR_COLUMNS]
+
+
+def split_sessions(
+    frame: pd.DataFrame, session_dates: Sequence[date]
+) -> Dict[date, pd.DataFrame]:
+    """Split ET-timestamped bars into one frame per requested session.
+
+    Sessions with no bars map to an empty frame, matching what a single-day
+    fetch returns for them.
+    """
+    sessions: Dict[date, pd.DataFrame] = {
+        session_date: empty_bars() for session_date in session_dates
+    }
+    if frame.empty:
+        return sessions
+    days = frame["timestamp"].dt.date
+    for session_date, group in frame.groupby(days, sort=True):
+        if session_date in sessions:
+            sessions[session_date] = group.reset_index(drop=True)
+    return sessions
+
 
 class MarketDataProvider(ABC):
+    # Sessions requested together by ``fetch_spy_1m_range`` during a backfill.
+    range_chunk_sessions: int = 1
+
     @abstractmethod
     def ping(self) -> bool:
         """Return True if provider is reachable."""
@@ -18,6 +82,72 @@ class MarketDataProvider(ABC):
     def fetch_spy_1m(self, session_date: date) -> pd.DataFrame:
         """Fetch SPY 1-minute bars for the given date."""
 
+    def fetch_spy_1m_range(
+        self, session_dates: Sequence[date]
+    ) -> Dict[date, pd.DataFrame]:
+        """Fetch SPY 1-minute bars for several sessions, keyed by session date."""
+        return {
+            session_date: self.fetch_spy_1m(session_date)
+            for session_date in session_dates
+        }
+
+
+@dataclass(frozen=True, order=True)
+class OptionContract:
+    """A listed option, identified by underlying, expiry, strike and right."""
+
+    underlying: str
+    expiry: date
+    strike: float
+    right: str
+
+    def __post_init__(self) -> None:
+        if self.right not in OPTION_RIGHTS:
+            raise ValueError(f"Option right must be one of {OPTION_RIGHTS}")
+
+    @property
+    def symbol(self) -> str:
+        """OCC symbol, e.g. ``SPY250117C00450000``."""
+        strike = int(round(self.strike * 1000))
+        return f"{self.underlying}{self.expiry:%y%m%d}{self.right}{strike:08d}"
+
+    @classmethod
+    def from_symbol(cls, symbol: str) -> "OptionContract":
+        symbol = symbol.removeprefix("O:")
+        root, expiry, right, strike = (
+            symbol[:-15],
+            symbol[-15:-9],
+            symbol[-9],
+            symbol[-8:],
+        )
+        return cls(
+            underlying=root,
+            expiry=date(2000 + int(expiry[:2]), int(expiry[2:4]), int(expiry[4:])),
+            strike=int(strike) / 1000,
+            right=right,
+        )
+
+
+class OptionsDataProvider(ABC):
+    @abstractmethod
+    def fetch_option_1m(
+        self, contract: OptionContract, session_date: date
+    ) -> pd.DataFrame:
+        """Fetch one contract's 1-minute bars for a session.
+
+        Frames have the ``BAR_COLUMNS`` plus optional ``bid``/``ask`` quote
+        columns; a contract that did not trade returns an empty frame.
+        """
+
+    def fetch_option_1m_many(
+        self, contracts: Sequence[OptionContract], session_date: date
+    ) -> Dict[OptionContract, pd.DataFrame]:
+        """Fetch several contracts for one session, keyed by contract."""
+        return {
+            contract: self.fetch_option_1m(contract, session_date)
+            for contract in contracts
+        }
+
 
 class Broker(ABC):
     @abstractmethod
@@ -0,0 +1,180 @@
+"""Shared HTTP plumbing for market data providers."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 16
+TRANSIENT_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider keeps failing after repeated cool-downs."""
+
+
+def pooled_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """Return a session whose connection pool can serve ``pool_size`` threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second on average.
+
+    Up to ``capacity`` requests may be made back to back before callers start
+    waiting for tokens to refill.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float) -> "TokenBucket":
+        return cls(requests_per_minute / 60.0)
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff for transient request failures."""
+
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        # Full jitter keeps concurrent workers from retrying in lockstep.
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Pause a provider after ``failure_threshold`` consecutive transient failures.
+
+    While open, callers wait out ``cooldown`` seconds before one trial request
+    is let through. After ``max_cooldowns`` cool-downs in a row without a
+    success the provider is treated as down and ``CircuitOpenError`` is raised.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, cooldown: float = 30.0, max_cooldowns: int = 3
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldowns = max_cooldowns
+        self._failures = 0
+        self._cooldowns = 0
+        self._open_until: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._open_until is not None
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._open_until is None:
+                return
+            if self._cooldowns > self.max_cooldowns:
+                raise CircuitOpenError(
+                    f"Provider failed {self._failures} times in a row; giving up"
+                )
+            wait = self._open_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._cooldowns = 0
+            self._open_until = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures < self.failure_threshold:
+                return
+            now = time.monotonic()
+            if self._open_until is None or self._open_until <= now:
+                self._cooldowns += 1
+                self._open_until = now + self.cooldown
+
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def resilient_get(
+    session: requests.Session,
+    url: str,
+    rate_limiter: TokenBucket,
+    retry_policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    **kwargs: Any,
+) -> requests.Response:
+    """GET ``url``, retrying transient failures with backoff through ``breaker``."""
+    attempt = 0
+    while True:
+        breaker.before_call()
+        rate_limiter.acquire()
+        try:
+            response = session.get(url, **kwargs)
+            response.raise_for_status()
+        except Exception as exc:
+            if not is_transient(exc):
+                raise
+            breaker.record_failure()
+            attempt += 1
+            if attempt >= retry_policy.max_attempts:
+                raise
+            time.sleep(retry_policy.delay(attempt, _retry_after(exc)))
+            continue
+        breaker.record_success()
+        return response
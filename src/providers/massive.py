@@ -2,56 +2,108 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Dict, Any
+from typing import Any, Dict, List, Sequence
 
 import pandas as pd
 import requests
 
 from src.config import MassiveConfig
-from src.providers.base import MarketDataProvider
+from src.providers.base import (
+    MarketDataProvider,
+    OptionContract,
+    OptionsDataProvider,
+    regular_hours_bars,
+    split_sessions,
+)
+from src.providers.http import (
+    CircuitBreaker,
+    RetryPolicy,
+    TokenBucket,
+    pooled_session,
+    resilient_get,
+)
+
+PAGE_LIMIT = 50000
 
 
 @dataclass
-class MassiveMarketDataProvider(MarketDataProvider):
+class MassiveMarketDataProvider(MarketDataProvider, OptionsDataProvider):
+    # Roughly two months of extended-hours minute bars fit in one page.
+    range_chunk_sessions = 40
+
     config: MassiveConfig
+    session: requests.Session = field(default_factory=pooled_session, repr=False)
+    rate_limiter: TokenBucket = field(init=False, repr=False)
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy, repr=False)
+    circuit_breaker: CircuitBreaker = field(default_factory=CircuitBreaker, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rate_limiter = TokenBucket.per_minute(self.config.max_requests_per_minute)
+
+    def _get(self, url: str, **kwargs: Any) -> requests.Response:
+        return resilient_get(
+            self.session,
+            url,
+            self.rate_limiter,
+            self.retry_policy,
+            self.circuit_breaker,
+            **kwargs,
+        )
 
     def ping(self) -> bool:
         url = f"{self.config.base_url}/v1/marketstatus/now"
-        response = requests.get(url, params={"apiKey": self.config.api_key}, timeout=10)
-        response.raise_for_status()
+        self._get(url, params={"apiKey": self.config.api_key}, timeout=10)
         return True
 
     def fetch_spy_1m(self, session_date: date) -> pd.DataFrame:
+        return self.fetch_spy_1m_range([session_date])[session_date]
+
+    def fetch_spy_1m_range(
+        self, session_dates: Sequence[date]
+    ) -> Dict[date, pd.DataFrame]:
+        """Fetch several sessions through one aggregates range request.
+
+        Every ``next_url`` page is followed, then bars are converted to ET and
+        filtered to regular trading hours, matching the Alpaca provider.
+        """
+        if not session_dates:
+            return {}
         url = (
             f"{self.config.base_url}/v2/aggs/ticker/SPY/range/1/minute/"
-            f"{session_date}/{session_date}"
+            f"{min(session_dates)}/{max(session_dates)}"
         )
-        params = {
+        params: Dict[str, Any] = {
             "adjusted": "true",
             "sort": "asc",
-            "limit": 50000,
+            "limit": PAGE_LIMIT,
             "apiKey": self.config.api_key,
         }
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        payload: Dict[str, Any] = response.json()
-        results = payload.get("results", [])
-        if not results:
-            return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
-
-        frame = pd.DataFrame(results)
-        frame = frame.rename(
-            columns={
-                "t": "timestamp",
-                "o": "open",
-                "h": "high",
-                "l": "low",
-                "c": "close",
-                "v": "volume",
-            }
+        results: List[Dict[str, Any]] = []
+        while url:
+            payload: Dict[str, Any] = self._get(url, params=params, timeout=30).json()
+            results.extend(payload.get("results") or [])
+            url = payload.get("next_url")
+            # ``next_url`` carries the cursor and query; only the key is re-sent.
+            params = {"apiKey": self.config.api_key}
+        return split_sessions(
+            regular_hours_bars(results, timestamp_unit="ms"), session_dates
         )
-        frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms", utc=True)
-        frame = frame[["timestamp", "open", "high", "low", "close", "volume"]]
-        return frame
+
+    def fetch_option_1m(
+        self, contract: OptionContract, session_date: date
+    ) -> pd.DataFrame:
+        """Fetch one option contract's regular-hours minute bars for a session."""
+        url = (
+            f"{self.config.base_url}/v2/aggs/ticker/O:{contract.symbol}"
+            f"/range/1/minute/{session_date}/{session_date}"
+        )
+        params: Dict[str, Any] = {
+            "adjusted": "true",
+            "sort": "asc",
+            "limit": PAGE_LIMIT,
+            "apiKey": self.config.api_key,
+        }
+        payload: Dict[str, Any] = self._get(url, params=params, timeout=30).json()
+        return regular_hours_bars(payload.get("results") or [], timestamp_unit="ms")
@@ -0,0 +1,365 @@
+"""Local HTTP stand-in for the Alpaca and Massive (Polygon) endpoints.
+
+``ReplayServer`` serves the endpoints used by ``AlpacaBroker``,
+``AlpacaMarketDataProvider`` and ``MassiveMarketDataProvider`` from recorded
+bars (a ``Spy1mCache``) or synthetic ones, with configurable latency, page size
+and injected 429/5xx responses. Point ``base_url``/``data_base_url`` (or the
+``ALPACA_BASE_URL``, ``ALPACA_DATA_BASE_URL`` and ``MASSIVE_BASE_URL``
+environment variables) at ``ReplayServer.url`` to run ingestion offline.
+
+Run ``python -m src.providers.replay serve`` to start a server, or
+``python -m src.providers.replay bench`` to measure backfill throughput
+against an in-process one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pandas as pd
+
+from src.cache.backfill import BackfillSummary, backfill
+from src.cache.spy_cache import Spy1mCache
+from src.config import AlpacaConfig, MassiveConfig
+from src.providers.alpaca import AlpacaMarketDataProvider
+from src.providers.base import BAR_COLUMNS, MARKET_TIMEZONE, empty_bars
+from src.providers.massive import MassiveMarketDataProvider
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+BarSource = Callable[[date], pd.DataFrame]
+
+ALPACA_BARS_PATH = "/v2/stocks/SPY/bars"
+ALPACA_ACCOUNT_PATH = "/v2/account"
+MASSIVE_STATUS_PATH = "/v1/marketstatus/now"
+MASSIVE_AGGS_PREFIX = "/v2/aggs/ticker/SPY/range/1/minute/"
+
+
+@dataclass(frozen=True)
+class ReplayOptions:
+    """Behaviour of the replay server.
+
+    ``rate_limit_every``/``error_every`` inject a 429 or ``error_status``
+    response on every Nth bar request (0 disables). ``page_size`` caps the
+    bars per page below the client's ``limit``.
+    """
+
+    latency: float = 0.0
+    page_size: int = 10000
+    rate_limit_every: int = 0
+    retry_after: float = 0.0
+    error_every: int = 0
+    error_status: int = 503
+
+
+def synthetic_source(seed: int = 0) -> BarSource:
+    """Deterministic extended-hours synthetic bars for weekdays."""
+    return SyntheticMarketDataProvider(seed=seed, extended_hours=True).fetch_spy_1m
+
+
+def cache_source(root_dir: Path) -> BarSource:
+    """Replay sessions recorded in a ``Spy1mCache`` under ``root_dir``."""
+    cache = Spy1mCache(Path(root_dir))
+
+    def _bars(session_date: date) -> pd.DataFrame:
+        if not cache.has_date(session_date):
+            return empty_bars()
+        return cache.read_date(session_date)
+
+    return _bars
+
+
+class ReplayServer:
+    """Threaded HTTP server replaying provider responses on ``127.0.0.1``."""
+
+    def __init__(
+        self,
+        source: BarSource | None = None,
+        options: ReplayOptions | None = None,
+        port: int = 0,
+    ) -> None:
+        self.source = source or synthetic_source()
+        self.options = options or ReplayOptions()
+        self.bar_requests = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        self._range = lru_cache(maxsize=32)(self._load_range)
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def alpaca_config(self, max_requests_per_minute: float = 1e6) -> AlpacaConfig:
+        return AlpacaConfig(
+            api_key="replay",
+            secret_key="replay",
+            base_url=self.url,
+            data_base_url=self.url,
+            max_requests_per_minute=max_requests_per_minute,
+        )
+
+    def massive_config(self, max_requests_per_minute: float = 1e6) -> MassiveConfig:
+        return MassiveConfig(
+            api_key="replay",
+            base_url=self.url,
+            max_requests_per_minute=max_requests_per_minute,
+        )
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _load_range(self, start: date, end: date) -> pd.DataFrame:
+        frames = []
+        current = start
+        while current <= end:
+            frame = self.source(current)
+            if not frame.empty:
+                frames.append(frame[BAR_COLUMNS])
+            current += timedelta(days=1)
+        if not frames:
+            return empty_bars()
+        frame = pd.concat(frames, ignore_index=True)
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True)
+        return frame.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    def _injected_status(self) -> Optional[int]:
+        with self._lock:
+            self.bar_requests += 1
+            count = self.bar_requests
+        if self.options.rate_limit_every and count % self.options.rate_limit_every == 0:
+            return 429
+        if self.options.error_every and count % self.options.error_every == 0:
+            return self.options.error_status
+        return None
+
+    def _page(
+        self, frame: pd.DataFrame, offset: int, limit: int
+    ) -> Tuple[pd.DataFrame, Optional[int]]:
+        size = max(1, min(limit, self.options.page_size))
+        page = frame.iloc[offset : offset + size]
+        next_offset = offset + size if offset + size < len(frame) else None
+        return page, next_offset
+
+    def alpaca_bars(self, query: Dict[str, str]) -> Dict[str, Any]:
+        # Without a window Alpaca returns the latest bars; today's is enough.
+        end = pd.Timestamp(query.get("end") or pd.Timestamp.now(tz="UTC"))
+        start = pd.Timestamp(query.get("start") or end.normalize())
+        frame = self._range(
+            start.tz_convert(MARKET_TIMEZONE).date(),
+            end.tz_convert(MARKET_TIMEZONE).date(),
+        )
+        frame = frame.loc[(frame["timestamp"] >= start) & (frame["timestamp"] <= end)]
+        offset = int(query.get("page_token") or 0)
+        page, next_offset = self._page(frame, offset, int(query.get("limit", 1000)))
+        stamps = page["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {
+            "bars": _records(page, stamps),
+            "symbol": "SPY",
+            "next_page_token": str(next_offset) if next_offset is not None else None,
+        }
+
+    def massive_aggs(self, path: str, query: Dict[str, str]) -> Dict[str, Any]:
+        start_text, end_text = path[len(MASSIVE_AGGS_PREFIX) :].split("/")[:2]
+        frame = self._range(
+            date.fromisoformat(start_text), date.fromisoformat(end_text)
+        )
+        offset = int(query.get("cursor") or 0)
+        limit = int(query.get("limit", 5000))
+        page, next_offset = self._page(frame, offset, limit)
+        stamps = page["timestamp"].astype("int64") // 1_000_000
+        payload: Dict[str, Any] = {
+            "ticker": "SPY",
+            "status": "OK",
+            "resultsCount": len(page),
+            "results": _records(page, stamps),
+        }
+        if next_offset is not None:
+            payload["next_url"] = (
+                f"{self.url}{path}?{urlencode({'cursor': next_offset, 'limit': limit})}"
+            )
+        return payload
+
+
+def _records(page: pd.DataFrame, stamps: pd.Series) -> List[Dict[str, Any]]:
+    return [
+        {"t": t, "o": o, "h": h, "l": low, "c": c, "v": int(v)}
+        for t, o, h, low, c, v in zip(
+            stamps.tolist(),
+            page["open"].tolist(),
+            page["high"].tolist(),
+            page["low"].tolist(),
+            page["close"].tolist(),
+            page["volume"].tolist(),
+        )
+    ]
+
+
+def _make_handler(server: ReplayServer) -> type:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            return None
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            parsed = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            if server.options.latency:
+                sleep(server.options.latency)
+
+            if parsed.path == ALPACA_ACCOUNT_PATH:
+                self._send(200, {"id": "replay", "status": "ACTIVE"})
+                return
+            if parsed.path == MASSIVE_STATUS_PATH:
+                now = datetime.now(timezone.utc).isoformat()
+                self._send(200, {"market": "open", "serverTime": now})
+                return
+            is_alpaca = parsed.path == ALPACA_BARS_PATH
+            if not is_alpaca and not parsed.path.startswith(MASSIVE_AGGS_PREFIX):
+                self._send(404, {"message": f"Unknown endpoint {parsed.path}"})
+                return
+
+            status = server._injected_status()
+            if status is not None:
+                headers = {}
+                if status == 429:
+                    headers["Retry-After"] = str(server.options.retry_after)
+                self._send(status, {"message": "injected failure"}, headers)
+                return
+            try:
+                if is_alpaca:
+                    payload = server.alpaca_bars(query)
+                else:
+                    payload = server.massive_aggs(parsed.path, query)
+            except (KeyError, ValueError) as exc:
+                self._send(422, {"message": str(exc)})
+                return
+            self._send(200, payload)
+
+        def _send(
+            self,
+            status: int,
+            payload: Dict[str, Any],
+            headers: Dict[str, str] | None = None,
+        ) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with server._lock:
+                server.bytes_served += len(body)
+
+    return _Handler
+
+
+def run_benchmark(
+    server: ReplayServer,
+    start: date,
+    end: date,
+    provider_name: str = "alpaca",
+    workers: int = 4,
+    root_dir: Path | None = None,
+) -> BackfillSummary:
+    """Backfill ``start``..``end`` weekdays from ``server`` into a scratch cache."""
+    if provider_name == "alpaca":
+        provider = AlpacaMarketDataProvider(server.alpaca_config())
+    else:
+        provider = MassiveMarketDataProvider(server.massive_config())
+    session_dates = [ts.date() for ts in pd.bdate_range(start, end)]
+    with tempfile.TemporaryDirectory() as scratch:
+        cache = Spy1mCache(root_dir or Path(scratch))
+        return backfill(cache, provider, session_dates, workers=workers)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Replay Alpaca/Polygon endpoints locally"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=10000)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--error-every", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--from-cache",
+        default=None,
+        help="Replay bars recorded under this data_dir instead of synthetic ones",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Serve until interrupted")
+    bench = subparsers.add_parser("bench", help="Measure backfill throughput")
+    bench.add_argument("--start", required=True, type=date.fromisoformat)
+    bench.add_argument("--end", required=True, type=date.fromisoformat)
+    bench.add_argument("--provider", choices=["alpaca", "massive"], default="alpaca")
+    bench.add_argument("--workers", type=int, default=4)
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.from_cache:
+        source = cache_source(Path(args.from_cache))
+    else:
+        source = synthetic_source(args.seed)
+    options = ReplayOptions(
+        latency=args.latency_ms / 1000,
+        page_size=args.page_size,
+        rate_limit_every=args.rate_limit_every,
+        error_every=args.error_every,
+    )
+    port = args.port if args.command == "serve" else 0
+    with ReplayServer(source, options, port=port) as server:
+        if args.command == "serve":
+            print(f"Replaying provider endpoints on {server.url}")
+            try:
+                while True:
+                    sleep(3600)
+            except KeyboardInterrupt:
+                return 0
+        started = perf_counter()
+        summary = run_benchmark(
+            server, args.start, args.end, args.provider, workers=args.workers
+        )
+        print(
+            f"{summary.describe()}; {server.bar_requests} requests, "
+            f"{server.bytes_served / 1024:.1f} KiB served "
+            f"in {perf_counter() - started:.1f}s"
+        )
+    return 0 if summary.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
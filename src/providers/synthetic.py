@@ -0,0 +1,210 @@
+"""Deterministic synthetic SPY-like market data provider.
+
+Sessions are generated from a random stream seeded by ``(seed, date)`` alone,
+so any session can be regenerated on its own and a backfill produces the same
+cache regardless of order, chunking or concurrency. Minute returns follow a
+U-shaped intraday volatility curve scaled by a per-session volatility regime;
+each session opens with a gap against a slowly trending price level, and a
+small fraction of minutes is dropped to mimic missing bars.
+
+Option bars are Black-Scholes prices of the synthetic underlying's minute
+bars at ``annual_volatility``, with a bid/ask quote around each close.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.providers.base import (
+    MARKET_CLOSE,
+    MARKET_OPEN,
+    MARKET_TIMEZONE,
+    MarketDataProvider,
+    OptionContract,
+    OptionsDataProvider,
+    empty_bars,
+)
+
+# Extended hours run 04:00-20:00 ET when requested.
+PRE_MARKET_OPEN = pd.Timedelta(hours=4)
+POST_MARKET_CLOSE = pd.Timedelta(hours=20)
+TRADING_DAYS_PER_YEAR = 252
+MINUTES_PER_YEAR = 365 * 24 * 60
+EPOCH = date(1993, 1, 29)
+OPTION_TICK = 0.01
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def intraday_volatility_profile(minutes: int) -> np.ndarray:
+    """Relative per-minute volatility over a session, averaging 1.0.
+
+    Volatility is highest right after the open, decays through midday and
+    picks up again into the close.
+    """
+    position = np.arange(minutes, dtype=np.float64)
+    profile = (
+        1.0
+        + 2.0 * np.exp(-position / 20.0)
+        + 0.8 * np.exp(-(minutes - 1 - position) / 30.0)
+    )
+    return profile / profile.mean()
+
+
+@dataclass(frozen=True)
+class SyntheticMarketDataProvider(MarketDataProvider, OptionsDataProvider):
+    """Generate SPY-like 1-minute bars and option bars without vendor access."""
+
+    # Generation is local and cheap; large chunks keep manifest updates rare.
+    range_chunk_sessions = 250
+
+    seed: int = 0
+    start_price: float = 45.0
+    annual_drift: float = 0.08
+    annual_volatility: float = 0.16
+    gap_volatility: float = 0.004
+    missing_bar_rate: float = 0.002
+    extended_hours: bool = False
+
+    def ping(self) -> bool:
+        return True
+
+    def fetch_spy_1m(self, session_date: date) -> pd.DataFrame:
+        if session_date.weekday() >= 5:
+            return empty_bars()
+        rng = np.random.default_rng([self.seed, session_date.toordinal()])
+
+        start, end = (
+            (PRE_MARKET_OPEN, POST_MARKET_CLOSE)
+            if self.extended_hours
+            else (MARKET_OPEN, MARKET_CLOSE)
+        )
+        minutes = int((end - start) / pd.Timedelta(minutes=1))
+        regular = _regular_hours_mask(start, minutes)
+        profile = np.full(minutes, 0.25)
+        profile[regular] = intraday_volatility_profile(int(regular.sum()))
+
+        # Per-session regime: most days are calm, a few are several times busier.
+        regime = float(np.exp(rng.normal(0.0, 0.35)))
+        minute_volatility = (
+            self.annual_volatility
+            / np.sqrt(TRADING_DAYS_PER_YEAR * int(regular.sum()))
+            * regime
+        )
+        returns = rng.standard_normal(minutes) * profile * minute_volatility
+        open_price = self._price_level(session_date) * float(
+            np.exp(rng.normal(0.0, self.gap_volatility * regime))
+        )
+        close = open_price * np.exp(np.cumsum(returns))
+        open_ = np.concatenate(([open_price], close[:-1]))
+        wick = np.abs(rng.standard_normal((2, minutes))) * profile * minute_volatility
+        high = np.maximum(open_, close) * (1 + wick[0])
+        low = np.minimum(open_, close) * (1 - wick[1])
+        volume = rng.gamma(2.0, 40_000.0 * regime, minutes) * profile**2
+
+        timestamps = pd.date_range(
+            start=pd.Timestamp(session_date) + start,
+            periods=minutes,
+            freq="1min",
+            tz=MARKET_TIMEZONE,
+        )
+        keep = rng.random(minutes) >= self.missing_bar_rate
+        keep[0] = True
+        return pd.DataFrame(
+            {
+                "timestamp": timestamps[keep],
+                "open": np.round(open_[keep], 2),
+                "high": np.round(high[keep], 2),
+                "low": np.round(low[keep], 2),
+                "close": np.round(close[keep], 2),
+                "volume": np.maximum(volume[keep], 1).astype(np.int64),
+            }
+        )
+
+    def fetch_option_1m(
+        self, contract: OptionContract, session_date: date
+    ) -> pd.DataFrame:
+        if session_date > contract.expiry:
+            return empty_bars()
+        underlying = self.fetch_spy_1m(session_date)
+        if underlying.empty:
+            return underlying
+        expiry_close = pd.Timestamp(contract.expiry) + MARKET_CLOSE
+        minutes_left = (
+            expiry_close - underlying["timestamp"].dt.tz_localize(None)
+        ) / pd.Timedelta(minutes=1)
+        minutes_left = np.maximum(minutes_left.to_numpy(dtype=np.float64), 1.0)
+        years = minutes_left / MINUTES_PER_YEAR
+
+        def price(column: str) -> np.ndarray:
+            return black_scholes(
+                underlying[column].to_numpy(dtype=np.float64),
+                contract.strike,
+                years,
+                self.annual_volatility,
+                contract.right,
+            )
+
+        # Calls rise with the underlying and puts fall, so the underlying's
+        # high maps to the call's high and the put's low.
+        high, low = (
+            (price("high"), price("low"))
+            if contract.right == "C"
+            else (price("low"), price("high"))
+        )
+        close = price("close")
+        half_spread = np.maximum(OPTION_TICK, 0.01 * close)
+        rng = np.random.default_rng(
+            [self.seed, session_date.toordinal(), int(contract.strike * 1000)]
+        )
+        return pd.DataFrame(
+            {
+                "timestamp": underlying["timestamp"],
+                "open": _to_tick(price("open")),
+                "high": _to_tick(high),
+                "low": _to_tick(low),
+                "close": _to_tick(close),
+                "volume": rng.poisson(50, len(close)).astype(np.int64),
+                "bid": _to_tick(close - half_spread),
+                "ask": _to_tick(close + half_spread),
+            }
+        )
+
+    def _price_level(self, session_date: date) -> float:
+        """Slowly trending, cyclical price level that depends only on the date."""
+        years = (session_date - EPOCH).days / 365.25
+        phase = self.seed % 360 * np.pi / 180
+        cycle = 0.18 * np.sin(2 * np.pi * years / 7.5 + phase) + 0.06 * np.sin(
+            2 * np.pi * years / 1.7 + 2 * phase
+        )
+        return self.start_price * float(np.exp(self.annual_drift * years + cycle))
+
+
+def _regular_hours_mask(start: pd.Timedelta, minutes: int) -> np.ndarray:
+    offsets = start + pd.to_timedelta(np.arange(minutes), unit="min")
+    return np.asarray((offsets >= MARKET_OPEN) & (offsets < MARKET_CLOSE))
+
+
+def black_scholes(
+    spot: np.ndarray, strike: float, years: np.ndarray, volatility: float, right: str
+) -> np.ndarray:
+    """Zero-rate Black-Scholes price of a call (``C``) or put (``P``)."""
+    deviation = volatility * np.sqrt(years)
+    d1 = (np.log(spot / strike) + 0.5 * deviation**2) / deviation
+    d2 = d1 - deviation
+    if right == "C":
+        return spot * _normal_cdf(d1) - strike * _normal_cdf(d2)
+    return strike * _normal_cdf(-d2) - spot * _normal_cdf(-d1)
+
+
+def _normal_cdf(values: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + _erf(values / math.sqrt(2.0)).astype(np.float64))
+
+
+def _to_tick(prices: np.ndarray) -> np.ndarray:
+    return np.maximum(np.round(prices, 2), OPTION_TICK)
@@ -0,0 +1,202 @@
+import datetime as dt
+import threading
+import time
+
+import pandas as pd
+import pytest
+import requests
+
+from src.cache.backfill import backfill
+from src.cache.spy_cache import Spy1mCache
+from src.providers.base import MarketDataProvider
+from src.providers.http import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TokenBucket,
+    resilient_get,
+)
+
+SESSIONS = [dt.date(2025, 1, 2) + dt.timedelta(days=offset) for offset in range(8)]
+
+
+def _session_frame(session_date: dt.date) -> pd.DataFrame:
+    index = pd.date_range(
+        start=dt.datetime.combine(session_date, dt.time(9, 30)),
+        periods=10,
+        freq="1min",
+        tz="America/New_York",
+    )
+    return pd.DataFrame(
+        {
+            "timestamp": index,
+            "open": 100.0,
+            "high": 100.5,
+            "low": 99.5,
+            "close": 100.25,
+            "volume": 1000,
+        }
+    )
+
+
+class _FakeProvider(MarketDataProvider):
+    def __init__(
+        self, fail_on: set[dt.date] | None = None, error: Exception | None = None
+    ) -> None:
+        self.fail_on = fail_on or set()
+        self.error = error or RuntimeError("boom")
+        self.calls: list[dt.date] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def ping(self) -> bool:
+        return True
+
+    def fetch_spy_1m(self, session_date: dt.date) -> pd.DataFrame:
+        with self._lock:
+            self.calls.append(session_date)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        if session_date in self.fail_on:
+            raise self.error
+        return _session_frame(session_date)
+
+
+def test_backfill_fetches_concurrently_and_skips_cached(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    cache.write_date(SESSIONS[0], _session_frame(SESSIONS[0]))
+    provider = _FakeProvider()
+
+    summary = backfill(cache, provider, SESSIONS, workers=4)
+
+    assert summary.skipped == [SESSIONS[0]]
+    assert summary.fetched == SESSIONS[1:]
+    assert not summary.failed
+    assert sorted(provider.calls) == SESSIONS[1:]
+    assert 1 < provider.max_active <= 4
+    assert summary.bytes_written > 0 and summary.days_per_second > 0
+    assert Spy1mCache(tmp_path).cached_dates() == set(SESSIONS)
+    assert not list(cache.cache_root.glob("date=*/*.tmp"))
+
+
+def test_backfill_journal_records_failures_and_resumes(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    journal = cache.journal()
+    provider = _FakeProvider(fail_on={SESSIONS[2]})
+
+    summary = backfill(cache, provider, SESSIONS, workers=2, journal=journal)
+
+    assert list(summary.failed) == [SESSIONS[2]]
+    assert summary.fetched == SESSIONS[:2] + SESSIONS[3:]
+    reopened = cache.journal()
+    assert reopened.unfinished() == [SESSIONS[2]]
+    assert reopened.sessions[SESSIONS[2]]["error"] == "boom"
+
+    provider.fail_on.clear()
+    resumed = backfill(cache, provider, reopened.unfinished(), journal=reopened)
+    assert resumed.fetched == [SESSIONS[2]]
+    assert cache.journal().unfinished() == []
+    assert cache.cached_dates() == set(SESSIONS)
+
+
+def test_backfill_stops_when_the_circuit_breaker_gives_up(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    journal = cache.journal()
+    provider = _FakeProvider(fail_on=set(SESSIONS), error=CircuitOpenError("down"))
+
+    summary = backfill(cache, provider, SESSIONS, workers=2, journal=journal)
+
+    assert summary.interrupted and not summary.ok
+    assert len(provider.calls) < len(SESSIONS)
+    assert cache.journal().unfinished() == SESSIONS
+
+
+class _RangeProvider(_FakeProvider):
+    range_chunk_sessions = 3
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.windows: list[list[dt.date]] = []
+
+    def fetch_spy_1m_range(self, session_dates):
+        with self._lock:
+            self.windows.append(sorted(session_dates))
+        return super().fetch_spy_1m_range(session_dates)
+
+
+def test_backfill_splits_range_requests_at_gaps(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    cache.write_date(SESSIONS[3], _session_frame(SESSIONS[3]))
+    provider = _RangeProvider()
+
+    backfill(cache, provider, SESSIONS, workers=1)
+    later = [dt.date(2025, 3, 3), dt.date(2025, 3, 4)]
+    backfill(cache, provider, [dt.date(2025, 2, 3), *later], workers=1)
+
+    assert provider.windows == [
+        SESSIONS[0:3],
+        SESSIONS[4:7],
+        SESSIONS[7:8],
+        [dt.date(2025, 2, 3)],
+        later,
+    ]
+
+
+def test_cache_range_splits_range_requests_at_gaps(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    cache.write_date(SESSIONS[3], _session_frame(SESSIONS[3]))
+    provider = _RangeProvider()
+    later = [dt.date(2025, 3, 3), dt.date(2025, 3, 4)]
+
+    cache.cache_range(provider, [*SESSIONS[1:6], *later])
+
+    assert provider.windows == [SESSIONS[1:3], SESSIONS[4:6], later]
+    assert cache.journal().unfinished() == []
+    assert cache.cached_dates() == {*SESSIONS[1:6], *later}
+
+
+def test_resilient_get_retries_transient_errors_then_opens_circuit():
+    class _Response:
+        def __init__(self, status_code: int) -> None:
+            self.status_code = status_code
+            self.headers = {"Retry-After": "0"} if status_code == 429 else {}
+
+        def raise_for_status(self) -> None:
+            if self.status_code >= 400:
+                raise requests.HTTPError(response=self)
+
+    class _Session:
+        def __init__(self, statuses: list[int]) -> None:
+            self.statuses = statuses
+
+        def get(self, url: str, **kwargs) -> _Response:
+            return _Response(self.statuses.pop(0))
+
+    limiter = TokenBucket(rate=1000, capacity=1000)
+    policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=0.01, max_cooldowns=1)
+
+    response = resilient_get(_Session([503, 429, 200]), "u", limiter, policy, breaker)
+    assert response.status_code == 200 and not breaker.is_open
+
+    with pytest.raises(requests.HTTPError):
+        resilient_get(_Session([404]), "u", limiter, policy, breaker)
+
+    with pytest.raises(requests.HTTPError):
+        resilient_get(_Session([500] * 3), "u", limiter, policy, breaker)
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        resilient_get(_Session([500] * 3), "u", limiter, policy, breaker)
+
+
+def test_token_bucket_throttles_after_burst():
+    bucket = TokenBucket(rate=50, capacity=2)
+    started = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+    # Two tokens are available immediately; the other three refill at 50/s.
+    assert time.perf_counter() - started >= 0.05
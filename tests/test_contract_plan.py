@@ -0,0 +1,86 @@
+import datetime as dt
+
+import pandas as pd
+
+from backtesting_bot.contract_plan import (
+    plan_contracts,
+    prefetch_plan,
+    select_contracts,
+    strike_for,
+)
+from backtesting_bot.experiment_config import ContractSelectionParams
+from src.cache.option_cache import OptionBarCache
+from src.providers.base import OptionContract, OptionsDataProvider
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+
+class _RecordingProvider(OptionsDataProvider):
+    def __init__(self) -> None:
+        self.synthetic = SyntheticMarketDataProvider()
+        self.requested: list[tuple[dt.date, OptionContract]] = []
+
+    def fetch_option_1m(self, contract, session_date):
+        self.requested.append((session_date, contract))
+        return self.synthetic.fetch_option_1m(contract, session_date)
+
+
+def _entries(rows: list[tuple[str, str, str, float]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "trade_date": [row[0] for row in rows],
+            "entry_ts": pd.to_datetime([row[1] for row in rows], utc=True),
+            "direction": [row[2] for row in rows],
+            "spy_price_at_entry": [row[3] for row in rows],
+        }
+    )
+
+
+def test_strike_and_expiry_selection_follow_contract_params():
+    assert strike_for(450.2, "CALL", 1, prefer_otm=True) == 451
+    assert strike_for(450.2, "CALL", 3, prefer_otm=True) == 453
+    assert strike_for(450.2, "PUT", 2, prefer_otm=True) == 449
+    assert strike_for(450.2, "CALL", 1, prefer_otm=False) == 450
+
+    params = ContractSelectionParams(
+        dte_choices=[0, 1], otm_dollars=[1], prefer_otm=True
+    )
+    friday = dt.date(2025, 1, 3)
+    contracts = select_contracts(friday, "PUT", 590.4, params)
+    assert [contract.symbol for contract in contracts] == [
+        "SPY250103P00590000",
+        "SPY250106P00590000",
+    ]
+
+
+def test_plan_deduplicates_across_experiments_and_prefetches_once(tmp_path):
+    shared = _entries(
+        [
+            ("2025-01-02", "2025-01-02 15:00", "CALL", 590.4),
+            ("2025-01-03", "2025-01-03 15:30", "PUT", 595.6),
+        ]
+    )
+    later = _entries([("2025-01-02", "2025-01-02 16:10", "CALL", 590.9)])
+    narrow = ContractSelectionParams(dte_choices=[1], otm_dollars=[1], prefer_otm=True)
+    wide = ContractSelectionParams(dte_choices=[1], otm_dollars=[1, 2], prefer_otm=True)
+
+    plan = plan_contracts([(shared, narrow), (shared, wide), (later, narrow)])
+
+    # Jan 2: 591C and 592C; Jan 3: 595P and 594P.
+    assert len(plan) == 4
+    assert int(plan.frame["entries"].sum()) == 7
+    first = plan.frame.iloc[0]
+    assert first["contract"].symbol == "SPY250103C00591000"
+    assert first["entries"] == 3
+    assert first["window_start"] == pd.Timestamp("2025-01-02 15:00", tz="UTC")
+    assert first["window_end"] == pd.Timestamp("2025-01-02 21:00", tz="UTC")
+
+    cache = OptionBarCache(tmp_path)
+    provider = _RecordingProvider()
+    summary = prefetch_plan(plan, cache, provider, workers=2)
+
+    assert summary.ok and summary.contracts_fetched == 4
+    assert sorted(provider.requested) == sorted(
+        zip(plan.frame["trade_date"], plan.frame["contract"])
+    )
+    again = prefetch_plan(plan, OptionBarCache(tmp_path), provider)
+    assert again.skipped == plan.trade_dates and len(provider.requested) == 4
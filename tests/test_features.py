@@ -0,0 +1,123 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting_bot import features
+from backtesting_bot.features import (
+    FeatureSpec,
+    FeatureStore,
+    add_features,
+    warmup_bars,
+)
+from backtesting_bot.io import load_spy_1m_bars
+from backtesting_bot.pass1 import Pass1Config, run_pass1_pipeline
+from backtesting_bot.sessions import SessionBars
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+DAYS = [dt.date(2025, 3, 3) + dt.timedelta(days=offset) for offset in range(3)]
+
+
+def _write_bars(path):
+    provider = SyntheticMarketDataProvider(seed=2)
+    frame = pd.concat(provider.fetch_spy_1m(day) for day in DAYS)
+    frame["timestamp"] = frame["timestamp"].dt.tz_convert("UTC")
+    frame.to_parquet(path, index=False)
+    return path
+
+
+def _bars(path) -> SessionBars:
+    return load_spy_1m_bars(path, DAYS[0], DAYS[-1], use_cache=False)
+
+
+def test_store_computes_once_and_reuses(tmp_path, monkeypatch):
+    bars = _bars(_write_bars(tmp_path / "spy_1m.parquet"))
+    store = FeatureStore(tmp_path / "features")
+    spec = FeatureSpec("ema_fast", "ema", 8)
+
+    prepared = add_features(bars, [spec], store=store, version="v1")
+    expected = bars.frame["close"].ewm(span=8, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(prepared.frame["ema_fast"].to_numpy(), expected)
+    path = store.path(spec, "v1", bars)
+    assert path.exists()
+    assert path.relative_to(store.root_dir).parts[:5] == (
+        "ema",
+        "period=8",
+        "timeframe=1m",
+        "reset=none",
+        "version=v1",
+    )
+
+    def _fail(bars, specs):
+        raise AssertionError("feature should have been read from the store")
+
+    monkeypatch.setattr(features, "compute_features", _fail)
+    again = add_features(bars, [spec], store=store, version="v1")
+    np.testing.assert_array_equal(
+        again.frame["ema_fast"].to_numpy(), prepared.frame["ema_fast"].to_numpy()
+    )
+    with pytest.raises(AssertionError):
+        add_features(bars, [spec], store=store, version="v2")
+
+
+def test_saving_prunes_other_versions_only(tmp_path):
+    bars = _bars(_write_bars(tmp_path / "spy_1m.parquet"))
+    store = FeatureStore(tmp_path / "features")
+    fast = FeatureSpec("ema_fast", "ema", 8)
+    slow = FeatureSpec("ema_slow", "ema", 21)
+
+    add_features(bars, [fast, slow], store=store, version="v1")
+    add_features(bars.between(DAYS[1], DAYS[2]), [fast], store=store, version="v2")
+
+    assert not store.path(fast, "v1", bars).exists()
+    assert store.path(fast, "v2", bars.between(DAYS[1], DAYS[2])).exists()
+    assert store.path(slow, "v1", bars).exists()
+
+
+def test_default_store_sits_beside_the_cache(tmp_path):
+    cache_root = tmp_path / "data" / "spy" / "1m"
+    cache_root.mkdir(parents=True)
+    source = _write_bars(tmp_path / "spy_1m.parquet")
+
+    for path in (cache_root, cache_root.parent, tmp_path / "data"):
+        assert features.feature_store_root(path) == tmp_path / "data" / "features"
+    assert features.feature_store_root(source) == tmp_path / "features"
+
+
+def test_no_declared_features_leaves_bars_untouched(tmp_path):
+    bars = _bars(_write_bars(tmp_path / "spy_1m.parquet"))
+    assert add_features(bars, [], store=FeatureStore(tmp_path), version="v1") is bars
+
+
+def test_pass1_persists_only_declared_features(tmp_path):
+    source = _write_bars(tmp_path / "spy_1m.parquet")
+
+    def _run(strategy: str) -> None:
+        run_pass1_pipeline(
+            Pass1Config(
+                start=DAYS[0],
+                end=DAYS[-1],
+                strategy=strategy,
+                run_id=strategy,
+                spy_1m_path=str(source),
+                output_dir=tmp_path / "runs" / strategy,
+            )
+        )
+
+    _run("orb_v1")
+    assert not (tmp_path / "features").exists()
+
+    _run("rsi_v1")
+    stored = sorted((tmp_path / "features").rglob("*.parquet"))
+    assert [path.relative_to(tmp_path / "features").parts[:3] for path in stored] == [
+        ("rsi", "period=14", "timeframe=1m")
+    ]
+
+
+def test_warmup_bars():
+    assert warmup_bars([]) == 0
+    assert warmup_bars([FeatureSpec("rsi", "rsi", 14)]) == 14
+    assert warmup_bars([FeatureSpec("ema", "ema", 21, session_reset=True)]) == 0
+    ema_21 = warmup_bars([FeatureSpec("ema", "ema", 21)])
+    assert (10 / 11) ** ema_21 < 2**-53 <= (10 / 11) ** (ema_21 - 1)
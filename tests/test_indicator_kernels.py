@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting_bot.indicator_kernels import IndicatorKernel
+from backtesting_bot.indicators import ema, rsi
+
+SPANS = (1, 2, 8, 21, 200)
+PERIODS = (2, 14, 50)
+
+
+@pytest.fixture
+def sessions():
+    rng = np.random.default_rng(4)
+    # Uneven sessions, some longer than one EMA segment.
+    lengths = rng.integers(30, 1100, 12)
+    session_ids = np.repeat(np.arange(12) + 19_000, lengths)
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.05, len(session_ids))), 2)
+    # A flat stretch: RSI windows with no losses must read exactly 100.
+    close[200:260] = np.round(close[199] + np.arange(60) * 0.01, 2)
+    return close, session_ids
+
+
+def _assert_matches(actual, expected):
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-8, equal_nan=True)
+
+
+def test_matches_pandas_over_the_concatenated_series(sessions):
+    close, session_ids = sessions
+    values = IndicatorKernel(SPANS, PERIODS).compute(close, session_ids)
+    series = pd.Series(close)
+    for span in SPANS:
+        _assert_matches(values[f"ema_{span}"], ema(series, span).to_numpy())
+    for period in PERIODS:
+        _assert_matches(values[f"rsi_{period}"], rsi(series, period).to_numpy())
+    assert values["rsi_14"][259] == 100
+
+
+def test_session_reset_matches_per_session_pandas(sessions):
+    close, session_ids = sessions
+    values = IndicatorKernel(SPANS, PERIODS, session_reset=True).compute(
+        close, session_ids
+    )
+    grouped = pd.Series(close).groupby(session_ids)
+    for span in SPANS:
+        expected = grouped.transform(lambda day, span=span: ema(day, span))
+        _assert_matches(values[f"ema_{span}"], expected.to_numpy())
+    for period in PERIODS:
+        expected = grouped.transform(lambda day, period=period: rsi(day, period))
+        _assert_matches(values[f"rsi_{period}"], expected.to_numpy())
+
+
+@pytest.mark.parametrize("session_reset", [False, True])
+def test_incremental_updates_match_one_pass(sessions, session_reset):
+    close, session_ids = sessions
+    kernel = IndicatorKernel(SPANS, PERIODS, session_reset=session_reset)
+    expected = kernel.compute(close, session_ids)
+
+    state = None
+    pieces = []
+    cuts = [0, 1, 5, 400, 401, 2000, 2017, len(close)]
+    for start, stop in zip(cuts, cuts[1:]):
+        values, state = kernel.update(
+            state, close[start:stop], session_ids[start:stop]
+        )
+        pieces.append(values)
+    for name in kernel.names:
+        combined = np.concatenate([piece[name] for piece in pieces])
+        _assert_matches(combined, expected[name])
@@ -0,0 +1,201 @@
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from backtesting_bot import io as io_module
+from backtesting_bot.bar_store import BarStore, build_bar_store
+from backtesting_bot.io import load_spy_1m_bars
+from backtesting_bot.sessions import price_values
+from src.cache.spy_cache import Spy1mCache
+
+
+def _session_frame(session_date: dt.date, base_price: float) -> pd.DataFrame:
+    index = pd.date_range(
+        start=dt.datetime.combine(session_date, dt.time(9, 30)),
+        periods=30,
+        freq="1min",
+        tz="America/New_York",
+    )
+    values = [round(base_price + i * 0.1, 2) for i in range(30)]
+    return pd.DataFrame(
+        {
+            "timestamp": index,
+            "open": values,
+            "high": [v + 0.2 for v in values],
+            "low": [v - 0.2 for v in values],
+            "close": values,
+            "volume": [100] * 30,
+        }
+    )
+
+
+def _write_session(cache_root, session_date: dt.date, base_price: float) -> None:
+    frame = _session_frame(session_date, base_price)
+    path = cache_root / f"date={session_date.isoformat()}" / "data.parquet"
+    path.parent.mkdir(parents=True)
+    frame.to_parquet(path, index=False)
+
+
+def _assert_bars_equal(left: pd.DataFrame, right: pd.DataFrame) -> None:
+    assert list(left.index.asi8) == list(right.index.as_unit(left.index.unit).asi8)
+    pd.testing.assert_frame_equal(
+        left.reset_index(drop=True),
+        right.reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_bar_store_matches_partitions_and_picks_up_new_sessions(tmp_path):
+    cache_root = tmp_path / "spy" / "1m"
+    _write_session(cache_root, dt.date(2025, 1, 2), 100)
+    _write_session(cache_root, dt.date(2025, 1, 3), 101)
+    _write_session(cache_root, dt.date(2025, 1, 6), 102)
+
+    start, end = dt.date(2025, 1, 3), dt.date(2025, 1, 10)
+    from_partitions = load_spy_1m_bars(cache_root, start, end).frame
+
+    build_bar_store(cache_root)
+    _write_session(cache_root, dt.date(2025, 1, 7), 103)
+    from_store = load_spy_1m_bars(cache_root, start, end).frame
+
+    assert len(from_store) == len(from_partitions) + 30
+    _assert_bars_equal(from_partitions, from_store.iloc[: len(from_partitions)])
+    assert from_store.index[-1] == pd.Timestamp("2025-01-07 14:59", tz="UTC")
+
+
+def test_session_bars_slices_each_session(tmp_path):
+    cache_root = tmp_path / "spy" / "1m"
+    for offset, session_date in enumerate(
+        [dt.date(2025, 1, 2), dt.date(2025, 1, 3), dt.date(2025, 1, 6)]
+    ):
+        _write_session(cache_root, session_date, 100 + offset)
+
+    bars = load_spy_1m_bars(cache_root, dt.date(2025, 1, 1), dt.date(2025, 1, 31))
+
+    assert bars.dates == (dt.date(2025, 1, 2), dt.date(2025, 1, 3), dt.date(2025, 1, 6))
+    assert bars.session(dt.date(2025, 1, 3))["open"].iloc[0] == 101
+    assert bars.session(dt.date(2025, 1, 4)).empty
+    assert [len(day_df) for _, day_df in bars.items()] == [30, 30, 30]
+
+    window = bars.between(dt.date(2025, 1, 3), dt.date(2025, 1, 5))
+    assert window.dates == (dt.date(2025, 1, 3),)
+    assert window.session(dt.date(2025, 1, 3)).equals(bars.session(dt.date(2025, 1, 3)))
+
+
+def test_bar_cache_serves_sub_ranges_until_the_cache_changes(tmp_path, monkeypatch):
+    cache_root = tmp_path / "spy" / "1m"
+    _write_session(cache_root, dt.date(2025, 1, 2), 100)
+    _write_session(cache_root, dt.date(2025, 1, 3), 101)
+
+    full = load_spy_1m_bars(cache_root, dt.date(2025, 1, 1), dt.date(2025, 1, 31))
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("expected a bar cache hit")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(io_module, "_read_spy_1m_bars", _fail)
+        subset = load_spy_1m_bars(
+            cache_root, dt.date(2025, 1, 3), dt.date(2025, 1, 3), columns=("close",)
+        )
+    assert subset.dates == (dt.date(2025, 1, 3),)
+    assert list(subset.frame.columns) == ["close"]
+    assert subset.frame.index[0] == full.session(dt.date(2025, 1, 3)).index[0]
+
+    _write_session(cache_root, dt.date(2025, 1, 6), 102)
+    refreshed = load_spy_1m_bars(cache_root, dt.date(2025, 1, 1), dt.date(2025, 1, 31))
+    assert refreshed.dates[-1] == dt.date(2025, 1, 6)
+
+
+def test_compact_cache_schema_round_trips_mixed_with_legacy(tmp_path):
+    legacy_root = tmp_path / "legacy" / "spy" / "1m"
+    cache = Spy1mCache(tmp_path / "compact")
+    for offset, session_date in enumerate([dt.date(2025, 1, 2), dt.date(2025, 1, 3)]):
+        _write_session(legacy_root, session_date, 100 + offset)
+        cache.write_date(session_date, _session_frame(session_date, 100 + offset))
+    # A session still in the legacy layout is merged with compact ones.
+    _write_session(cache.root_dir / "spy" / "1m", dt.date(2025, 1, 6), 102)
+    _write_session(legacy_root, dt.date(2025, 1, 6), 102)
+
+    start, end = dt.date(2025, 1, 1), dt.date(2025, 1, 31)
+    expected = load_spy_1m_bars(legacy_root, start, end)
+    loaded = load_spy_1m_bars(cache.root_dir / "spy" / "1m", start, end)
+
+    assert loaded.dates == expected.dates
+    _assert_bars_equal(expected.frame, loaded.frame)
+    reopened = Spy1mCache(cache.root_dir)
+    assert reopened.has_date(dt.date(2025, 1, 2)) and reopened.has_date(dt.date(2025, 1, 6))
+
+
+def test_loaded_bars_keep_prices_scaled_and_decode_at_use(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    session_date = dt.date(2025, 1, 2)
+    source = _session_frame(session_date, 601.2345)
+    cache.write_date(session_date, source)
+    cache_root = cache.cache_root
+
+    for build in (False, True):
+        if build:
+            build_bar_store(cache_root)
+        bars = load_spy_1m_bars(cache_root, session_date, session_date, use_cache=False)
+        frame = bars.frame
+        assert all(frame[name].dtype == np.int32 for name in ("open", "close"))
+        # int64 timestamp + four int32 prices + int32 volume, against 48 bytes
+        # for float64 prices and volume.
+        assert frame.memory_usage(index=True).sum() <= 28 * len(frame) + 200
+        expected = np.round(source["close"].to_numpy() * 10_000) / 10_000
+        np.testing.assert_array_equal(price_values(frame, "close"), expected)
+        day = bars.session(session_date)
+        assert day["close"].dtype == np.float64
+        np.testing.assert_array_equal(day["close"].to_numpy(), expected)
+
+
+def test_bar_store_with_float_prices_is_ignored(tmp_path):
+    cache_root = tmp_path / "spy" / "1m"
+    _write_session(cache_root, dt.date(2025, 1, 2), 100)
+    bars_path = build_bar_store(cache_root)
+    table = pa.ipc.open_file(pa.memory_map(str(bars_path), "r")).read_all()
+    table = table.set_column(
+        table.schema.get_field_index("close"),
+        "close",
+        table.column("close").cast(pa.float64()),
+    )
+    with pa.OSFile(str(bars_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    assert BarStore.open(cache_root) is None
+
+
+def test_bar_store_skips_sessions_rewritten_after_the_build(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    days = [dt.date(2025, 1, 2), dt.date(2025, 1, 3), dt.date(2025, 1, 6)]
+    for offset, session_date in enumerate(days):
+        cache.write_date(session_date, _session_frame(session_date, 100 + offset))
+    build_bar_store(cache.cache_root)
+
+    cache.write_date(days[1], _session_frame(days[1], 200))
+    store = BarStore.open(cache.cache_root)
+    bars = load_spy_1m_bars(cache.cache_root, days[0], days[-1], use_cache=False)
+
+    assert store.session_dates == [days[0], days[2]]
+    assert len(store.slice(days[0], days[-1])) == 60
+    assert bars.dates == tuple(days)
+    assert bars.session(days[1])["open"].iloc[0] == 200
+    assert bars.session(days[2])["open"].iloc[0] == 102
+
+
+def test_concurrent_bar_store_builds_replace_one_file(tmp_path):
+    cache_root = tmp_path / "spy" / "1m"
+    _write_session(cache_root, dt.date(2025, 1, 2), 100)
+    _write_session(cache_root, dt.date(2025, 1, 3), 101)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: build_bar_store(cache_root), range(8)))
+
+    assert [path.name for path in (cache_root / "_store").iterdir()] == ["SPY.arrow"]
+    store = BarStore.open(cache_root)
+    assert store.session_dates == [dt.date(2025, 1, 2), dt.date(2025, 1, 3)]
+    assert store.stops == [30, 60]
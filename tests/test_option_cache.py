@@ -0,0 +1,75 @@
+import datetime as dt
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from src.cache.option_cache import OptionBarCache
+from src.providers.base import OptionContract, OptionsDataProvider, empty_bars
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+TRADE_DATE = dt.date(2024, 3, 5)
+NEAR, FAR = dt.date(2024, 3, 6), dt.date(2024, 3, 8)
+
+
+class _CountingProvider(OptionsDataProvider):
+    """Synthetic option bars; strike 1000 never trades."""
+
+    def __init__(self) -> None:
+        self.synthetic = SyntheticMarketDataProvider(seed=2)
+        self.requested: list[OptionContract] = []
+
+    def fetch_option_1m(self, contract, session_date):
+        self.requested.append(contract)
+        if contract.strike == 1000:
+            return empty_bars()
+        return self.synthetic.fetch_option_1m(contract, session_date)
+
+
+def _contracts(expiry: dt.date, strikes) -> list[OptionContract]:
+    return [
+        OptionContract("SPY", expiry, strike, right)
+        for strike in strikes
+        for right in "CP"
+    ]
+
+
+def test_option_symbol_round_trips():
+    contract = OptionContract("SPY", dt.date(2025, 1, 17), 450.5, "P")
+    assert contract.symbol == "SPY250117P00450500"
+    assert OptionContract.from_symbol(f"O:{contract.symbol}") == contract
+    with pytest.raises(ValueError):
+        OptionContract("SPY", dt.date(2025, 1, 17), 450, "X")
+
+
+def test_option_cache_partitions_by_expiry_and_loads_selected_contracts(tmp_path):
+    provider = _CountingProvider()
+    cache = OptionBarCache(tmp_path)
+    first = _contracts(NEAR, [640, 645])
+    cache.fetch_and_cache(provider, TRADE_DATE, first + first[:1])
+
+    later = _contracts(NEAR, [650]) + _contracts(FAR, [645]) + _contracts(NEAR, [1000])
+    cache.fetch_and_cache(provider, TRADE_DATE, first + later)
+
+    assert sorted(provider.requested) == sorted(first + later)
+    near_file = cache.cache_root / "trade_date=2024-03-05/expiry=2024-03-06.parquet"
+    assert pq.ParquetFile(near_file).metadata.num_row_groups == 6
+    assert not list(cache.cache_root.rglob("*.tmp"))
+
+    reopened = OptionBarCache(tmp_path)
+    assert reopened.missing(TRADE_DATE, first + later) == []
+    wanted = [later[0], first[3], later[2], OptionContract("SPY", NEAR, 1000, "C")]
+    frames = reopened.load(TRADE_DATE, wanted, columns=["high", "low", "close", "ask"])
+
+    assert list(frames) == wanted
+    assert frames[wanted[-1]].empty
+    for contract in wanted[:3]:
+        expected = provider.synthetic.fetch_option_1m(contract, TRADE_DATE)
+        frame = frames[contract]
+        assert str(frame.index.tz) == "UTC"
+        assert list(frame.columns) == ["high", "low", "close", "ask"]
+        np.testing.assert_allclose(frame["close"], expected["close"])
+        np.testing.assert_allclose(frame["ask"], expected["ask"])
+
+    with pytest.raises(KeyError):
+        reopened.load(TRADE_DATE, [OptionContract("SPY", NEAR, 700, "C")])
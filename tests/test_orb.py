@@ -1,12 +1,19 @@
 import datetime as dt
+import itertools
 
 import pandas as pd
 
+from backtesting_bot.pass1 import Pass1Config, generate_entries, generate_orb_entries
+from backtesting_bot.sessions import SessionBars, regular_hours
 from backtesting_bot.strategies.orb import (
     calculate_orb_range,
     find_orb_entry,
+    find_orb_session_entries,
+    resample_bars,
+    resample_sessions,
     resample_to_five_minutes,
 )
+from src.providers.synthetic import SyntheticMarketDataProvider
 
 
 def _make_minute_bars(start: dt.datetime, minutes: int, base_price: float) -> pd.DataFrame:
@@ -50,3 +57,123 @@ def test_orb_breakout_detection_call():
     assert entry is not None
     assert entry["direction"] == "CALL"
     assert entry["spy_price_at_entry"] == 103
+
+
+def test_vectorized_orb_engine_matches_the_candle_loop():
+    provider = SyntheticMarketDataProvider(seed=11, missing_bar_rate=0.02)
+    days = [ts.date() for ts in pd.bdate_range("2024-05-01", "2024-05-28")]
+    frames = [provider.fetch_spy_1m(day).set_index("timestamp") for day in days]
+    bars = pd.concat(frames)
+    bars.index = bars.index.tz_convert("UTC")
+    bars = SessionBars.from_frame(bars)
+
+    found = 0
+    for basis, confirm, cutoff, (interval, orb_minutes) in itertools.product(
+        ["close", "wick"], [False, True], [None, dt.time(10, 5)], [(5, 15), (7, 30)]
+    ):
+        configs = [
+            Pass1Config(
+                start=days[0],
+                end=days[-1],
+                strategy="orb_v1",
+                run_id="orb",
+                no_entries_after=cutoff,
+                orb_minutes=orb_minutes,
+                candle_interval_minutes=interval,
+                breakout_basis=basis,
+                confirm_full_candle=confirm,
+                orb_engine=engine,
+            )
+            for engine in ("loop", "vectorized")
+        ]
+        expected = generate_entries(bars, configs[0])
+        assert generate_orb_entries(bars, configs[1]) == expected
+        found += len(expected)
+    assert found
+
+
+def test_single_pass_resampler_matches_per_session_resample():
+    provider = SyntheticMarketDataProvider(
+        seed=5, missing_bar_rate=0.05, extended_hours=True
+    )
+    # Spans the March DST switch so sessions sit at both UTC offsets.
+    dates = pd.bdate_range("2025-03-05", "2025-03-12").date
+    frame = pd.concat(provider.fetch_spy_1m(value) for value in dates)
+    bars = SessionBars.from_frame(frame.set_index("timestamp").tz_convert("UTC"))
+
+    for interval in (1, 5, 7, 15, 60):
+        candles = resample_sessions(bars, interval)
+        assert candles.dates == tuple(dates)
+        for trade_date, day_df in bars.items():
+            expected = resample_bars(regular_hours(day_df), interval)
+            actual = candles.session(trade_date)
+            assert actual.index.equals(expected.index)
+            for column in expected.columns:
+                assert actual[column].tolist() == expected[column].tolist()
+
+    # The last bin holds only 15:30-16:00 but is kept, labelled at its right edge.
+    assert candles.session(dates[0]).index[-1].strftime("%H:%M") == "16:30"
+
+
+def _candles(closes: list[float]) -> pd.DataFrame:
+    index = pd.date_range("2025-01-02 09:35", periods=len(closes), freq="5min")
+    index = index.tz_localize("America/New_York")
+    return pd.DataFrame(
+        {
+            "open": closes,
+            "high": [value + 0.1 for value in closes],
+            "low": [value - 0.1 for value in closes],
+            "close": closes,
+            "volume": [100] * len(closes),
+        },
+        index=index,
+    )
+
+
+def test_session_entries_rearm_rules():
+    # Range 99.9-101.1, then: up, up, inside, up, down, down, up.
+    five_min = _candles([100, 101, 100.5, 102, 103, 100.5, 102, 98, 97, 102])
+    orb_range = calculate_orb_range(five_min, orb_candles=3)
+
+    def directions(rearm: str, max_entries: int = 5) -> list[str]:
+        entries = find_orb_session_entries(
+            five_min, orb_range, max_entries=max_entries, rearm=rearm
+        )
+        return [entry["direction"] for entry in entries]
+
+    assert directions("inside") == ["CALL", "CALL"]
+    assert directions("opposite") == ["CALL", "PUT", "CALL"]
+    assert directions("opposite", max_entries=2) == ["CALL", "PUT"]
+    assert directions("inside", max_entries=1) == ["CALL"]
+
+
+def test_vectorized_multi_entry_scan_matches_the_candle_loop():
+    provider = SyntheticMarketDataProvider(seed=3, missing_bar_rate=0.02)
+    days = [ts.date() for ts in pd.bdate_range("2024-06-03", "2024-06-21")]
+    frames = [provider.fetch_spy_1m(day).set_index("timestamp") for day in days]
+    bars = pd.concat(frames)
+    bars.index = bars.index.tz_convert("UTC")
+    bars = SessionBars.from_frame(bars)
+
+    multi_entry_days = 0
+    for basis, rearm in itertools.product(["close", "wick"], ["inside", "opposite"]):
+        configs = [
+            Pass1Config(
+                start=days[0],
+                end=days[-1],
+                strategy="orb_v1",
+                run_id="orb",
+                candle_interval_minutes=1,
+                max_trades_per_day=4,
+                breakout_basis=basis,
+                rearm=rearm,
+                orb_engine=engine,
+            )
+            for engine in ("loop", "vectorized")
+        ]
+        expected = generate_entries(bars, configs[0])
+        assert generate_entries(bars, configs[1]) == expected
+        per_day = pd.Series([entry.trade_date for entry in expected]).value_counts()
+        assert per_day.max() <= 4
+        multi_entry_days += int((per_day > 1).sum())
+    assert multi_entry_days
@@ -0,0 +1,140 @@
+import datetime as dt
+import json
+
+import pandas as pd
+import pytest
+
+from backtesting_bot.io import _read_parquet_window, spy_1m_session_dates
+from backtesting_bot.pass1 import Pass1Config, run_pass1_pipeline
+from src.cache.spy_cache import Spy1mCache
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+DAYS = [dt.date(2025, 3, 3) + dt.timedelta(days=offset) for offset in range(12)]
+SESSIONS = [day for day in DAYS if day.weekday() < 5]
+
+
+@pytest.fixture
+def cache_root(tmp_path):
+    provider = SyntheticMarketDataProvider(seed=5)
+    cache = Spy1mCache(tmp_path / "data")
+    for session_date in SESSIONS:
+        cache.write_date(session_date, provider.fetch_spy_1m(session_date))
+    return cache.cache_root
+
+
+def test_session_dates_come_from_the_manifest(cache_root):
+    assert spy_1m_session_dates(cache_root, DAYS[0], DAYS[-1]) == SESSIONS
+    assert spy_1m_session_dates(cache_root, SESSIONS[2], SESSIONS[3]) == SESSIONS[2:4]
+
+
+def test_session_dates_of_a_parquet_file(tmp_path):
+    provider = SyntheticMarketDataProvider(seed=5)
+    frame = pd.concat(provider.fetch_spy_1m(day) for day in SESSIONS[:3])
+    frame["timestamp"] = frame["timestamp"].dt.tz_convert("UTC")
+    path = tmp_path / "spy_1m.parquet"
+    frame.to_parquet(path, index=False)
+    assert spy_1m_session_dates(path, SESSIONS[1], DAYS[-1]) == SESSIONS[1:3]
+
+
+@pytest.mark.parametrize("strategy", ["orb_v1", "ema_v1", "rsi_v1"])
+def test_sharded_run_matches_single_process(cache_root, tmp_path, strategy):
+    outputs = []
+    for workers, shard_sessions in ((1, 20), (3, 2)):
+        run_dir = run_pass1_pipeline(
+            Pass1Config(
+                start=DAYS[0],
+                end=DAYS[-1],
+                strategy=strategy,
+                run_id="test",
+                spy_1m_path=str(cache_root),
+                max_trades_per_day=3,
+                output_dir=tmp_path / f"workers={workers}",
+                feature_store_dir=tmp_path / f"features-{workers}",
+                workers=workers,
+                shard_sessions=shard_sessions,
+            )
+        )
+        outputs.append(
+            (
+                pd.read_parquet(run_dir / "entries.parquet"),
+                json.loads((run_dir / "run_metadata.json").read_text()),
+            )
+        )
+
+    (single, single_meta), (sharded, sharded_meta) = outputs
+    assert len(single) > 0
+    pd.testing.assert_frame_equal(sharded, single)
+    assert sharded_meta == single_meta
+    assert list(sharded_meta["counts_per_day"]) == [
+        day.isoformat() for day in SESSIONS
+    ]
+
+
+@pytest.mark.parametrize("strategy", ["ema_v1", "rsi_v1"])
+def test_short_sessions_widen_the_warmup_across_shard_boundaries(tmp_path, strategy):
+    # Half-hour sessions: the slow EMA's warm-up spans several of them, more
+    # than the MIN_SESSION_BARS estimate loads at first.
+    provider = SyntheticMarketDataProvider(seed=9)
+    sessions = [day.date() for day in pd.bdate_range("2025-04-01", periods=16)]
+    cache = Spy1mCache(tmp_path / "data")
+    for session_date in sessions:
+        cache.write_date(session_date, provider.fetch_spy_1m(session_date).iloc[:30])
+
+    outputs = []
+    for workers in (1, 3):
+        run_dir = run_pass1_pipeline(
+            Pass1Config(
+                start=sessions[0],
+                end=sessions[-1],
+                strategy=strategy,
+                run_id="test",
+                spy_1m_path=str(cache.cache_root),
+                max_trades_per_day=5,
+                output_dir=tmp_path / f"workers={workers}",
+                feature_store_dir=tmp_path / f"features-{workers}",
+                workers=workers,
+                shard_sessions=4,
+            )
+        )
+        outputs.append(pd.read_parquet(run_dir / "entries.parquet"))
+
+    single, sharded = outputs
+    assert len(single) > 0
+    assert set(single["trade_date"]) & {day.isoformat() for day in sessions[4::4]}
+    columns = ["trade_date", "entry_ts", "direction", "spy_price_at_entry"]
+    pd.testing.assert_frame_equal(sharded[columns], single[columns])
+    for expected, actual in zip(single["context"], sharded["context"]):
+        assert json.loads(actual) == pytest.approx(json.loads(expected), rel=1e-12)
+
+
+def test_shards_of_a_parquet_file_read_only_their_window(tmp_path):
+    provider = SyntheticMarketDataProvider(seed=5)
+    frame = pd.concat(provider.fetch_spy_1m(day) for day in SESSIONS)
+    path = tmp_path / "spy_1m.parquet"
+    frame.to_parquet(path, index=False, row_group_size=100)
+
+    window = _read_parquet_window(path, SESSIONS[3], SESSIONS[4])
+    days = set(window["timestamp"].dt.date)
+    assert SESSIONS[3] in days and SESSIONS[4] in days
+    assert days <= {SESSIONS[2], SESSIONS[3], SESSIONS[4], SESSIONS[5]}
+
+    outputs = []
+    for workers in (1, 3):
+        run_dir = run_pass1_pipeline(
+            Pass1Config(
+                start=DAYS[0],
+                end=DAYS[-1],
+                strategy="ema_v1",
+                run_id="test",
+                spy_1m_path=str(path),
+                max_trades_per_day=3,
+                output_dir=tmp_path / f"workers={workers}",
+                feature_store_dir=tmp_path / f"features-{workers}",
+                workers=workers,
+                shard_sessions=2,
+            )
+        )
+        outputs.append(pd.read_parquet(run_dir / "entries.parquet"))
+    assert len(outputs[0]) > 0
+    columns = ["trade_date", "entry_ts", "direction", "spy_price_at_entry"]
+    pd.testing.assert_frame_equal(outputs[0][columns], outputs[1][columns])
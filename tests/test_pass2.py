@@ -0,0 +1,150 @@
+import dataclasses
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting_bot.experiment_config import AccountParams, ExitParams
+from backtesting_bot.pass2 import Pass2Config, run_pass2_pipeline
+
+SESSIONS = [dt.date(2025, 3, 3) + dt.timedelta(days=offset) for offset in range(5)]
+
+STATIC = ExitParams(
+    stop_loss_pct=0.002,
+    take_profit_mode="static_pct",
+    take_profit_pct=0.003,
+    trailing_enabled=False,
+    trail_pct=0.002,
+    partial_tp_enabled=False,
+    split_pct=0.5,
+    first_tp_pct=0.001,
+    runner_trail_pct=0.002,
+    both_hit_same_second="stop_first",
+)
+
+
+@pytest.fixture
+def spy_path(tmp_path):
+    rng = np.random.default_rng(3)
+    frames = []
+    for session_date in SESSIONS:
+        index = pd.date_range(
+            start=dt.datetime.combine(session_date, dt.time(9, 30)),
+            periods=390,
+            freq="1min",
+            tz="America/New_York",
+        )
+        close = np.round(500 + np.cumsum(rng.normal(0, 0.12, len(index))), 2)
+        # Mostly narrow bars, with a few wide enough to touch stop and target.
+        spread = np.where(
+            rng.random(len(index)) < 0.03, 1.5, rng.uniform(0.02, 0.3, len(index))
+        ).round(2)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "timestamp": index.tz_convert("UTC"),
+                    "open": close,
+                    "high": close + spread,
+                    "low": close - spread,
+                    "close": close,
+                    "volume": 1000,
+                }
+            )
+        )
+    path = tmp_path / "spy_1m.parquet"
+    pd.concat(frames).to_parquet(path, index=False)
+    return path
+
+
+def _entries(spy_path) -> pd.DataFrame:
+    bars = pd.read_parquet(spy_path)
+    rng = np.random.default_rng(8)
+    rows = np.sort(rng.choice(len(bars), 60, replace=False))
+    entry_ts = pd.DatetimeIndex(bars["timestamp"].iloc[rows])
+    # Off-minute entries start at the next bar; one entry comes after the last
+    # bar of its session and one on a date without bars.
+    entry_ts = entry_ts + pd.to_timedelta(rng.choice([0, 20], len(rows)), unit="s")
+    entries = pd.DataFrame(
+        {
+            "trade_date": entry_ts.tz_convert("America/New_York").date.astype(str),
+            "entry_ts": entry_ts,
+            "direction": rng.choice(["CALL", "PUT"], len(rows)),
+            "spy_price_at_entry": bars["close"].iloc[rows].to_numpy(),
+        }
+    )
+    late = pd.Timestamp("2025-03-04 21:30", tz="UTC")
+    missing = pd.Timestamp("2025-03-10 15:00", tz="UTC")
+    extra = pd.DataFrame(
+        {
+            "trade_date": ["2025-03-04", "2025-03-10"],
+            "entry_ts": [late, missing],
+            "direction": ["CALL", "PUT"],
+            "spy_price_at_entry": [500.0, 500.0],
+        }
+    )
+    return (
+        pd.concat([entries, extra])
+        .sort_values("entry_ts", kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def _run(spy_path, output_dir, exit_params, **overrides) -> bytes:
+    config = Pass2Config(
+        start=SESSIONS[0],
+        end=dt.date(2025, 3, 10),
+        spy_1m_path=str(spy_path),
+        exit_params=exit_params,
+        account_params=AccountParams(
+            starting_cash=25_000,
+            allocation_pct_per_trade=0.1,
+            max_daily_loss_pct=0.002,
+        ),
+        output_dir=output_dir,
+        **overrides,
+    )
+    run_dir = run_pass2_pipeline(config, _entries(spy_path))
+    return (run_dir / "trades.parquet").read_bytes()
+
+
+TRAILING = dataclasses.replace(STATIC, trailing_enabled=True)
+PARTIAL = dataclasses.replace(STATIC, partial_tp_enabled=True)
+PARTIAL_TRAILING = dataclasses.replace(
+    STATIC, trailing_enabled=True, partial_tp_enabled=True, runner_trail_pct=0.001
+)
+# The first target beyond the final one: the final target can close a trade
+# before the partial fills.
+FAR_PARTIAL = dataclasses.replace(PARTIAL, first_tp_pct=0.004, take_profit_pct=0.0025)
+
+
+@pytest.mark.parametrize(
+    "exits", [STATIC, TRAILING, PARTIAL, PARTIAL_TRAILING, FAR_PARTIAL]
+)
+@pytest.mark.parametrize("both_hit", ["stop_first", "tp_first"])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_vectorized_exits_write_identical_trades(
+    spy_path, tmp_path, exits, both_hit, streaming
+):
+    exit_params = dataclasses.replace(exits, both_hit_same_second=both_hit)
+    expected = _run(
+        spy_path,
+        tmp_path / "loop",
+        exit_params,
+        exit_engine="loop",
+        streaming=streaming,
+    )
+    actual = _run(spy_path, tmp_path / "vectorized", exit_params, streaming=streaming)
+    assert actual == expected
+
+    trades = pd.read_parquet(tmp_path / "vectorized" / "trades.parquet")
+    assert {"stop_loss", "session_end"} <= set(trades["exit_reason"])
+    if exits in (STATIC, FAR_PARTIAL):
+        assert "take_profit" in set(trades["exit_reason"])
+    if exits in (PARTIAL, PARTIAL_TRAILING):
+        assert trades["partial_exit_ts"].notna().any()
+
+
+def test_unknown_exit_engine(spy_path, tmp_path):
+    with pytest.raises(ValueError, match="Unsupported exit engine"):
+        _run(spy_path, tmp_path, STATIC, exit_engine="numba")
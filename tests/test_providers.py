@@ -0,0 +1,135 @@
+import datetime as dt
+
+import pandas as pd
+
+from src.config import AlpacaConfig, MassiveConfig
+from src.providers.alpaca import AlpacaMarketDataProvider
+from src.providers.base import OptionContract
+from src.providers.massive import MassiveMarketDataProvider
+
+
+class _StubResponse:
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def json(self) -> dict:
+        return self.payload
+
+
+class _StubSession:
+    """Serves canned pages keyed by the request's page token, else its URL."""
+
+    def __init__(self, pages: dict) -> None:
+        self.pages = pages
+        self.requests: list[tuple[str, dict]] = []
+
+    def get(self, url: str, **kwargs) -> _StubResponse:
+        params = dict(kwargs.get("params") or {})
+        self.requests.append((url, params))
+        key = params["page_token"] if "page_token" in params else url
+        return _StubResponse(self.pages[key])
+
+
+def _bars(session_date: dt.date, times: list[str], epoch_ms: bool = False) -> list[dict]:
+    bars = []
+    for offset, value in enumerate(times):
+        local = pd.Timestamp(f"{session_date} {value}", tz="America/New_York")
+        utc = local.tz_convert("UTC")
+        bars.append(
+            {
+                "t": utc.value // 1_000_000
+                if epoch_ms
+                else utc.isoformat().replace("+00:00", "Z"),
+                "o": 100 + offset,
+                "h": 101 + offset,
+                "l": 99 + offset,
+                "c": 100.5 + offset,
+                "v": 1000,
+            }
+        )
+    return bars
+
+
+def test_alpaca_range_fetch_follows_pages_and_splits_sessions():
+    first, second, holiday = dt.date(2025, 1, 2), dt.date(2025, 1, 3), dt.date(2025, 1, 6)
+    url = "https://data.alpaca.markets/v2/stocks/SPY/bars"
+    pages = {
+        url: {
+            "bars": _bars(first, ["08:00", "09:30", "15:59"]),
+            "next_page_token": "page-2",
+        },
+        "page-2": {
+            "bars": _bars(first, ["16:00", "17:30"]) + _bars(second, ["09:30"]),
+            "next_page_token": None,
+        },
+    }
+    provider = AlpacaMarketDataProvider(AlpacaConfig(api_key="key", secret_key="secret"))
+    provider.session = _StubSession(pages)
+
+    frames = provider.fetch_spy_1m_range([first, second, holiday])
+
+    assert len(provider.session.requests) == 2
+    assert provider.session.requests[0][1]["start"].startswith("2025-01-02")
+    assert provider.session.requests[0][1]["end"].startswith("2025-01-06")
+    assert list(frames) == [first, second, holiday]
+    assert [ts.strftime("%H:%M") for ts in frames[first]["timestamp"]] == [
+        "09:30",
+        "15:59",
+        "16:00",
+    ]
+    assert list(frames[first].columns) == [
+        "timestamp",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+    ]
+    assert len(frames[second]) == 1
+    assert frames[holiday].empty
+
+
+def test_massive_range_fetch_follows_next_url_and_filters_regular_hours():
+    first, second = dt.date(2025, 7, 1), dt.date(2025, 7, 2)
+    url = "https://api.polygon.io/v2/aggs/ticker/SPY/range/1/minute/2025-07-01/2025-07-02"
+    next_url = "https://api.polygon.io/v2/aggs/cursor/abc"
+    pages = {
+        url: {
+            "results": _bars(first, ["04:00", "09:30", "16:00"], epoch_ms=True),
+            "next_url": next_url,
+        },
+        next_url: {"results": _bars(second, ["09:31", "19:59"], epoch_ms=True)},
+    }
+    provider = MassiveMarketDataProvider(
+        MassiveConfig(api_key="key", max_requests_per_minute=6000)
+    )
+    provider.session = _StubSession(pages)
+
+    frames = provider.fetch_spy_1m_range([first, second])
+
+    assert [request_url for request_url, _ in provider.session.requests] == [url, next_url]
+    assert provider.session.requests[1][1] == {"apiKey": "key"}
+    assert [ts.strftime("%H:%M") for ts in frames[first]["timestamp"]] == ["09:30", "16:00"]
+    assert str(frames[second]["timestamp"].dt.tz) == "America/New_York"
+    assert len(frames[second]) == 1
+
+
+def test_massive_option_fetch_requests_the_occ_ticker():
+    session_date, expiry = dt.date(2025, 7, 1), dt.date(2025, 7, 3)
+    contract = OptionContract("SPY", expiry, 620, "C")
+    url = (
+        "https://api.polygon.io/v2/aggs/ticker/O:SPY250703C00620000"
+        "/range/1/minute/2025-07-01/2025-07-01"
+    )
+    pages = {url: {"results": _bars(session_date, ["09:29", "09:30"], epoch_ms=True)}}
+    provider = MassiveMarketDataProvider(
+        MassiveConfig(api_key="key", max_requests_per_minute=6000)
+    )
+    provider.session = _StubSession(pages)
+
+    frame = provider.fetch_option_1m(contract, session_date)
+
+    assert [ts.strftime("%H:%M") for ts in frame["timestamp"]] == ["09:30"]
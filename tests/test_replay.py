@@ -0,0 +1,53 @@
+import datetime as dt
+
+from src.cache.backfill import backfill
+from src.cache.spy_cache import Spy1mCache
+from src.providers.alpaca import AlpacaMarketDataProvider
+from src.providers.http import RetryPolicy
+from src.providers.massive import MassiveMarketDataProvider
+from src.providers.replay import (
+    ReplayOptions,
+    ReplayServer,
+    cache_source,
+    synthetic_source,
+)
+
+SESSIONS = [dt.date(2025, 3, 3) + dt.timedelta(days=offset) for offset in range(5)]
+FAST_RETRY = RetryPolicy(max_attempts=5, base_delay=0.001)
+
+
+def test_alpaca_backfill_pages_and_retries_against_replay(tmp_path):
+    options = ReplayOptions(page_size=500, rate_limit_every=3, error_every=5)
+    with ReplayServer(options=options) as server:
+        provider = AlpacaMarketDataProvider(server.alpaca_config())
+        provider.retry_policy = FAST_RETRY
+        assert provider.ping()
+
+        summary = backfill(Spy1mCache(tmp_path), provider, SESSIONS, workers=2)
+
+        assert summary.ok and summary.fetched == SESSIONS
+        # 5 sessions x 960 extended-hours bars at 500 per page, plus injected errors.
+        assert server.bar_requests > 10
+        assert server.bytes_served > 0
+
+    frame = Spy1mCache(tmp_path).read_date(SESSIONS[0])
+    expected = synthetic_source()(SESSIONS[0])
+    expected = expected.set_index("timestamp").between_time("09:30", "16:00")
+    assert frame["close"].tolist() == expected["close"].tolist()
+    assert frame["timestamp"].iloc[0].strftime("%H:%M") == "09:30"
+
+
+def test_massive_replays_recorded_sessions(tmp_path):
+    recorded = Spy1mCache(tmp_path / "recorded")
+    with ReplayServer() as server:
+        backfill(recorded, AlpacaMarketDataProvider(server.alpaca_config()), SESSIONS)
+
+    options = ReplayOptions(page_size=700, error_every=2)
+    with ReplayServer(cache_source(tmp_path / "recorded"), options) as server:
+        provider = MassiveMarketDataProvider(server.massive_config())
+        provider.retry_policy = FAST_RETRY
+        frames = provider.fetch_spy_1m_range(SESSIONS)
+
+    for session_date in SESSIONS:
+        expected = recorded.read_date(session_date)
+        assert frames[session_date]["close"].tolist() == expected["close"].tolist()
@@ -0,0 +1,193 @@
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from backtesting_bot.io import load_spy_1m_bars
+from src.cache.manifest import (
+    cache_version,
+    load_manifest,
+    read_manifest,
+    write_manifest,
+)
+from src.cache.schema import encode_bars, encode_option_bars
+from src.cache.spy_cache import Spy1mCache
+from src.cli import main as cli_main
+
+SESSIONS = [
+    dt.date(2025, 1, 30),
+    dt.date(2025, 1, 31),
+    dt.date(2025, 2, 3),
+    dt.date(2025, 2, 4),
+]
+
+
+def _session_frame(session_date: dt.date, base_price: float) -> pd.DataFrame:
+    index = pd.date_range(
+        start=dt.datetime.combine(session_date, dt.time(9, 30)),
+        periods=20,
+        freq="1min",
+        tz="America/New_York",
+    )
+    values = [round(base_price + i * 0.05, 2) for i in range(20)]
+    return pd.DataFrame(
+        {
+            "timestamp": index,
+            "open": values,
+            "high": [round(v + 0.1, 2) for v in values],
+            "low": [round(v - 0.1, 2) for v in values],
+            "close": values,
+            "volume": [500] * 20,
+        }
+    )
+
+
+def test_compact_merges_daily_partitions_and_keeps_appends_readable(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    for offset, session_date in enumerate(SESSIONS):
+        cache.write_date(session_date, _session_frame(session_date, 100 + offset))
+    start, end = dt.date(2025, 1, 1), dt.date(2025, 2, 28)
+    before = load_spy_1m_bars(cache.cache_root, start, end, use_cache=False)
+
+    written = cache.compact("month")
+
+    assert [path.name for path in written] == ["2025-01.parquet", "2025-02.parquet"]
+    assert not list(cache.cache_root.glob("date=*"))
+    assert pq.ParquetFile(written[1]).metadata.num_row_groups == 2
+    assert all(Spy1mCache(tmp_path).has_date(session_date) for session_date in SESSIONS)
+    after = load_spy_1m_bars(cache.cache_root, start, end, use_cache=False)
+    assert after.dates == before.dates
+    pd.testing.assert_frame_equal(after.frame, before.frame)
+
+    appended = dt.date(2025, 2, 5)
+    cache.write_date(appended, _session_frame(appended, 110))
+    assert load_spy_1m_bars(cache.cache_root, start, end).dates[-1] == appended
+
+    cache.compact("year")
+    cache.compact("year")
+    manifest = read_manifest(cache.cache_root)
+    assert set(manifest["file"]) == {"_compacted/2025.parquet"}
+    assert list(manifest["row_group"]) == list(range(5))
+    assert not list((cache.cache_root / "_compacted").glob("2025-*.parquet"))
+    reloaded = load_spy_1m_bars(cache.cache_root, dt.date(2025, 2, 4), end)
+    assert reloaded.dates == (dt.date(2025, 2, 4), appended)
+
+
+def test_compact_command_runs_without_provider_credentials(tmp_path, monkeypatch):
+    monkeypatch.delenv("ALPACA_API_KEY", raising=False)
+    monkeypatch.delenv("ALPACA_SECRET_KEY", raising=False)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(f"local:\n  data_dir: {tmp_path}\n")
+    cache = Spy1mCache(tmp_path)
+    for session_date in SESSIONS[:2]:
+        cache.write_date(session_date, _session_frame(session_date, 600.0))
+
+    args = cli_main.build_parser().parse_args(
+        ["--config", str(config_path), "compact-spy"]
+    )
+    assert cli_main.compact_spy(args) == 0
+    assert set(Spy1mCache(tmp_path).manifest()["file"]) == {
+        "_compacted/2025-01.parquet"
+    }
+
+
+def test_manifest_records_sessions_and_versions_the_cache(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    for offset, session_date in enumerate(SESSIONS[:2]):
+        cache.write_date(session_date, _session_frame(session_date, 100 + offset))
+
+    manifest = read_manifest(cache.cache_root)
+    assert list(manifest["session_date"]) == SESSIONS[:2]
+    assert list(manifest["file"]) == [
+        "date=2025-01-30/data.v2.parquet",
+        "date=2025-01-31/data.v2.parquet",
+    ]
+    assert list(manifest["rows"]) == [20, 20]
+    assert manifest["first_ts"].iloc[0] == pd.Timestamp("2025-01-30 14:30", tz="UTC")
+    assert manifest["last_ts"].iloc[0] == pd.Timestamp("2025-01-30 14:49", tz="UTC")
+    assert (manifest["file_size"] > 0).all()
+    assert manifest["content_hash"].nunique() == 2
+
+    version = cache_version(cache.cache_root)
+    assert version == cache.cache_version()
+    cache.compact("month")
+    assert cache_version(cache.cache_root) == version
+
+    cache.write_date(SESSIONS[0], _session_frame(SESSIONS[0], 99))
+    assert cache_version(cache.cache_root) != version
+
+    # Partitions written by other tools are indexed on the next load.
+    (cache.cache_root / "_manifest.parquet").unlink()
+    legacy = cache.cache_root / "date=2025-02-03" / "data.parquet"
+    legacy.parent.mkdir()
+    _session_frame(SESSIONS[2], 102).to_parquet(legacy, index=False)
+    # Readers reconcile in memory and leave the manifest to writers.
+    assert set(load_manifest(cache.cache_root)["session_date"]) == set(SESSIONS[:3])
+    assert read_manifest(cache.cache_root) is None
+    assert Spy1mCache(tmp_path).cached_dates() == set(SESSIONS[:3])
+    assert set(read_manifest(cache.cache_root)["session_date"]) == set(SESSIONS[:3])
+
+
+def test_concurrent_manifest_writes_do_not_collide(tmp_path):
+    cache = Spy1mCache(tmp_path)
+    cache.write_date(SESSIONS[0], _session_frame(SESSIONS[0], 100))
+    manifest = cache.manifest()
+
+    def _write(_):
+        for _ in range(10):
+            write_manifest(cache.cache_root, manifest)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_write, range(8)))
+
+    pd.testing.assert_frame_equal(
+        read_manifest(cache.cache_root), manifest, check_dtype=False
+    )
+    assert not list(cache.cache_root.glob("*.tmp"))
+
+
+def test_missing_volume_is_stored_as_zero():
+    frame = _session_frame(SESSIONS[0], 600.0)
+    frame["volume"] = frame["volume"].astype(float)
+    frame.loc[3, "volume"] = np.nan
+
+    for encode in (encode_bars, encode_option_bars):
+        volume = encode(frame).column("volume").to_pylist()
+        assert volume[3] == 0
+        assert volume[:3] == [500] * 3
+
+
+@pytest.mark.parametrize("value", [-1.0, 2.0**31, np.inf])
+def test_volume_outside_int32_is_rejected(value):
+    frame = _session_frame(SESSIONS[0], 600.0)
+    frame["volume"] = frame["volume"].astype(float)
+    frame.loc[5, "volume"] = value
+
+    for encode in (encode_bars, encode_option_bars):
+        with pytest.raises(ValueError, match="Unsupported volume"):
+            encode(frame)
+
+
+@pytest.mark.parametrize("value", [np.nan, 214_748.5, -214_748.5])
+def test_prices_outside_int32_are_rejected(value):
+    frame = _session_frame(SESSIONS[0], 600.0)
+    frame.loc[2, "open"] = value
+
+    with pytest.raises(ValueError, match="Unsupported open price"):
+        encode_bars(frame)
+
+
+def test_option_prices_keep_missing_quotes_and_reject_out_of_range():
+    frame = _session_frame(SESSIONS[0], 600.0)
+    frame["bid"] = frame["close"] - 0.05
+    frame.loc[1, "bid"] = np.nan
+
+    bid = encode_option_bars(frame).column("bid").to_pylist()
+    assert bid[1] is None and bid[0] == 5_999_500
+
+    frame.loc[4, "close"] = 1e6
+    with pytest.raises(ValueError, match="Unsupported close price"):
+        encode_option_bars(frame)
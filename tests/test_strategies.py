@@ -0,0 +1,142 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting_bot.features import add_features
+from backtesting_bot.pass1 import Pass1Config, generate_entries, run_pass1_pipeline
+from backtesting_bot.sessions import SessionBars
+from backtesting_bot.strategies import STRATEGIES, get_strategy
+
+DAYS = [dt.date(2025, 3, 3), dt.date(2025, 3, 4), dt.date(2025, 3, 5)]
+
+
+def _bars() -> SessionBars:
+    rng = np.random.default_rng(11)
+    frames = []
+    for day in DAYS:
+        # Pre-market bars feed the indicators but can never enter.
+        index = pd.date_range(
+            start=dt.datetime.combine(day, dt.time(9, 0)),
+            end=dt.datetime.combine(day, dt.time(16, 0)),
+            freq="1min",
+            tz="America/New_York",
+        )
+        wave = 0.6 * np.sin(np.arange(len(index)) / 9)
+        close = np.round(500 + wave + rng.normal(0, 0.08, len(index)), 2)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "open": close,
+                    "high": close + 0.05,
+                    "low": close - 0.05,
+                    "close": close,
+                    "volume": 1000,
+                },
+                index=index.tz_convert("UTC"),
+            )
+        )
+    return SessionBars.from_frame(pd.concat(frames))
+
+
+def _config(strategy: str, **overrides) -> Pass1Config:
+    return Pass1Config(
+        start=DAYS[0], end=DAYS[-1], strategy=strategy, run_id="test", **overrides
+    )
+
+
+def _reference_entries(bars: SessionBars, config: Pass1Config) -> list[tuple]:
+    """Row-by-row scan: a signal on bar ``t`` enters at its close, ``t + 1min``."""
+    frame = bars.frame
+    expected = []
+    for trade_date, start, stop in zip(bars.dates, bars.starts, bars.stops):
+        taken = 0
+        for row in range(start + 1, stop):
+            if config.strategy == "ema_v1":
+                spread = frame["ema_fast"] - frame["ema_slow"]
+                now, before = spread.iloc[row], spread.iloc[row - 1]
+                call = before <= 0 < now
+                put = before >= 0 > now
+            else:
+                now, before = frame["rsi"].iloc[row], frame["rsi"].iloc[row - 1]
+                call = before <= config.rsi_oversold < now
+                put = before >= config.rsi_overbought > now and not call
+            entry_ts = (frame.index[row] + pd.Timedelta(minutes=1)).tz_convert(
+                "America/New_York"
+            )
+            closes_at = entry_ts.time()
+            if not dt.time(9, 30) < closes_at < dt.time(16, 0):
+                continue
+            if config.no_entries_after and closes_at > config.no_entries_after:
+                continue
+            if (call or put) and taken < config.max_trades_per_day:
+                taken += 1
+                expected.append(
+                    (
+                        trade_date,
+                        entry_ts.tz_convert("UTC"),
+                        "CALL" if call else "PUT",
+                        float(frame["close"].iloc[row]),
+                    )
+                )
+    return expected
+
+
+@pytest.mark.parametrize("strategy", ["ema_v1", "rsi_v1"])
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {},
+        {"max_trades_per_day": 3},
+        {"max_trades_per_day": 50, "no_entries_after": dt.time(11, 0)},
+        {"ema_fast_period": 3, "ema_slow_period": 5, "rsi_period": 5},
+    ],
+)
+def test_indicator_strategies_match_a_row_scan(strategy, overrides):
+    config = _config(strategy, **overrides)
+    bars = _bars()
+    bars = add_features(bars, get_strategy(strategy).features(config))
+
+    entries = generate_entries(bars, config)
+    actual = [
+        (
+            entry.trade_date,
+            entry.entry_ts,
+            entry.direction,
+            entry.spy_price_at_entry,
+        )
+        for entry in entries
+    ]
+    assert actual == _reference_entries(bars, config)
+    assert actual
+    assert all(entry.strategy_name == strategy for entry in entries)
+
+
+def test_registry_lookup():
+    assert set(STRATEGIES) == {"orb_v1", "ema_v1", "rsi_v1"}
+    config = _config("ema_v1", ema_fast_period=5, ema_slow_period=13)
+    assert [spec.period for spec in get_strategy("ema_v1").features(config)] == [5, 13]
+    assert get_strategy("orb_v1").features(config) == ()
+    with pytest.raises(ValueError, match="Unsupported strategy"):
+        get_strategy("macd_v1")
+
+
+@pytest.mark.parametrize("strategy", ["ema_v1", "rsi_v1"])
+def test_streaming_matches_batch_for_indicator_strategies(tmp_path, strategy):
+    source = tmp_path / "spy_1m.parquet"
+    _bars().frame.rename_axis("timestamp").reset_index().to_parquet(source, index=False)
+    frames = []
+    for streaming in (False, True):
+        run_dir = run_pass1_pipeline(
+            _config(
+                strategy,
+                max_trades_per_day=4,
+                spy_1m_path=str(source),
+                output_dir=tmp_path / f"streaming={streaming}",
+                streaming=streaming,
+            )
+        )
+        frames.append(pd.read_parquet(run_dir / "entries.parquet"))
+    assert len(frames[0]) > 0
+    pd.testing.assert_frame_equal(frames[1], frames[0], check_dtype=False)
@@ -0,0 +1,150 @@
+import datetime as dt
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting_bot.bar_store import build_bar_store
+from backtesting_bot.experiment_config import AccountParams, ExitParams
+from backtesting_bot.features import add_features
+from backtesting_bot.io import iter_spy_1m_sessions, load_spy_1m_bars
+from backtesting_bot.pass1 import (
+    Pass1Config,
+    _iter_prepared_sessions,
+    run_pass1_pipeline,
+)
+from backtesting_bot.pass2 import Pass2Config, run_pass2_pipeline
+from backtesting_bot.strategies import get_strategy
+from src.cache.spy_cache import Spy1mCache
+
+SESSIONS = [
+    dt.date(2025, 3, 3),
+    dt.date(2025, 3, 4),
+    dt.date(2025, 3, 5),
+    dt.date(2025, 3, 6),
+    dt.date(2025, 3, 7),
+]
+
+
+def _session_frame(session_date: dt.date, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        start=dt.datetime.combine(session_date, dt.time(9, 30)),
+        periods=120,
+        freq="1min",
+        tz="America/New_York",
+    )
+    drift = 0.03 if seed % 2 else -0.03
+    close = np.round(500 + np.cumsum(drift + rng.normal(0, 0.05, len(index))), 2)
+    return pd.DataFrame(
+        {
+            "timestamp": index,
+            "open": np.round(close - 0.02, 2),
+            "high": np.round(close + 0.1, 2),
+            "low": np.round(close - 0.1, 2),
+            "close": close,
+            "volume": [1000] * len(index),
+        }
+    )
+
+
+@pytest.fixture
+def cache_root(tmp_path):
+    cache = Spy1mCache(tmp_path / "data")
+    for seed, session_date in enumerate(SESSIONS):
+        cache.write_date(session_date, _session_frame(session_date, seed))
+    return cache.cache_root
+
+
+def test_streamed_sessions_match_loaded_bars(cache_root):
+    start, end = SESSIONS[0], SESSIONS[-1]
+    # Sessions before the store was built come from the store, later ones from
+    # the cache partitions.
+    build_bar_store(cache_root)
+    Spy1mCache(cache_root.parents[1]).write_date(
+        dt.date(2025, 3, 10), _session_frame(dt.date(2025, 3, 10), 7)
+    )
+    end = dt.date(2025, 3, 10)
+
+    bars = load_spy_1m_bars(cache_root, start, end, use_cache=False)
+    streamed = list(iter_spy_1m_sessions(cache_root, start, end))
+
+    assert [session_date for session_date, _ in streamed] == list(bars.dates)
+    for session_date, day_df in streamed:
+        pd.testing.assert_frame_equal(
+            day_df, bars.session(session_date), check_dtype=False, check_freq=False
+        )
+
+    config = Pass1Config(start=start, end=end, strategy="ema_v1", run_id="test")
+    specs = get_strategy("ema_v1").features(config) + get_strategy(
+        "rsi_v1"
+    ).features(config)
+    prepared = add_features(bars, specs)
+    for session_date, day_df in _iter_prepared_sessions(streamed, specs):
+        pd.testing.assert_frame_equal(
+            day_df, prepared.session(session_date), check_dtype=False, check_freq=False
+        )
+
+
+def test_streaming_pipeline_matches_batch_outputs(cache_root, tmp_path):
+    exit_params = ExitParams(
+        stop_loss_pct=0.002,
+        take_profit_mode="static_pct",
+        take_profit_pct=0.003,
+        trailing_enabled=True,
+        trail_pct=0.002,
+        partial_tp_enabled=False,
+        split_pct=0.5,
+        first_tp_pct=0.001,
+        runner_trail_pct=0.002,
+        both_hit_same_second="stop_first",
+    )
+    account = AccountParams(
+        starting_cash=25_000, allocation_pct_per_trade=0.1, max_daily_loss_pct=None
+    )
+
+    outputs = {}
+    for streaming in (False, True):
+        run_dir = tmp_path / ("streamed" if streaming else "batch")
+        pass1_dir = run_pass1_pipeline(
+            Pass1Config(
+                start=SESSIONS[0],
+                end=SESSIONS[-1],
+                strategy="orb_v1",
+                run_id="test",
+                spy_1m_path=str(cache_root),
+                output_dir=run_dir / "pass1",
+                streaming=streaming,
+            )
+        )
+        entries_df = pd.read_parquet(pass1_dir / "entries.parquet")
+        pass2_dir = run_pass2_pipeline(
+            Pass2Config(
+                start=SESSIONS[0],
+                end=SESSIONS[-1],
+                spy_1m_path=str(cache_root),
+                exit_params=exit_params,
+                account_params=account,
+                output_dir=run_dir / "pass2",
+                streaming=streaming,
+            ),
+            entries_df,
+        )
+        outputs[streaming] = {
+            "entries": entries_df,
+            "run_metadata": json.loads((pass1_dir / "run_metadata.json").read_text()),
+            "trades": pd.read_parquet(pass2_dir / "trades.parquet"),
+            "equity": pd.read_parquet(pass2_dir / "equity_curve.parquet"),
+            "metrics": json.loads((pass2_dir / "metrics.json").read_text()),
+        }
+
+    batch, streamed = outputs[False], outputs[True]
+    assert len(streamed["entries"]) == len(SESSIONS)
+    pd.testing.assert_frame_equal(streamed["entries"], batch["entries"], check_dtype=False)
+    assert streamed["run_metadata"] == batch["run_metadata"]
+    # Batch output leaves all-empty partial columns untyped.
+    expected_trades = batch["trades"].astype(streamed["trades"].dtypes.to_dict())
+    pd.testing.assert_frame_equal(streamed["trades"], expected_trades)
+    pd.testing.assert_frame_equal(streamed["equity"], batch["equity"], check_dtype=False)
+    assert streamed["metrics"] == pytest.approx(batch["metrics"])
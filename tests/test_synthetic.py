@@ -0,0 +1,89 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from src.cache.backfill import backfill
+from src.cli import main as cli_main
+from src.cache.spy_cache import Spy1mCache
+from src.providers.synthetic import SyntheticMarketDataProvider
+
+SESSIONS = [ts.date() for ts in pd.bdate_range("2024-01-02", "2024-03-29")]
+
+
+def test_synthetic_sessions_are_deterministic_per_seed_and_date():
+    provider = SyntheticMarketDataProvider(seed=7)
+    session = SESSIONS[10]
+
+    first = provider.fetch_spy_1m(session)
+    again = SyntheticMarketDataProvider(seed=7).fetch_spy_1m(session)
+    pd.testing.assert_frame_equal(first, again)
+    assert not first.equals(SyntheticMarketDataProvider(seed=8).fetch_spy_1m(session))
+    assert provider.fetch_spy_1m(dt.date(2024, 1, 6)).empty
+
+    assert first["timestamp"].iloc[0].strftime("%H:%M") == "09:30"
+    close = pd.Timestamp(f"{session} 16:00", tz="America/New_York")
+    assert first["timestamp"].iloc[-1] < close
+    assert (first["high"] >= first[["open", "close"]].max(axis=1)).all()
+    assert (first["low"] <= first[["open", "close"]].min(axis=1)).all()
+
+
+def test_synthetic_sessions_have_gaps_missing_bars_and_u_shaped_volatility():
+    provider = SyntheticMarketDataProvider(seed=3, missing_bar_rate=0.01)
+    frames = [provider.fetch_spy_1m(session) for session in SESSIONS]
+
+    assert any(len(frame) < 390 for frame in frames)
+    gaps = [
+        today["open"].iloc[0] / yesterday["close"].iloc[-1] - 1
+        for yesterday, today in zip(frames, frames[1:])
+    ]
+    assert np.std(gaps) > 0.001
+
+    moves = pd.concat(
+        [
+            frame.set_index(frame["timestamp"].dt.strftime("%H:%M"))["close"]
+            .pct_change()
+            .abs()
+            for frame in frames
+        ]
+    ).groupby(level=0).mean()
+    assert moves.loc["09:31":"09:45"].mean() > 1.5 * moves.loc["12:00":"13:00"].mean()
+
+
+def test_synthetic_backfill_matches_direct_generation(tmp_path):
+    provider = SyntheticMarketDataProvider(seed=1)
+    cache = Spy1mCache(tmp_path)
+
+    summary = backfill(cache, provider, SESSIONS, workers=4)
+
+    assert summary.ok and summary.fetched == SESSIONS
+    for session in (SESSIONS[0], SESSIONS[-1]):
+        cached = cache.read_date(session)
+        expected = provider.fetch_spy_1m(session)
+        assert cached["timestamp"].tolist() == expected["timestamp"].tolist()
+        np.testing.assert_allclose(cached["close"], expected["close"])
+
+
+def test_synthetic_fetch_stays_out_of_the_vendor_cache(tmp_path, monkeypatch):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(f"local:\n  data_dir: {tmp_path / 'data'}\n")
+    monkeypatch.setattr(cli_main, "_trading_days", lambda start, end: SESSIONS[:2])
+    args = cli_main.build_parser().parse_args(
+        [
+            "--config",
+            str(config_path),
+            "fetch-spy",
+            "--provider",
+            "synthetic",
+            "--start",
+            "2024-01-02",
+            "--end",
+            "2024-01-03",
+        ]
+    )
+
+    assert cli_main.fetch_spy(args) == 0
+    assert Spy1mCache(tmp_path / "data" / "synthetic").cached_dates() == set(
+        SESSIONS[:2]
+    )
+    assert not Spy1mCache(tmp_path / "data").cached_dates()
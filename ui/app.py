@@ -101,6 +101,11 @@ with st.form("experiment_form"):
     max_trades_per_day = st.number_input(
         "Max trades per day", min_value=1, value=1, step=1
     )
+    rearm = st.selectbox(
+        "Re-arm after an entry",
+        options=["inside", "opposite"],
+        help="Close back inside the range, or break out on the opposite side",
+    )
     no_entries_after_enabled = st.checkbox("Set no-entries-after cutoff")
     no_entries_after = None
     if no_entries_after_enabled:
@@ -136,6 +141,9 @@ with st.form("experiment_form"):
     max_daily_loss_pct = (
         st.number_input("Max daily loss % (0 to disable)", min_value=0.0, value=0.0) / 100
     )
+    streaming = st.checkbox(
+        "Stream sessions (bounded memory for long date ranges)", value=False
+    )
     run_clicked = st.form_submit_button("Run Experiment")
 
 
@@ -156,6 +164,7 @@ if run_clicked:
                 confirm_full_candle=confirm_full_candle,
                 max_trades_per_day=int(max_trades_per_day),
                 no_entries_after=no_entries_after,
+                rearm=rearm,
             ),
             exit=ExitParams(
                 stop_loss_pct=float(stop_loss_pct),
@@ -183,7 +192,9 @@ if run_clicked:
 
         experiment_id = generate_experiment_id(test_name)
         with st.spinner("Running backtest..."):
-            result = run_experiment(config, experiment_id=experiment_id)
+            result = run_experiment(
+                config, experiment_id=experiment_id, streaming=streaming
+            )
 
         _render_results(result.experiment_id)
 